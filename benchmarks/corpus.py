@@ -0,0 +1,202 @@
+"""
+Synthetic resume and job description documents for the benchmarks.
+
+Every document is generated from a seed, so runs are reproducible. Each
+comes either as a text-layer PDF (what an exported CV looks like) or as a
+scanned, image-only PDF (rendered, slightly rotated and speckled), for any
+number of pages.
+"""
+import io
+import os
+import random
+from typing import Dict, List, NamedTuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+DOCUMENT_KINDS = ("resume", "jd")
+DOCUMENT_FORMS = ("text_layer", "scanned")
+
+_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+
+# Lines per page; fits a US Letter page in both renderings
+LINES_PER_PAGE = 45
+
+RESUME_SECTIONS = {
+    "EXPERIENCE": [
+        "Senior Software Engineer, Acme Analytics, 2019 - present",
+        "Built Python and FastAPI services processing 2M events per day",
+        "Migrated batch pipelines from Hadoop to Apache Spark on AWS",
+        "Led a team of 5 engineers; introduced code review and CI/CD",
+        "Software Engineer, Northwind Traders, 2015 - 2019",
+        "Developed REST APIs in Java and Spring Boot backed by PostgreSQL",
+        "Reduced p95 latency by 40% with Redis caching and query tuning",
+    ],
+    "EDUCATION": [
+        "M.Sc. Computer Science, University of Edinburgh, 2015",
+        "B.Sc. Mathematics, University of Leeds, 2013",
+    ],
+    "SKILLS": [
+        "Python, Java, SQL, Docker, Kubernetes, Terraform, Airflow",
+        "Machine Learning, scikit-learn, PyTorch, Pandas, NumPy",
+    ],
+}
+
+JD_SECTIONS = {
+    "ABOUT THE ROLE": [
+        "We are hiring a Machine Learning Engineer to join our platform team",
+        "You will build and operate the services behind our recommendations",
+        "The team owns data pipelines, model training and online inference",
+    ],
+    "REQUIREMENTS": [
+        "3+ years of professional experience building production systems",
+        "Strong Python and SQL; experience with Docker and Kubernetes",
+        "Experience with PyTorch or TensorFlow and MLOps tooling",
+        "Degree in Computer Science, Mathematics or a related field",
+    ],
+    "NICE TO HAVE": [
+        "Experience with Apache Spark, Airflow or Kafka on AWS",
+        "Familiarity with feature stores and model monitoring",
+        "Strong communication skills and experience mentoring engineers",
+    ],
+}
+
+
+class Document(NamedTuple):
+    name: str
+    kind: str  # "resume" or "jd"
+    form: str  # "text_layer" or "scanned"
+    pages: int
+    data: bytes
+    text: str  # The text printed on the pages
+
+
+def document_pages(kind: str, seed: int, pages: int) -> List[List[str]]:
+    """The lines printed on each page of a synthetic resume or job description."""
+    sections = RESUME_SECTIONS if kind == "resume" else JD_SECTIONS
+    title = "Candidate" if kind == "resume" else "Job posting"
+    rng = random.Random(f"{kind}-{seed}")
+
+    page_lines = []
+    for page in range(pages):
+        lines = [f"{title} {seed}  -  page {page + 1}"]
+        while len(lines) < LINES_PER_PAGE - 4:
+            section = rng.choice(list(sections))
+            lines.append(section)
+            lines.extend(rng.sample(sections[section], k=min(3, len(sections[section]))))
+            lines.append("")
+        page_lines.append(lines[:LINES_PER_PAGE])
+    return page_lines
+
+
+def text_layer_pdf(page_lines: List[List[str]]) -> bytes:
+    """A minimal PDF with the lines as real text (Helvetica, 10pt), one page per list."""
+    font_id = 3
+    objects: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: (
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+            b"/Encoding /WinAnsiEncoding >>"
+        ),
+    }
+    page_ids = []
+    for index, lines in enumerate(page_lines):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        page_ids.append(page_id)
+        text = b" T* ".join(b"(" + _pdf_string(line) + b") Tj" for line in lines)
+        stream = b"BT /F1 10 Tf 14 TL 54 738 Td " + text + b" ET"
+        objects[content_id] = (
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (font_id, content_id)
+        )
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = out.tell()
+        out.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+    xref = out.tell()
+    size = max(objects) + 1
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    for object_id in range(1, size):
+        out.write(b"%010d 00000 n \n" % offsets[object_id])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+    return out.getvalue()
+
+
+def _pdf_string(line: str) -> bytes:
+    data = line.encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def scanned_pdf(page_lines: List[List[str]], seed: int, dpi: int = 300) -> bytes:
+    """An image-only PDF of the lines, with scanner artefacts, rendered at `dpi`."""
+    rng = random.Random(seed)
+    font_path = next((path for path in _FONT_PATHS if os.path.exists(path)), None)
+    size = dpi // 8  # About 9pt text
+    font = (
+        ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default()
+    )
+    width, height = int(8.5 * dpi), int(11 * dpi)
+
+    images = []
+    for lines in page_lines:
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        y = dpi // 2
+        for line in lines:
+            if y >= height - dpi // 2:
+                break
+            draw.text((dpi // 2, y), line, fill=0, font=font)
+            y += int(1.4 * size)
+
+        # Scanner artefacts: a small rotation and salt-and-pepper specks
+        image = image.rotate(
+            rng.uniform(-1.5, 1.5), resample=Image.BICUBIC, fillcolor=255
+        )
+        pixels = image.load()
+        for _ in range(width * height // 2000):
+            pixels[rng.randrange(width), rng.randrange(height)] = rng.choice((0, 160))
+        images.append(image)
+
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer, format="PDF", save_all=True, append_images=images[1:], resolution=dpi
+    )
+    return buffer.getvalue()
+
+
+def make_document(kind: str, form: str, seed: int, pages: int, dpi: int = 300) -> Document:
+    page_lines = document_pages(kind, seed, pages)
+    if form == "text_layer":
+        data = text_layer_pdf(page_lines)
+    else:
+        data = scanned_pdf(page_lines, seed, dpi)
+    text = "\n".join(line for lines in page_lines for line in lines if line)
+    return Document(f"{kind}-{form}-{pages}p-{seed}.pdf", kind, form, pages, data, text)
+
+
+def make_corpus(
+    page_counts=(1, 2, 4),
+    forms=DOCUMENT_FORMS,
+    documents_per_case: int = 3,
+    dpi: int = 300,
+) -> List[Document]:
+    """Every kind x form x page count, `documents_per_case` documents each."""
+    return [
+        make_document(kind, form, seed, pages, dpi)
+        for kind in DOCUMENT_KINDS
+        for form in forms
+        for pages in page_counts
+        for seed in range(documents_per_case)
+    ]
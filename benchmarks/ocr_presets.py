@@ -0,0 +1,128 @@
+"""
+Throughput vs. character accuracy of the OCR presets.
+
+Every preset OCRs the same scanned documents. By default these are
+synthetic CV pages, rendered, slightly rotated and speckled like a scan, so
+their ground truth is known. Real samples can be passed as well: each
+`<name>.pdf` (or image) needs its ground truth next to it in `<name>.txt`.
+
+    python -m benchmarks.ocr_presets
+    python -m benchmarks.ocr_presets --documents samples/*.pdf --output ocr.json
+
+Needs tesseract and poppler (pdftoppm) on the PATH.
+"""
+import argparse
+import difflib
+import io
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytesseract  # noqa: E402
+
+from benchmarks.corpus import make_document  # noqa: E402
+from constants import OCR_PRESETS  # noqa: E402
+from src.utilities.text_extractor import TextExtractor  # noqa: E402
+
+
+def make_scanned_document(seed: int, pages: int = 2, dpi: int = 300) -> Tuple[bytes, str]:
+    """
+    Renders a synthetic CV as an image-only PDF, returning its bytes and
+    the text printed on it.
+    """
+    document = make_document("resume", "scanned", seed, pages, dpi)
+    return document.data, document.text
+
+
+def character_accuracy(truth: str, text: str) -> float:
+    """Share of the ground-truth characters recovered in order (whitespace-insensitive)."""
+    truth, text = " ".join(truth.split()), " ".join((text or "").split())
+    if not truth:
+        return 1.0
+    matcher = difflib.SequenceMatcher(None, truth, text, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(truth)
+
+
+def page_count(data: bytes) -> int:
+    if b"%PDF-" not in data[:1024]:
+        return 1
+    from pypdf import PdfReader
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def load_documents(paths: List[str]) -> List[Tuple[str, bytes, str]]:
+    documents = []
+    for path in paths:
+        truth_path = f"{os.path.splitext(path)[0]}.txt"
+        if not os.path.exists(truth_path):
+            sys.exit(f"Missing ground truth {truth_path}")
+        with open(path, "rb") as f, open(truth_path, encoding="utf-8") as t:
+            documents.append((os.path.basename(path), f.read(), t.read()))
+    return documents
+
+
+def run_preset(preset: str, documents, parallel: bool) -> dict:
+    accuracies = []
+    pages = 0
+    # The text layer is bypassed so every page goes through the OCR path
+    with TextExtractor.from_preset(preset, use_text_layer=False, parallel=parallel) as extractor:
+        start = time.perf_counter()
+        for _, data, truth in documents:
+            result = extractor.extract_text_with_details(data)
+            text = result["text"] if result else ""
+            accuracies.append(character_accuracy(truth, text))
+            pages += page_count(data)
+        seconds = time.perf_counter() - start
+
+    return {
+        "preset": preset,
+        "settings": OCR_PRESETS[preset],
+        "documents": len(documents),
+        "pages": pages,
+        "seconds": round(seconds, 3),
+        "pages_per_second": round(pages / seconds, 3) if seconds else None,
+        "char_accuracy_mean": round(sum(accuracies) / len(accuracies), 4),
+        "char_accuracy_min": round(min(accuracies), 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--presets", nargs="+", default=list(OCR_PRESETS), choices=list(OCR_PRESETS))
+    parser.add_argument("--documents", nargs="*", default=[], help="PDFs or images with <name>.txt ground truth")
+    parser.add_argument("--synthetic", type=int, default=5, help="Synthetic documents when --documents is not given")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per synthetic document")
+    parser.add_argument("--parallel", action="store_true", help="OCR pages on the worker pool")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        sys.exit(f"tesseract is not available: {e}")
+
+    if args.documents:
+        documents = load_documents(args.documents)
+    else:
+        documents = []
+        for seed in range(args.synthetic):
+            data, truth = make_scanned_document(seed, pages=args.pages)
+            documents.append((f"synthetic-{seed}.pdf", data, truth))
+
+    report = {
+        "documents": [name for name, _, _ in documents],
+        "results": [run_preset(preset, documents, args.parallel) for preset in args.presets],
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Offline component benchmarks over a synthetic resume/JD corpus.
+
+Generates resumes and job descriptions as text-layer and scanned PDFs at
+several page counts (see benchmarks/corpus.py) and measures:
+
+    extractor         TextExtractor on each document form and page count
+    document_service  DocumentService, cold (OCR cache miss) and warm
+    prompts           Text compaction and prompt building for every LLM call
+    pipeline          Pipeline.process_resume, three-call and fused, against
+                      a deterministic fake OpenAI server
+
+Each case reports throughput, latency percentiles and peak traced memory
+(from one extra pass under tracemalloc, so timings are not skewed by it).
+Results are written as JSON; pass an earlier result with --compare to list
+the cases that got slower.
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --benchmarks extractor prompts --pages 1 4
+    python -m benchmarks.suite --compare baseline.json --fail-on-regression
+
+Scanned documents need tesseract and poppler (pdftoppm) on the PATH; their
+cases are skipped, and reported as such, when these are missing. The fake
+server runs in this process, so its (small) overhead is included in the
+pipeline numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import DOCUMENT_FORMS, Document, make_corpus  # noqa: E402
+from benchmarks.fused_vs_pipeline import fake_responder  # noqa: E402
+from src.utilities.fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+BENCHMARKS = ("extractor", "document_service", "prompts", "pipeline")
+PIPELINE_MODES = ("three_call", "fused")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def at(fraction):
+        # Linear interpolation between the closest ranks
+        position = fraction * (len(ordered) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    return {
+        "mean": round(statistics.mean(ordered), 6),
+        "p50": round(at(0.50), 6),
+        "p90": round(at(0.90), 6),
+        "p95": round(at(0.95), 6),
+        "p99": round(at(0.99), 6),
+        "max": round(ordered[-1], 6),
+    }
+
+
+def summarize(latencies: List[float], seconds: float, pages: int, peak_bytes: Optional[int]) -> dict:
+    return {
+        "samples": len(latencies),
+        "seconds": round(seconds, 4),
+        "throughput_per_second": round(len(latencies) / seconds, 3) if seconds else None,
+        "pages_per_second": round(pages / seconds, 3) if seconds and pages else None,
+        "latency_seconds": percentiles(latencies),
+        "peak_memory_bytes": peak_bytes,
+    }
+
+
+@contextmanager
+def traced_peak() -> Iterator[dict]:
+    """Peak bytes allocated by Python inside the block (under tracemalloc)."""
+    result = {"peak_bytes": None}
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+
+def time_calls(call: Callable, inputs: list, repeats: int, warmup: bool = True):
+    """Latency of each call and the total seconds, after one untimed call."""
+    if warmup:
+        call(inputs[0])
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for item in inputs:
+            started = time.perf_counter()
+            call(item)
+            latencies.append(time.perf_counter() - started)
+    return latencies, time.perf_counter() - start
+
+
+def peak_of_calls(call: Callable, inputs: list) -> int:
+    with traced_peak() as peak:
+        for item in inputs:
+            call(item)
+    return peak["peak_bytes"]
+
+
+def ocr_available() -> bool:
+    if shutil.which("pdftoppm") is None:
+        return False
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def group_cases(corpus: List[Document]) -> Dict[str, List[Document]]:
+    cases = {}
+    for document in corpus:
+        cases.setdefault(f"{document.kind}/{document.form}/{document.pages}p", []).append(document)
+    return cases
+
+
+def bench_extractor(corpus: List[Document], args) -> List[dict]:
+    from src.utilities.text_extractor import TextExtractor
+
+    results = []
+    with TextExtractor.from_preset(args.preset) as extractor:
+        for case, documents in group_cases(corpus).items():
+            def extract(document):
+                if not extractor.extract_text_with_details(document.data):
+                    raise RuntimeError(f"Nothing extracted from {document.name}")
+
+            latencies, seconds = time_calls(extract, documents, args.repeats)
+            pages = sum(d.pages for d in documents) * args.repeats
+            peak = peak_of_calls(extract, documents) if args.memory else None
+            results.append({"benchmark": "extractor", "case": case, **summarize(latencies, seconds, pages, peak)})
+    return results
+
+
+def bench_document_service(corpus: List[Document], args) -> List[dict]:
+    from src.services.document_service import DocumentService
+    from src.utilities.ocr_cache import OCRCache
+    from src.utilities.text_extractor import TextExtractor
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        extractor = TextExtractor.from_preset(
+            args.preset, cache=OCRCache(cache_dir=cache_dir), parallel=True
+        )
+        service = DocumentService(text_extractor=extractor)
+        try:
+            for case, documents in group_cases(corpus).items():
+                def extract(document):
+                    if not service.extract_text(document.data):
+                        raise RuntimeError(f"Nothing extracted from {document.name}")
+
+                pages = sum(d.pages for d in documents)
+                # The first pass misses the OCR cache; later ones hit it
+                cold, cold_seconds = time_calls(extract, documents, 1, warmup=False)
+                warm, warm_seconds = time_calls(extract, documents, args.repeats, warmup=False)
+                peak = peak_of_calls(extract, documents) if args.memory else None
+                results.append({
+                    "benchmark": "document_service", "case": f"{case}/cold",
+                    **summarize(cold, cold_seconds, pages, None),
+                })
+                results.append({
+                    "benchmark": "document_service", "case": f"{case}/warm",
+                    **summarize(warm, warm_seconds, pages * args.repeats, peak),
+                })
+        finally:
+            extractor.close()
+    return results
+
+
+def bench_prompts(corpus: List[Document], args) -> List[dict]:
+    from src.services.ats_service import ATSservice
+    from src.services.prompts.extraction_prompt import USER_PROMPT
+    from src.services.prompts.fused_prompt import FUSED_USER_PROMPT
+    from src.services.prompts.jd_prompts import JD_USER_PROMPT
+
+    ats_service = ATSservice(structured_output=True, model_routing=False)
+    cv_items = {
+        "contact_info": {"name": "Candidate"},
+        "skills_technical": ["Python", "SQL", "Docker"],
+        "skills_soft": ["Communication"],
+        "experience": [{
+            "company": "Acme Analytics", "role": "Senior Software Engineer",
+            "duration": "2019 - present", "achievements": ["Built FastAPI services"],
+        }],
+        "education": [{"degree": "M.Sc. Computer Science", "institution": "Edinburgh", "year": "2015"}],
+    }
+    jd_items = {"Education": ["B.Sc."], "Experience": ["3+ years"], "Skills": ["Python", "Kubernetes"]}
+
+    def cv_prompt(text):
+        return USER_PROMPT.format(raw_text=ats_service.cv_compactor.compact(text)["text"])
+
+    def jd_prompt(text):
+        return JD_USER_PROMPT.format(jd_text=ats_service.jd_compactor.compact(text)["text"])
+
+    def fused_prompt(text):
+        return FUSED_USER_PROMPT.format(
+            raw_text=ats_service.cv_compactor.compact(text)["text"],
+            jd_text=ats_service.jd_compactor.compact(text)["text"],
+        )
+
+    builders = {
+        "resume": {"cv_extraction": cv_prompt, "fused": fused_prompt},
+        "jd": {"jd_extraction": jd_prompt},
+    }
+    results = []
+    # The prompts are built from the text, whatever form the document had
+    for case, documents in group_cases(
+        [d for d in corpus if d.form == DOCUMENT_FORMS[0]]
+    ).items():
+        kind, _, pages = case.split("/")
+        texts = [document.text for document in documents]
+        for prompt, build in builders[kind].items():
+            latencies, seconds = time_calls(build, texts, args.repeats)
+            peak = peak_of_calls(build, texts) if args.memory else None
+            results.append({
+                "benchmark": "prompts", "case": f"{prompt}/{pages}",
+                **summarize(latencies, seconds, 0, peak),
+            })
+
+    def score_prompt(_):
+        return ats_service._ats_score_user_prompt(cv_items, jd_items)
+
+    latencies, seconds = time_calls(score_prompt, [None], args.repeats * 10)
+    peak = peak_of_calls(score_prompt, [None]) if args.memory else None
+    results.append({"benchmark": "prompts", "case": "ats_scoring", **summarize(latencies, seconds, 0, peak)})
+    return results
+
+
+def bench_pipeline(corpus: List[Document], args, server: FakeOpenAIServer) -> List[dict]:
+    from src.app import Pipeline
+    from src.services.ats_service import ATSservice
+    from src.services.document_service import DocumentService
+    from src.utilities.text_extractor import TextExtractor
+
+    ats_service = ATSservice(structured_output=True, model_routing=False)
+    # Every request must reach the fake server, not the response cache
+    ats_service.ai_generator.cache = None
+    extractor = TextExtractor.from_preset(args.preset, parallel=True)
+    pipeline = Pipeline(
+        document_service=DocumentService(text_extractor=extractor),
+        ats_service=ats_service,
+        cv_extraction_mode="ocr",
+    )
+
+    cases = {}
+    for document in corpus:
+        cases.setdefault((document.form, document.pages), {}).setdefault(document.kind, []).append(document)
+
+    async def run_case(pairs, fused):
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one(resume, jd):
+            async with semaphore:
+                started = time.perf_counter()
+                await pipeline.process_resume(resume.data, jd.data, raise_errors=True, fused=fused)
+                latencies.append(time.perf_counter() - started)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(resume, jd) for resume, jd in pairs))
+        return latencies, time.perf_counter() - start
+
+    async def run_all():
+        # Untimed: opens the client connections and loads the tokenizer
+        first_case = next(iter(cases.values()))
+        resume, jd = first_case["resume"][0], first_case["jd"][0]
+        for mode in PIPELINE_MODES:
+            await pipeline.process_resume(resume.data, jd.data, raise_errors=True, fused=mode == "fused")
+
+        results = []
+        for (form, pages), kinds in cases.items():
+            pairs = list(zip(kinds.get("resume", []), kinds.get("jd", [])))
+            for mode in PIPELINE_MODES:
+                fused = mode == "fused"
+                requests_before = len(server.requests)
+                latencies, seconds = await run_case(pairs * args.repeats, fused)
+                calls = len(server.requests) - requests_before
+                peak = None
+                if args.memory:
+                    with traced_peak() as traced:
+                        await run_case(pairs, fused)
+                    peak = traced["peak_bytes"]
+                results.append({
+                    "benchmark": "pipeline",
+                    "case": f"{mode}/{form}/{pages}p",
+                    **summarize(latencies, seconds, 2 * pages * len(latencies), peak),
+                    "llm_calls_per_request": round(calls / len(latencies), 2),
+                })
+        return results
+
+    try:
+        return asyncio.run(run_all())
+    finally:
+        extractor.close()
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float) -> dict:
+    """Per case, the change in median latency and throughput against `baseline`."""
+    previous = {(r["benchmark"], r["case"]): r for r in baseline.get("results", []) if "latency_seconds" in r}
+    changes, regressions = [], []
+    for result in results:
+        before = previous.get((result["benchmark"], result["case"]))
+        if before is None or "latency_seconds" not in result:
+            continue
+        p50_before, p50_after = before["latency_seconds"]["p50"], result["latency_seconds"]["p50"]
+        change = {
+            "benchmark": result["benchmark"],
+            "case": result["case"],
+            "p50_before": p50_before,
+            "p50_after": p50_after,
+            "p50_change": round(p50_after / p50_before - 1, 4) if p50_before else None,
+            "throughput_before": before["throughput_per_second"],
+            "throughput_after": result["throughput_per_second"],
+        }
+        changes.append(change)
+        if change["p50_change"] is not None and change["p50_change"] > tolerance:
+            regressions.append(f"{result['benchmark']}/{result['case']}")
+    return {"tolerance": tolerance, "changes": changes, "regressions": regressions}
+
+
+def metadata(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+    }
+
+
+def peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=BENCHMARKS)
+    parser.add_argument("--pages", nargs="+", type=int, default=[1, 2, 4], help="Page counts of the documents")
+    parser.add_argument("--forms", nargs="+", default=list(DOCUMENT_FORMS), choices=DOCUMENT_FORMS)
+    parser.add_argument("--documents", type=int, default=3, help="Documents per kind, form and page count")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed passes over each case")
+    parser.add_argument("--dpi", type=int, default=200, help="Resolution of the scanned documents")
+    parser.add_argument("--preset", default="balanced", help="OCR preset of the extractors")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent pipeline requests")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Fake OpenAI seconds per call")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the tracemalloc passes")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Median latency increase counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    args = parser.parse_args(argv)
+
+    forms = list(args.forms)
+    skipped = []
+    if "scanned" in forms and not ocr_available():
+        forms.remove("scanned")
+        skipped.append("scanned documents: tesseract or pdftoppm is not available")
+    corpus = make_corpus(args.pages, forms, args.documents, args.dpi)
+
+    # The OpenAI clients are created on import, so point them at the fake
+    # server before anything imports the LLM utilities
+    server = FakeOpenAIServer(responder=fake_responder, latency_seconds=args.fake_latency).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+    results = []
+    try:
+        for name in args.benchmarks:
+            started = time.perf_counter()
+            if name == "extractor":
+                results += bench_extractor(corpus, args)
+            elif name == "document_service":
+                results += bench_document_service(corpus, args)
+            elif name == "prompts":
+                results += bench_prompts(corpus, args)
+            else:
+                results += bench_pipeline(corpus, args, server)
+            print(f"{name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    finally:
+        server.stop()
+
+    report = {
+        "meta": metadata(args),
+        "corpus": {
+            "documents": len(corpus),
+            "bytes": sum(len(document.data) for document in corpus),
+            "forms": forms,
+            "pages": args.pages,
+        },
+        "skipped": skipped,
+        "results": results,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(results, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
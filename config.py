@@ -2,4 +2,35 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Point the OpenAI clients at another endpoint, e.g. a local fake server
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Opt-in persistent cache for LLM responses (see src/utilities/llm_cache.py)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Parse CV extraction and ATS scoring responses into CVParsedData/ATSResult
+# (see src/utilities/structured_output.py) instead of returning raw text
+STRUCTURED_OUTPUT_ENABLED = os.getenv("STRUCTURED_OUTPUT_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Route structured LLM calls across model tiers by input size and task,
+# escalating on invalid or low-confidence output (see MODEL_ROUTING_RULES in
+# constants.py); off pins every call to gpt-4o-mini
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Where batch jobs run: "openai" (Batch API) or "local" (offline stand-in)
+LLM_BATCH_BACKEND = os.getenv("LLM_BATCH_BACKEND", "openai").lower()
+
+# Serper search API (see src/services/search_service.py); the base URL can
+# point at a local stand-in
+SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev")
+
+# OCR preset used for uploads: "default" (plain tesseract settings),
+# "fast", "balanced" or "accurate" (see OCR_PRESETS in constants.py)
+OCR_PRESET = os.getenv("OCR_PRESET", "default").lower()
+
+# How CVs are turned into structured data: "ocr" (tesseract, then the text
+# model), "vision" (page images straight to the vision model) or "auto"
+# (vision for short, fully scanned documents, OCR otherwise)
+CV_EXTRACTION_MODE = os.getenv("CV_EXTRACTION_MODE", "ocr").lower()
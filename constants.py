@@ -13,3 +13,250 @@ class GPT_Model(Enum):
     @classmethod
     def values(cls):
         return [i.value for i in cls]
+
+# OCR defaults (pdf2image renders at 200 DPI unless told otherwise)
+DEFAULT_OCR_DPI = 200
+DEFAULT_OCR_LANG = "eng"
+DEFAULT_TESSERACT_PSM = 3
+DEFAULT_TESSERACT_OEM = 3
+
+# Pages rasterized per pdf2image call; bounds the page images held in memory
+DEFAULT_OCR_PAGE_WINDOW = 1
+
+# Named OCR speed/quality trade-offs (see TextExtractor.from_preset and
+# benchmarks/ocr_presets.py). max_pixels caps the rasterized page size
+# (None: no cap); tesseract_flags are passed to tesseract verbatim, and
+# disabling tessedit_do_invert skips its second pass over inverted text.
+OCR_PRESETS = {
+    # Plain tesseract settings, as before the presets existed
+    "default": {
+        "dpi": DEFAULT_OCR_DPI,
+        "grayscale": False,
+        "binarize": False,
+        "deskew": False,
+        "max_pixels": None,
+        "oem": DEFAULT_TESSERACT_OEM,
+        "psm": DEFAULT_TESSERACT_PSM,
+        "lang": DEFAULT_OCR_LANG,
+        "tesseract_flags": "",
+    },
+    "fast": {
+        "dpi": 150,
+        "grayscale": True,
+        "binarize": True,
+        "deskew": False,
+        "max_pixels": 2_000_000,
+        "oem": 1,
+        "psm": 6,
+        "lang": "eng",
+        "tesseract_flags": "-c tessedit_do_invert=0",
+    },
+    "balanced": {
+        "dpi": 200,
+        "grayscale": True,
+        "binarize": False,
+        "deskew": False,
+        "max_pixels": 4_000_000,
+        "oem": 1,
+        "psm": 3,
+        "lang": "eng",
+        "tesseract_flags": "-c tessedit_do_invert=0",
+    },
+    "accurate": {
+        "dpi": 300,
+        "grayscale": True,
+        "binarize": True,
+        "deskew": True,
+        "max_pixels": None,
+        "oem": 1,
+        "psm": 3,
+        "lang": "eng",
+        "tesseract_flags": "",
+    },
+}
+# Largest skew angle (degrees) looked for when deskewing a page
+DEFAULT_DESKEW_MAX_ANGLE = 5.0
+
+# A PDF page whose embedded text layer has fewer characters than this is
+# treated as a scanned image and sent to tesseract instead
+DEFAULT_MIN_TEXT_LAYER_CHARS = 30
+
+DEFAULT_OCR_CACHE_DIR = ".cache/ocr"
+DEFAULT_OCR_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Uploads are read in chunks into memory and only spilled to a temporary
+# file once they grow past the spool threshold
+DEFAULT_UPLOAD_CHUNK_BYTES = 64 * 1024  # 64 KB
+DEFAULT_UPLOAD_SPOOL_BYTES = 8 * 1024 * 1024  # 8 MB
+DEFAULT_MAX_UPLOAD_BYTES = 25 * 1024 * 1024  # 25 MB
+
+# Background resume processing
+DEFAULT_RESUME_JOB_WORKERS = 4
+DEFAULT_RESUME_JOB_QUEUE_SIZE = 100
+# Total size of the uploads waiting in the queue (in memory or spooled)
+DEFAULT_RESUME_JOB_MAX_QUEUED_BYTES = 256 * 1024 * 1024  # 256 MB
+DEFAULT_RESUME_JOB_RETENTION_SECONDS = 60 * 60  # 1 hour
+
+# LLM response cache (opt-in, see src/utilities/llm_cache.py)
+DEFAULT_LLM_CACHE_PATH = ".cache/llm_responses.sqlite3"
+DEFAULT_LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # 1 week
+DEFAULT_LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+DEFAULT_LLM_CACHE_MAX_TEMPERATURE = 0.3
+
+# Client-side rate limits per model (in-flight requests, RPM, TPM). Tune
+# these to the organisation's usage tier.
+GPT_MODEL_RATE_LIMITS = {
+    GPT_Model.GPT_40_MINI.value: {
+        "max_in_flight": 32,
+        "requests_per_minute": 500,
+        "tokens_per_minute": 200_000,
+    },
+    GPT_Model.GPT_03_MINI.value: {
+        "max_in_flight": 16,
+        "requests_per_minute": 500,
+        "tokens_per_minute": 200_000,
+    },
+    GPT_Model.GPT_3_5_TURBO.value: {
+        "max_in_flight": 32,
+        "requests_per_minute": 500,
+        "tokens_per_minute": 200_000,
+    },
+    GPT_Model.GPT_40.value: {
+        "max_in_flight": 16,
+        "requests_per_minute": 500,
+        "tokens_per_minute": 30_000,
+    },
+    GPT_Model.GPT_4_1.value: {
+        "max_in_flight": 16,
+        "requests_per_minute": 500,
+        "tokens_per_minute": 30_000,
+    },
+    GPT_Model.GPT_4_1_NANO.value: {
+        "max_in_flight": 32,
+        "requests_per_minute": 500,
+        "tokens_per_minute": 200_000,
+    },
+}
+DEFAULT_MODEL_RATE_LIMIT = {
+    "max_in_flight": 8,
+    "requests_per_minute": 500,
+    "tokens_per_minute": 30_000,
+}
+# Completion tokens assumed when reserving TPM for a request without max_tokens
+DEFAULT_ESTIMATED_COMPLETION_TOKENS = 1000
+
+# LLM call resilience (see src/utilities/llm_resilience.py)
+DEFAULT_LLM_TIMEOUT_SECONDS = 60.0
+DEFAULT_LLM_MAX_RETRIES = 3
+DEFAULT_LLM_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_LLM_BACKOFF_MAX_SECONDS = 8.0
+DEFAULT_LLM_HEDGE_MIN_SAMPLES = 20
+DEFAULT_LLM_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_LLM_BREAKER_RESET_SECONDS = 30.0
+
+# Structured output (see src/utilities/structured_output.py): extra calls
+# allowed when a response is unusable even after local repair
+DEFAULT_STRUCTURED_OUTPUT_MAX_RECALLS = 1
+
+# Model cascade (see src/utilities/model_router.py). Per task, the models to
+# try, cheapest first, each with the largest prompt (in tokens) a call may
+# start on it; None means no limit. A call starts on the first tier that
+# covers its prompt and moves up a tier when the output fails validation or
+# looks low-confidence, so tiers without a limit are escalation targets
+MODEL_ROUTING_RULES = {
+    "cv_extraction": [
+        (GPT_Model.GPT_4_1_NANO.value, 2500),
+        (GPT_Model.GPT_40_MINI.value, None),
+        (GPT_Model.GPT_4_1.value, None),
+    ],
+    "jd_extraction": [
+        (GPT_Model.GPT_4_1_NANO.value, 2500),
+        (GPT_Model.GPT_40_MINI.value, None),
+    ],
+    "ats_scoring": [
+        (GPT_Model.GPT_40_MINI.value, None),
+        (GPT_Model.GPT_4_1.value, None),
+    ],
+    "fused": [
+        (GPT_Model.GPT_40_MINI.value, None),
+        (GPT_Model.GPT_4_1.value, None),
+    ],
+}
+# Document text with a larger share of OCR noise characters skips the
+# cheapest tier
+DEFAULT_ROUTING_MAX_NOISE_RATIO = 0.03
+# Recent routing decisions kept for inspection
+DEFAULT_ROUTING_HISTORY_SIZE = 200
+
+# Upper bounds (seconds) of the latency histogram buckets served at /metrics
+# (see src/utilities/tracing.py); spans from page OCR up to whole LLM calls
+DEFAULT_METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Batch inference (see src/utilities/openai_batch.py)
+DEFAULT_BATCH_POLL_INTERVAL_SECONDS = 30.0
+DEFAULT_BATCH_COMPLETION_WINDOW = "24h"
+DEFAULT_LOCAL_BATCH_DIR = ".cache/batches"
+
+# Pre-LLM text compaction (see src/utilities/text_compaction.py)
+DEFAULT_TEXT_TOKEN_BUDGET = 6000
+DEFAULT_JD_TEXT_TOKEN_BUDGET = 3000
+# Repeated lines at least this long are treated as OCR duplicates
+DEFAULT_MIN_DUPLICATE_LINE_CHARS = 25
+
+# Vision extraction of scanned CVs (see src/services/vision_extraction_service.py).
+# Documents of at most this many pages, all scanned, go to the vision model
+# in one request; longer ones take the OCR path
+DEFAULT_VISION_MAX_PAGES = 4
+# Pages are rendered at a low DPI and then sized to what the API would
+# downscale them to for each detail level, so no pixels are uploaded only
+# to be thrown away
+DEFAULT_VISION_RENDER_DPI = 110
+DEFAULT_VISION_JPEG_QUALITY = 70
+DEFAULT_VISION_FIDELITY = "high"
+# Prompt tokens billed per image: "low" is a flat 85; "high" is 85 + 170 per
+# 512px tile, 4 tiles for a portrait page sized to 768px wide
+VISION_IMAGE_TOKEN_ESTIMATES = {"low": 85, "high": 765}
+
+# Local ATS scoring (see src/utilities/ats_scorer.py); weights follow
+# ATS_SCORE_SYSTEM_PROMPT
+ATS_SCORE_WEIGHTS = {"skills": 0.5, "experience": 0.3, "education": 0.2}
+# Similarity at which a requirement counts as met by a CV item
+ATS_MATCH_THRESHOLDS = {"skills": 0.6, "experience": 0.45, "education": 0.5}
+DEFAULT_ATS_NGRAM_SIZES = (3, 4)
+# CVs scored per block, bounding the similarity matrices held in memory
+DEFAULT_ATS_SCORING_BLOCK_SIZE = 512
+
+# Job recommendation index (see src/services/job_index.py)
+# UserSettings.date_posted values and their windows in days (None: no limit)
+DATE_POSTED_WINDOWS = {
+    "today": 1,
+    "past_3_days": 3,
+    "past_week": 7,
+    "past_month": 30,
+    "any": None,
+}
+DEFAULT_JOB_INDEX_CAPACITY = 1024
+# A target-role word matching a posting title counts this many skill matches
+JOB_TITLE_TERM_WEIGHT = 2.0
+DEFAULT_JOB_RECOMMENDATIONS = 10
+
+# Embeddings and vector search (see src/utilities/vector_store.py)
+DEFAULT_EMBEDDING_DIM = 256
+DEFAULT_VECTOR_STORE_DIR = ".cache/vectors"
+DEFAULT_IVF_NPROBE = 8
+# The IVF index is trained once this many vectors are stored, and retrained
+# whenever the store has grown by DEFAULT_IVF_RETRAIN_GROWTH since
+DEFAULT_IVF_TRAIN_MIN_VECTORS = 2048
+DEFAULT_IVF_RETRAIN_GROWTH = 4.0
+
+# Local skill extraction (see src/utilities/skill_matcher.py)
+DEFAULT_SKILLS_AUTOMATON_PATH = ".cache/skills_automaton.json"
+
+# Serper search client (see src/services/search_service.py)
+DEFAULT_SEARCH_CONCURRENCY = 8
+DEFAULT_SEARCH_TIMEOUT_SECONDS = 10.0
+DEFAULT_SEARCH_CACHE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_SEARCH_CACHE_MAX_ENTRIES = 10_000
+DEFAULT_SEARCH_RESULTS_PER_QUERY = 5
@@ -1,24 +1,182 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
 import fastapi
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from src.app import Pipeline
+from src.services.ats_service import ATSservice
+from src.services.document_service import DocumentService
+from src.services.resume_job_service import JobQueueFullError, ResumeJobManager
+from src.utilities.tracing import render_metrics
+from src.utilities.upload_buffer import SpooledUpload, UploadTooLargeError
 
-app = FastAPI()
+# One pipeline shared by every request and background job: uploads benefit
+# from the same OCR cache and worker pool, and LLM calls share the per-model
+# rate limits
+document_service = DocumentService()
+pipeline = Pipeline(document_service=document_service, ats_service=ATSservice())
+job_manager = ResumeJobManager(pipeline_factory=lambda: pipeline)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    document_service.text_extractor.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def read_main():
     return {"message": "Welcome to the Job recommendation system!"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Stage latency histograms and LLM call/token counters in the Prometheus
+    text format. Spans only update in-memory counters; they are formatted
+    here, when scraped.
+    """
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 
 @app.post("/upload-resume/")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(
+    file: UploadFile = File(...),
+    jd_file: UploadFile = File(...),
+    fused: bool = False,
+):
+    """
+    Scores a resume against a job description. `?fused=true` extracts and
+    scores both documents in one LLM call, which is faster but scored by a
+    single pass over the raw text. It needs structured output, so that both
+    modes return the same shapes.
+    """
+    if fused and not pipeline.ats_service.structured_output:
+        raise HTTPException(
+            status_code=400,
+            detail="fused=true requires structured output (STRUCTURED_OUTPUT_ENABLED=true)",
+        )
     try:
-        file_location = f"temp/{file.filename}"
-        with open(file_location, "wb") as buffer:
-            buffer.write(await file.read())
-        
-        pipeline = Pipeline()
-        result = pipeline.process_resume(file_location)
+        # Uploads are streamed into bounded in-memory buffers and handed to
+        # the extractor as bytes; a temp file is only used (and removed on
+        # exit) when an upload is larger than the spool threshold
+        async with SpooledUpload(suffix=_suffix(file)) as cv_upload, \
+                SpooledUpload(suffix=_suffix(jd_file)) as jd_upload:
+            await cv_upload.read_from(file)
+            await jd_upload.read_from(jd_file)
+
+            result = await pipeline.process_resume(
+                cv_upload.source, jd_upload.source, fused=fused
+            )
         return {"subheadings": result}
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+
+@app.post("/extract-cv/stream/")
+async def stream_cv_extraction(file: UploadFile = File(...)):
+    """
+    Server-sent events with the fields of the extracted CV, each sent as soon
+    as the model has finished generating it, followed by a final `done`
+    event.
+    """
+    try:
+        async with SpooledUpload(suffix=_suffix(file)) as cv_upload:
+            await cv_upload.read_from(file)
+            ocr_text = await asyncio.get_running_loop().run_in_executor(
+                None, document_service.extract_text, cv_upload.source
+            )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if not ocr_text:
+        raise HTTPException(status_code=422, detail="No text extracted from resume.")
+
+    async def event_stream():
+        try:
+            async for field, value in pipeline.ats_service.stream_cv_items(ocr_text):
+                yield f"data: {json.dumps({'field': field, 'value': value})}\n\n"
+            yield f"data: {json.dumps({'done': True})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/resume-jobs/", status_code=202)
+async def submit_resume_job(
+    file: UploadFile = File(...), jd_file: UploadFile = File(...)
+):
+    """Queues a CV/JD pair for background processing and returns its id."""
+    # Once submitted, the job manager owns the spooled uploads (and removes
+    # them after the job has run); until then they are ours to close
+    cv_upload = SpooledUpload(suffix=_suffix(file))
+    jd_upload = SpooledUpload(suffix=_suffix(jd_file))
+    submitted = False
+    try:
+        await cv_upload.read_from(file)
+        await jd_upload.read_from(jd_file)
+        job = job_manager.submit(cv_upload, jd_upload)
+        submitted = True
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    finally:
+        if not submitted:
+            await cv_upload.close()
+            await jd_upload.close()
+
+    return {"job_id": job.job_id, "status": job.status}
+
+
+@app.get("/resume-jobs/{job_id}")
+async def get_resume_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    return job.model_dump(exclude={"result"})
+
+
+@app.get("/resume-jobs/{job_id}/result")
+async def get_resume_job_result(job_id: str):
+    job = _get_job_or_404(job_id)
+    if not job.status.is_finished:
+        # Not ready yet: tell the client to keep polling
+        return JSONResponse(
+            status_code=202, content={"job_id": job_id, "status": job.status.value}
+        )
+    if job.error is not None:
+        return {"job_id": job_id, "status": job.status, "error": job.error}
+    return {"job_id": job_id, "status": job.status, "result": job.result}
+
+
+@app.get("/resume-jobs/{job_id}/events")
+async def stream_resume_job_events(job_id: str):
+    """Server-sent events with the job's stage progress until it finishes."""
+    _get_job_or_404(job_id)
+
+    async def event_stream():
+        async for event in job_manager.events(job_id):
+            yield f"data: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+def _suffix(file: UploadFile) -> str:
+    return os.path.splitext(file.filename or "")[1].lower()
@@ -0,0 +1,35 @@
+# Manual check of the Serper video search. Uses SERPER_API_KEY from the
+# environment; with --fake it runs against a local stand-in instead.
+#
+#   python serper_search_check.py "machine learning" docker --fake
+import asyncio
+import sys
+
+from config import SERPER_API_KEY
+from src.services.search_service import SearchService
+from src.utilities.fake_serper_server import FakeSerperServer
+
+
+async def main(skills, base_url=None):
+    kwargs = {"base_url": base_url} if base_url else {}
+    async with SearchService(**kwargs) as service:
+        tutorials = await asyncio.gather(
+            *(service.get_youtube_tutorials(skill) for skill in skills)
+        )
+        for skill, links in zip(skills, tutorials):
+            print(f"\nYouTube tutorials for {skill}:")
+            for link in links:
+                print(" ", link)
+        print("\n", service.stats())
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--fake"]
+    skills = args or ["machine learning", "Python"]
+    if "--fake" in sys.argv:
+        with FakeSerperServer(latency_seconds=0.1) as server:
+            asyncio.run(main(skills, server.base_url))
+    elif not SERPER_API_KEY:
+        sys.exit("Set SERPER_API_KEY or pass --fake")
+    else:
+        asyncio.run(main(skills))
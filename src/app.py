@@ -1,40 +1,186 @@
 import asyncio
 import sys
+import time
+from typing import Callable, Optional
+from config import CV_EXTRACTION_MODE
 from src.services.ats_service import ATSservice
 from src.services.document_service import DocumentService
+from src.services.vision_extraction_service import VISION_ROUTE, VisionExtractionService
+from src.utilities.tracing import observe_stage, span
 
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+class PipelineError(Exception):
+    """Raised by `Pipeline.process_resume` when `raise_errors` is set."""
+
+
+async def _gather_or_cancel(*awaitables):
+    """`asyncio.gather`, but a failure cancels the other awaitables instead of
+    leaving them running in the background."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 class Pipeline:
-    def __init__(self):
-        self.document_service = DocumentService()
-        self.ats_service = ATSservice()
+    def __init__(
+        self,
+        document_service: Optional[DocumentService] = None,
+        ats_service: Optional[ATSservice] = None,
+        vision_service: Optional[VisionExtractionService] = None,
+        cv_extraction_mode: str = CV_EXTRACTION_MODE,
+    ):
+        if cv_extraction_mode not in ("ocr", "vision", "auto"):
+            raise ValueError(
+                f"Invalid CV extraction mode {cv_extraction_mode!r}, "
+                "expected 'ocr', 'vision' or 'auto'"
+            )
+        self.document_service = document_service or DocumentService()
+        self.ats_service = ats_service or ATSservice()
+        self._vision_service = vision_service
+        self.cv_extraction_mode = cv_extraction_mode
 
-    async def process_resume(self, file_path, jd_path):
-        try:
-            ocr_text = self.document_service.extract_text(file_path)
+    @property
+    def vision_service(self) -> VisionExtractionService:
+        # Built on first use, so "ocr" mode never creates its generator
+        if self._vision_service is None:
+            self._vision_service = VisionExtractionService(
+                self.document_service.text_extractor
+            )
+        return self._vision_service
+
+    async def process_resume(
+        self,
+        file_path,
+        jd_path,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        raise_errors: bool = False,
+        fused: bool = False,
+    ):
+        """Runs the CV and JD through OCR and the ATS service. Each document
+        may be given as a path or as its raw bytes.
+
+        The CV and JD are independent until scoring, so they are processed
+        concurrently: each is OCRed in the default executor (keeping the
+        event loop free) and then extracted by the LLM; only the ATS scoring
+        waits on both. Depending on `cv_extraction_mode`, a scanned CV may
+        instead go straight to the vision model in one call (the
+        "cv_vision_extraction" stage). Returns the extracted items, the ATS
+        score and the wall-clock seconds spent in each stage. Stage timings
+        are also recorded in the /metrics histograms (see tracing.py).
+
+        With `fused`, both documents are OCRed and then extracted and scored
+        by a single LLM call (the "fused_extraction_scoring" stage) instead
+        of three; vision extraction is not used in this mode, and the ATS
+        service must have structured output enabled.
+
+        `progress_callback` is called with the name of each stage as it
+        starts. By default failures are returned as a message string; with
+        `raise_errors` they are raised as `PipelineError` instead."""
+        def report(stage):
+            if progress_callback:
+                progress_callback(stage)
+
+        timings = {}
+
+        async def timed(stage, awaitable):
+            report(stage)
+            start = time.perf_counter()
+            try:
+                with span(stage):
+                    return await awaitable
+            finally:
+                timings[stage] = round(time.perf_counter() - start, 4)
+
+        loop = asyncio.get_running_loop()
+
+        async def extract_cv():
+            if await self._use_vision(file_path):
+                return await timed(
+                    "cv_vision_extraction",
+                    self.vision_service.extract_cv_items(file_path),
+                )
+            ocr_text = await ocr_cv()
+            return await timed(
+                "cv_extraction", self.ats_service.extract_cv_items(ocr_text)
+            )
+
+        async def ocr_cv():
+            ocr_text = await timed("cv_ocr", loop.run_in_executor(
+                None, self.document_service.extract_text, file_path
+            ))
             if not ocr_text:
-                return "No text extracted from resume."
+                raise PipelineError("No text extracted from resume.")
+            return ocr_text
 
-            jd_text = self.document_service.extract_text(jd_path)
+        async def ocr_jd():
+            jd_text = await timed("jd_ocr", loop.run_in_executor(
+                None, self.document_service.extract_text, jd_path
+            ))
             if not jd_text:
-                return "No text extracted from job description."
+                raise PipelineError("No text extracted from job description.")
+            return jd_text
 
-            cv_items = await self.ats_service.extract_cv_items(ocr_text)
-            return cv_items
-            #print(cv_items)
-            #jd_items = await self.ats_service.extract_jd_items(jd_text)
-           
-            #ats_score = await self.ats_service.generate_ats_score(cv_items, jd_items)
+        async def extract_jd():
+            jd_text = await ocr_jd()
+            return await timed(
+                "jd_extraction", self.ats_service.extract_jd_items(jd_text)
+            )
 
-            #return ats_score
+        try:
+            started = time.perf_counter()
+            if fused and not self.ats_service.structured_output:
+                raise PipelineError("Fused mode requires structured output.")
+            if fused:
+                ocr_text, jd_text = await _gather_or_cancel(ocr_cv(), ocr_jd())
+                result = await timed(
+                    "fused_extraction_scoring",
+                    self.ats_service.fused_extract_and_score(ocr_text, jd_text),
+                )
+            else:
+                cv_items, jd_items = await _gather_or_cancel(
+                    extract_cv(), extract_jd()
+                )
+                ats_score = await timed(
+                    "ats_scoring",
+                    self.ats_service.generate_ats_score(cv_items, jd_items),
+                )
+                result = {
+                    "cv_items": cv_items,
+                    "jd_items": jd_items,
+                    "ats_score": ats_score,
+                }
+
+            timings["total"] = round(time.perf_counter() - started, 4)
+            observe_stage("total", timings["total"])
+            return {**result, "timings": timings}
+
+        except PipelineError as e:
+            if raise_errors:
+                raise
+            return str(e)
 
         except Exception as e:
+            if raise_errors:
+                raise PipelineError(f"Error processing resume: {e}") from e
             return f"Error processing resume: {e}"
 
+    async def _use_vision(self, file_path) -> bool:
+        if self.cv_extraction_mode == "ocr":
+            return False
+        if self.cv_extraction_mode == "vision":
+            return True
+        route = await asyncio.to_thread(self.vision_service.route, file_path)
+        return route == VISION_ROUTE
+
 
 if __name__ == "__main__":
     pipeline = Pipeline()
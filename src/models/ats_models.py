@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 
+from src.models.cv_models import CVParsedData
+
 
 class GapAnalysis(BaseModel):
     missing_skill: str
@@ -12,3 +14,17 @@ class ATSResult(BaseModel):
     strengths: List[str]
     gaps: List[GapAnalysis]
     youtube_recommendations: Optional[List[dict]] = []
+
+class JobRequirements(BaseModel):
+    """Requirements extracted from a job description, keyed like the JD prompt's JSON."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    education: List[str] = Field(default=[], alias="Education")
+    experience: List[str] = Field(default=[], alias="Experience")
+    skills: List[str] = Field(default=[], alias="Skills")
+
+class FusedATSResult(BaseModel):
+    """CV and JD extraction plus the ATS score, produced by one call."""
+    cv: CVParsedData
+    jd: JobRequirements
+    ats: ATSResult
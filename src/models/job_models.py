@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
@@ -12,3 +13,13 @@ class JobRecommendation(BaseModel):
     company: str
     apply_link: str
     match_reason: str
+
+class JobPosting(BaseModel):
+    job_id: str
+    job_title: str
+    company: str
+    apply_link: str
+    location: str = "Remote"
+    salary: Optional[int] = None
+    date_posted: datetime = Field(default_factory=datetime.now)
+    skills: List[str] = []
@@ -0,0 +1,34 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class ResumeJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    @property
+    def is_finished(self) -> bool:
+        return self in (ResumeJobStatus.COMPLETED, ResumeJobStatus.FAILED)
+
+
+class ResumeJobEvent(BaseModel):
+    status: ResumeJobStatus
+    stage: Optional[str] = Field(
+        default=None, description="Pipeline stage that just started"
+    )
+    timestamp: float
+
+
+class ResumeJob(BaseModel):
+    job_id: str
+    status: ResumeJobStatus = ResumeJobStatus.QUEUED
+    stage: Optional[str] = None
+    events: List[ResumeJobEvent] = []
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
@@ -1,28 +1,105 @@
+import json
 from openai import OpenAI
-from src.services.prompts.extraction_prompt import SYSTEM_PROMPT,USER_PROMPT
-from constants import GPT_Model
-from src.models.ats_models import ATSResult
+from pydantic import BaseModel
+from src.services.prompts.extraction_prompt import SYSTEM_PROMPT, USER_PROMPT, STRUCTURED_SYSTEM_PROMPT
+from constants import GPT_Model, DEFAULT_JD_TEXT_TOKEN_BUDGET, DEFAULT_TEXT_TOKEN_BUDGET
+from src.models.ats_models import ATSResult, FusedATSResult, JobRequirements
+from src.models.cv_models import CVParsedData
 from src.utilities.openai_llm_utils import OpenAI_Text_Config, OpenAITextGenerator
+from src.utilities.llm_cache import LLMResponseCache
+from src.utilities.openai_batch import BatchBackend, create_batch_backend
+from src.utilities.text_compaction import TextCompactor, combine_compactions
+from src.utilities.incremental_json import IncrementalJSONParser
+from src.utilities.ats_scorer import LocalATSScorer
+from src.utilities.model_router import ModelRouter
+from src.utilities.tracing import span
+from config import LLM_CACHE_ENABLED, MODEL_ROUTING_ENABLED, STRUCTURED_OUTPUT_ENABLED
 from src.services.prompts.jd_prompts import JD_SYSTEM_PROMPT,JD_USER_PROMPT
-from src.services.prompts.ats_score_prompt import ATS_SCORE_SYSTEM_PROMPT
+from src.services.prompts.fused_prompt import FUSED_SYSTEM_PROMPT, FUSED_USER_PROMPT
+from src.services.prompts.ats_score_prompt import (
+    ATS_RESULT_SYSTEM_PROMPT,
+    ATS_SCORE_SYSTEM_PROMPT,
+    ATS_SCORE_USER_PROMPT,
+)
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 from dotenv import load_dotenv
 load_dotenv()
 
 class ATSservice:
-    def __init__(self):
+    def __init__(
+        self,
+        cache: LLMResponseCache = None,
+        batch_backend: BatchBackend = None,
+        structured_output: bool = STRUCTURED_OUTPUT_ENABLED,
+        model_routing: bool = MODEL_ROUTING_ENABLED,
+    ):
+       if cache is None and LLM_CACHE_ENABLED:
+           cache = LLMResponseCache()
+       self.cache = cache
+       self.batch_backend = batch_backend
+       # Return CVParsedData/ATSResult models instead of the raw JSON text.
+       # Routing escalates on invalid output, so it implies structured output
+       self.structured_output = structured_output or model_routing
+       self.local_scorer = LocalATSScorer()
+       model = GPT_Model.GPT_40_MINI.value
+       # OCR output is compacted and capped before it reaches the prompt
+       self.cv_compactor = TextCompactor(max_tokens=DEFAULT_TEXT_TOKEN_BUDGET, model=model)
+       self.jd_compactor = TextCompactor(max_tokens=DEFAULT_JD_TEXT_TOKEN_BUDGET, model=model)
        self.ai_generator = OpenAITextGenerator(
            config=OpenAI_Text_Config(
-               model=GPT_Model.GPT_40_MINI.value,
-           )
+               model=model,
+           ),
+           cache=cache,
          )
+       # Structured calls go to the cheapest model tier that fits them (see
+       # src/utilities/model_router.py); the other calls stay on gpt-4o-mini
+       self.model_router: Optional[ModelRouter] = (
+           ModelRouter(self._generator_for) if model_routing else None
+       )
+
+    def _generator_for(self, model: str) -> OpenAITextGenerator:
+        if model == self.ai_generator.config.model:
+            return self.ai_generator
+        return OpenAITextGenerator(
+            config=OpenAI_Text_Config(model=model), cache=self.cache
+        )
+
+    async def _generate_structured(self, task, output_model, system_prompt, user_prompt, compaction=None):
+        """A structured call, routed across the model tiers when routing is on."""
+        if self.model_router is not None:
+            return await self.model_router.generate_structured(
+                task,
+                user_prompt=user_prompt,
+                output_model=output_model,
+                system_prompt=system_prompt,
+                compaction=compaction,
+                document_text=compaction["text"] if compaction else None,
+            )
+        return await self.ai_generator.async_generate_structured(
+            user_prompt=user_prompt,
+            output_model=output_model,
+            system_prompt=system_prompt,
+            compaction=compaction,
+        )
 
     async def extract_cv_items(self, ocr_text):
         try: 
+            compaction = self.cv_compactor.compact(ocr_text)
+            if self.structured_output:
+                response = await self._generate_structured(
+                    "cv_extraction",
+                    CVParsedData,
+                    system_prompt=STRUCTURED_SYSTEM_PROMPT,
+                    user_prompt=USER_PROMPT.format(raw_text=compaction["text"]),
+                    compaction=compaction,
+                )
+                return response["response"]
+
             response = await self.ai_generator.async_generate_response(
                 system_prompt=SYSTEM_PROMPT,
-                user_prompt=USER_PROMPT.format(raw_text=ocr_text),
-                # response_model=ATSResult
+                user_prompt=USER_PROMPT.format(raw_text=compaction["text"]),
+                compaction=compaction,
             )
             
             return response["response"]
@@ -30,12 +107,38 @@ class ATSservice:
         except Exception as e:
             raise e
         
+    async def stream_cv_items(self, ocr_text) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streams the CV extraction and yields each top-level field (Name,
+        Skills, Experience, ...) as soon as the model has finished writing it.
+        """
+        compaction = self.cv_compactor.compact(ocr_text)
+        parser = IncrementalJSONParser()
+        async for delta in self.ai_generator.async_stream_response(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=USER_PROMPT.format(raw_text=compaction["text"]),
+        ):
+            for field in parser.feed(delta):
+                yield field
+
     async  def extract_jd_items(self, jd_text):
         try: 
+            compaction = self.jd_compactor.compact(jd_text)
+            if self.structured_output:
+                response = await self._generate_structured(
+                    "jd_extraction",
+                    JobRequirements,
+                    system_prompt=JD_SYSTEM_PROMPT,
+                    user_prompt=JD_USER_PROMPT.format(jd_text=compaction["text"]),
+                    compaction=compaction,
+                )
+                # Keyed like the unstructured JSON ("Education", ...)
+                return response["response"].model_dump(by_alias=True)
+
             response = await self.ai_generator.async_generate_response(
                 system_prompt=JD_SYSTEM_PROMPT,
-                user_prompt=JD_USER_PROMPT.format(jd_text=jd_text),
-                
+                user_prompt=JD_USER_PROMPT.format(jd_text=compaction["text"]),
+                compaction=compaction,
             )
             
             return response["response"]
@@ -45,17 +148,18 @@ class ATSservice:
 
     async def generate_ats_score(self, cv_data, jd_data):
         try:
-            user_prompt = f"""
-            CV DATA:
-            {cv_data}
-
-            JOB DESCRIPTION DATA:
-            {jd_data}
-            """
+            if self.structured_output:
+                response = await self._generate_structured(
+                    "ats_scoring",
+                    ATSResult,
+                    system_prompt=ATS_RESULT_SYSTEM_PROMPT,
+                    user_prompt=self._ats_score_user_prompt(cv_data, jd_data),
+                )
+                return response["response"]
 
             response = await self.ai_generator.async_generate_response(
                 system_prompt=ATS_SCORE_SYSTEM_PROMPT,
-                user_prompt=user_prompt,
+                user_prompt=self._ats_score_user_prompt(cv_data, jd_data),
                 
             )
 
@@ -64,5 +168,147 @@ class ATSservice:
         except Exception as e:
             raise e
        
-    def calculate_score(self):
-        pass
+    async def fused_extract_and_score(self, ocr_text, jd_text) -> dict:
+        """
+        Extracts the CV and JD items and scores them in one structured call,
+        instead of the two extraction calls and the scoring call (which
+        re-sends both extractions). Meant for interactive uploads, where the
+        round trips dominate latency.
+
+        Only available with structured output, so that both paths return
+        the same shapes.
+
+        Returns:
+            dict: "cv_items", "jd_items" and "ats_score", shaped like the
+            results of `extract_cv_items`, `extract_jd_items` and
+            `generate_ats_score` with structured output.
+
+        Raises:
+            ValueError: If structured output is off.
+        """
+        if not self.structured_output:
+            raise ValueError(
+                "Fused extraction requires structured output "
+                "(set STRUCTURED_OUTPUT_ENABLED=true)"
+            )
+        cv_compaction = self.cv_compactor.compact(ocr_text)
+        jd_compaction = self.jd_compactor.compact(jd_text)
+        response = await self._generate_structured(
+            "fused",
+            FusedATSResult,
+            system_prompt=FUSED_SYSTEM_PROMPT,
+            user_prompt=FUSED_USER_PROMPT.format(
+                raw_text=cv_compaction["text"], jd_text=jd_compaction["text"]
+            ),
+            compaction=combine_compactions(cv_compaction, jd_compaction),
+        )
+        result = response["response"]
+        return {
+            "cv_items": result.cv,
+            "jd_items": result.jd.model_dump(by_alias=True),
+            "ats_score": result.ats,
+        }
+
+    async def batch_extract_cv_items(self, ocr_texts: Dict[str, str], **batch_kwargs):
+        """
+        Extracts the items of many CVs in one batch job, keyed like
+        `ocr_texts`. Meant for bulk offline scoring where latency does not
+        matter; returns {"responses": {...}, "errors": {...}} with each
+        response parsed from the JSON-mode reply.
+        """
+        requests = [
+            self.ai_generator.build_batch_request(
+                custom_id=key,
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=USER_PROMPT.format(
+                    raw_text=self.cv_compactor.compact(ocr_text)["text"]
+                ),
+                json_response=True,
+            )
+            for key, ocr_text in ocr_texts.items()
+        ]
+        return await self._run_batch(requests, **batch_kwargs)
+
+    async def batch_generate_ats_score(self, pairs: Dict[str, Tuple[str, str]], **batch_kwargs):
+        """Scores many (cv_data, jd_data) pairs in one batch job."""
+        requests = [
+            self.ai_generator.build_batch_request(
+                custom_id=key,
+                system_prompt=ATS_SCORE_SYSTEM_PROMPT,
+                user_prompt=self._ats_score_user_prompt(cv_data, jd_data),
+                json_response=True,
+            )
+            for key, (cv_data, jd_data) in pairs.items()
+        ]
+        return await self._run_batch(requests, **batch_kwargs)
+
+    async def _run_batch(self, requests, **batch_kwargs):
+        if self.batch_backend is None:
+            self.batch_backend = create_batch_backend()
+        result = await self.ai_generator.async_run_batch(
+            requests, self.batch_backend, json_response=True, **batch_kwargs
+        )
+        return {
+            "responses": {
+                key: response["response"]
+                for key, response in result["responses"].items()
+            },
+            "errors": result["errors"],
+        }
+
+    def structured_output_stats(self) -> dict:
+        """How many structured responses were valid, repaired or re-requested."""
+        generators = [self.ai_generator]
+        if self.model_router is not None:
+            generators += [
+                generator for generator in self.model_router.generators
+                if generator is not self.ai_generator
+            ]
+        totals = {}
+        for generator in generators:
+            for name, count in generator.structured_stats.as_dict().items():
+                totals[name] = totals.get(name, 0) + count
+        return totals
+
+    def routing_stats(self, decisions: bool = False) -> Optional[dict]:
+        """
+        Where routed calls started and finished, how often and why they
+        escalated, and the tokens spent per model; None when routing is off.
+        With `decisions`, the recent individual decisions are included.
+        """
+        if self.model_router is None:
+            return None
+        return self.model_router.stats.as_dict(decisions=decisions)
+
+    # Prompt layout: the provider caches prompt prefixes, so every request
+    # starts with the static system prompt (instructions and JSON schema)
+    # followed by static instructions, and the per-request data always comes
+    # last. Keep the templates byte-identical between requests (no
+    # timestamps, ids or varying whitespace before the data).
+    @staticmethod
+    def _ats_score_user_prompt(cv_data, jd_data):
+        return ATS_SCORE_USER_PROMPT.format(
+            cv_data=_prompt_data(cv_data), jd_data=_prompt_data(jd_data)
+        )
+
+    def calculate_score(self, cv_data, jd_data) -> dict:
+        """
+        Scores a CV against a job description locally, without an LLM call.
+        Takes the extracted items (dicts, pydantic models or JSON strings) and
+        returns the same JSON shape as `generate_ats_score`.
+        """
+        with span("local_scoring"):
+            return self.local_scorer.score(cv_data, jd_data)
+
+    def calculate_scores(self, cvs: Sequence, jds: Sequence) -> List[List[dict]]:
+        """Scores every CV against every job description (an N x M grid)."""
+        return self.local_scorer.score_batch(cvs, jds)
+
+
+def _prompt_data(data) -> str:
+    """Extracted items as prompt text; the same data always gives the same text."""
+    if isinstance(data, BaseModel):
+        return data.model_dump_json()
+    if isinstance(data, (dict, list)):
+        return json.dumps(data, ensure_ascii=False)
+    return str(data).strip()
@@ -1,24 +1,43 @@
+from config import OCR_PRESET
 from src.models.cv_models import CVParsedData
+from src.utilities.ocr_cache import OCRCache
 from src.utilities.text_extractor import TextExtractor
 from src.utilities.skills_prompt import build_skills_prompt
 #from src.services.skills_extraction import extract_skills
 import re
 
 class DocumentService:
-    def __init__(self):
-        pass
+    def __init__(self, text_extractor: TextExtractor = None):
+        # One extractor (and cache) for the lifetime of the service, so
+        # re-uploaded documents are served from the OCR cache
+        self.text_extractor = text_extractor or TextExtractor.from_preset(
+            OCR_PRESET, cache=OCRCache(), parallel=True
+        )
 
     def extract_text(self, file_path):
         """Extract text from a document using OCR."""
         try:
-            text_extractor = TextExtractor()
-            raw_text = text_extractor.extract_text(file_path)
+            raw_text = self.text_extractor.extract_text(file_path)
             #jd_text=text_extractor.extract_text(jd_path)
             return raw_text
             
         except Exception as e:
             print(f"Error in DocumentService: {e}")
             return None
+
+    def extract_text_with_details(self, file_path):
+        """Extract text along with the extraction path taken by each page."""
+        try:
+            return self.text_extractor.extract_text_with_details(file_path)
+
+        except Exception as e:
+            print(f"Error in DocumentService: {e}")
+            return None
+
+    def cache_stats(self):
+        """Hit/miss counters of the OCR cache, if one is configured."""
+        cache = self.text_extractor.cache
+        return cache.stats() if cache else None
         
     
 
@@ -0,0 +1,299 @@
+import math
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from constants import (
+    DATE_POSTED_WINDOWS,
+    DEFAULT_JOB_INDEX_CAPACITY,
+    DEFAULT_JOB_RECOMMENDATIONS,
+    JOB_TITLE_TERM_WEIGHT,
+)
+from logger import loggerUtils as logger
+from src.models.job_models import JobPosting, JobRecommendation, UserSettings
+from src.utilities.ats_scorer import ScorerInput, extract_items, normalize_item
+
+# Location preferences that do not filter anything
+ANY_LOCATION = {"", "any", "anywhere"}
+
+_TITLE_STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with"}
+_LOCATION_SPLIT_RE = re.compile(r"[,/|()]+|\s+-\s+")
+
+
+class _PostingList:
+    """Growable array of slot ids, in no particular order."""
+
+    def __init__(self) -> None:
+        self._ids = np.empty(8, dtype=np.int32)
+        self.size = 0
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.size]
+
+    def append(self, slot: int) -> None:
+        if self.size == len(self._ids):
+            self._ids = np.concatenate([self._ids, np.empty_like(self._ids)])
+        self._ids[self.size] = slot
+        self.size += 1
+
+    def discard(self, slot: int) -> None:
+        """Removes a slot by moving the last id into its place."""
+        (position,) = np.flatnonzero(self.ids == slot)
+        self.size -= 1
+        self._ids[position] = self._ids[self.size]
+        if len(self._ids) > 8 and self.size * 4 <= len(self._ids):
+            self._ids = self._ids[:len(self._ids) // 2].copy()
+
+
+class JobPostingIndex:
+    """
+    In-memory index of job postings answering filtered top-k queries.
+
+    Postings get a slot in column arrays (salary, posting time, alive flag)
+    and are added to an inverted index of their normalised skills and
+    title words. Each location (the full string and its comma separated
+    parts, so "Germany" matches "Berlin, Germany") has a packed bitmap over
+    the slots.
+
+    A query adds up the IDF weights of the postings matching the CV's
+    skills and the target role's words, masks out the postings failing the
+    location bitmap and the salary and recency columns (all contiguous
+    vectorised operations) and keeps the k best. Removing a posting takes
+    its slot out of its posting lists and location bitmaps and frees it
+    for the next posting added, so the arrays stay as large as the most
+    postings ever indexed at once and neither adding nor removing ever
+    rebuilds the index.
+
+    Postings without a salary pass the `min_salary` filter.
+
+    Args:
+        capacity (int): Initial number of slots; grows by doubling.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_JOB_INDEX_CAPACITY) -> None:
+        # Multiple of 8 so the packed location bitmaps cover every slot
+        self._capacity = max(8, -(-capacity // 8) * 8)
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._salary = np.full(self._capacity, -1, dtype=np.int64)
+        self._posted_at = np.zeros(self._capacity, dtype=np.float64)
+        self._size = 0
+
+        self._postings: List[Optional[JobPosting]] = []
+        self._slot_terms: List[Set[str]] = []
+        self._free_slots: List[int] = []
+        self._slots: Dict[str, int] = {}
+        self._terms: Dict[str, _PostingList] = {}
+        self._location_bitmaps: Dict[str, np.ndarray] = {}
+        # Postings per location key, so empty bitmaps can be dropped
+        self._location_counts: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._slots
+
+    def add(self, posting: JobPosting) -> None:
+        """Adds a posting, replacing any posting with the same `job_id`."""
+        with self._lock:
+            self.remove(posting.job_id)
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                if self._size == self._capacity:
+                    self._grow()
+                slot = self._size
+                self._size += 1
+                self._postings.append(None)
+                self._slot_terms.append(set())
+
+            self._alive[slot] = True
+            self._salary[slot] = -1 if posting.salary is None else posting.salary
+            self._posted_at[slot] = posting.date_posted.timestamp()
+            self._postings[slot] = posting
+            self._slots[posting.job_id] = slot
+
+            terms = posting_terms(posting)
+            self._slot_terms[slot] = terms
+            for term in terms:
+                self._terms.setdefault(term, _PostingList()).append(slot)
+
+            for key in location_keys(posting.location):
+                bitmap = self._location_bitmaps.get(key)
+                if bitmap is None:
+                    bitmap = np.zeros(self._capacity // 8, dtype=np.uint8)
+                    self._location_bitmaps[key] = bitmap
+                bitmap[slot >> 3] |= np.uint8(0x80 >> (slot & 7))
+                self._location_counts[key] = self._location_counts.get(key, 0) + 1
+
+    def add_many(self, postings: Iterable[JobPosting]) -> None:
+        with self._lock:
+            for posting in postings:
+                self.add(posting)
+
+    def remove(self, job_id: str) -> bool:
+        """Removes a posting; returns whether it was indexed."""
+        with self._lock:
+            slot = self._slots.pop(job_id, None)
+            if slot is None:
+                return False
+
+            posting = self._postings[slot]
+            self._alive[slot] = False
+            self._postings[slot] = None
+            for term in self._slot_terms[slot]:
+                posting_list = self._terms[term]
+                posting_list.discard(slot)
+                if posting_list.size == 0:
+                    del self._terms[term]
+            self._slot_terms[slot] = set()
+
+            for key in location_keys(posting.location):
+                self._location_counts[key] -= 1
+                if self._location_counts[key] == 0:
+                    del self._location_counts[key]
+                    del self._location_bitmaps[key]
+                else:
+                    self._location_bitmaps[key][slot >> 3] &= np.uint8(
+                        ~(0x80 >> (slot & 7)) & 0xFF
+                    )
+            self._free_slots.append(slot)
+            return True
+
+    def search(
+        self,
+        cv_data: ScorerInput,
+        settings: UserSettings,
+        k: int = DEFAULT_JOB_RECOMMENDATIONS,
+        now: Optional[float] = None,
+    ) -> List[JobRecommendation]:
+        """
+        Returns the k postings best matching the CV's skills and the target
+        role among those passing the location, salary and recency filters.
+        """
+        skills = {normalize_item(skill) for skill in extract_items(cv_data)["skills"]}
+        query = {f"skill:{skill}": 1.0 for skill in skills if skill}
+        for word in title_words(settings.target_role):
+            query[f"title:{word}"] = JOB_TITLE_TERM_WEIGHT
+
+        with self._lock:
+            slots, scores = self._top_k(query, settings, k, now)
+            return [
+                self._recommendation(slot, score, query)
+                for slot, score in zip(slots, scores)
+            ]
+
+    def _top_k(
+        self, query: Dict[str, float], settings: UserSettings, k: int, now: Optional[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        live_postings = max(1, len(self._slots))
+        scores = np.zeros(self._size, dtype=np.float32)
+        for term, weight in query.items():
+            posting_list = self._terms.get(term)
+            if posting_list is None:
+                continue
+            idf = math.log(1 + live_postings / posting_list.size)
+            # Slot ids are unique within a list, so fancy-index += is safe
+            scores[posting_list.ids] += weight * idf
+
+        candidates = np.flatnonzero(self._filter(settings, now) & (scores > 0))
+        if len(candidates) > k:
+            best = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[best]
+        # Ties go to the most recent posting
+        order = np.lexsort((-self._posted_at[candidates], -scores[candidates]))
+        candidates = candidates[order]
+        return candidates, scores[candidates]
+
+    def _filter(self, settings: UserSettings, now: Optional[float]) -> np.ndarray:
+        """Dense mask of the slots passing the settings' filters."""
+        size = self._size
+        mask = self._alive[:size].copy()
+
+        preference = normalize_location(settings.location_preference)
+        if preference not in ANY_LOCATION:
+            bitmap = self._location_bitmaps.get(preference)
+            if bitmap is None:
+                return np.zeros(size, dtype=bool)
+            mask &= np.unpackbits(bitmap, count=size).view(bool)
+
+        if settings.min_salary is not None:
+            salary = self._salary[:size]
+            mask &= (salary < 0) | (salary >= settings.min_salary)
+
+        window_days = DATE_POSTED_WINDOWS.get(settings.date_posted)
+        if window_days is not None:
+            cutoff = (now if now is not None else time.time()) - window_days * 86400
+            mask &= self._posted_at[:size] >= cutoff
+        return mask
+
+    def _recommendation(
+        self, slot: int, score: float, query: Dict[str, float]
+    ) -> JobRecommendation:
+        posting = self._postings[slot]
+        matched = self._slot_terms[slot].intersection(query)
+        skills = sorted(term[6:] for term in matched if term.startswith("skill:"))
+        title = sorted(term[6:] for term in matched if term.startswith("title:"))
+
+        reasons = []
+        if skills:
+            reasons.append(f"Matches {len(skills)} of your skills: {', '.join(skills)}")
+        if title:
+            reasons.append(f"Title matches {', '.join(title)}")
+        return JobRecommendation(
+            job_title=posting.job_title,
+            company=posting.company,
+            apply_link=posting.apply_link,
+            match_reason="; ".join(reasons) + f" (score {score:.2f})",
+        )
+
+    def _grow(self) -> None:
+        capacity = self._capacity * 2
+        logger.debug(f"Growing job index from {self._capacity} to {capacity} slots")
+        self._alive = _resize(self._alive, capacity, False)
+        self._salary = _resize(self._salary, capacity, -1)
+        self._posted_at = _resize(self._posted_at, capacity, 0.0)
+        for key, bitmap in self._location_bitmaps.items():
+            self._location_bitmaps[key] = _resize(bitmap, capacity // 8, 0)
+        self._capacity = capacity
+
+
+def posting_terms(posting: JobPosting) -> Set[str]:
+    terms = {f"skill:{normalize_item(skill)}" for skill in posting.skills}
+    terms.update(f"title:{word}" for word in title_words(posting.job_title))
+    terms.discard("skill:")
+    return terms
+
+
+def title_words(title: str) -> List[str]:
+    return [
+        word for word in normalize_item(title or "").split()
+        if word not in _TITLE_STOPWORDS
+    ]
+
+
+def normalize_location(location: str) -> str:
+    return " ".join((location or "").lower().split())
+
+
+def location_keys(location: str) -> Set[str]:
+    """The full location plus each of its parts ("Berlin, Germany" -> 3 keys)."""
+    full = normalize_location(location)
+    keys = {full} if full else set()
+    keys.update(
+        part for part in map(normalize_location, _LOCATION_SPLIT_RE.split(full)) if part
+    )
+    return keys
+
+
+def _resize(array: np.ndarray, size: int, fill) -> np.ndarray:
+    resized = np.full(size, fill, dtype=array.dtype)
+    resized[:len(array)] = array
+    return resized
@@ -29,4 +29,48 @@ Return STRICT JSON format:
 }
 
 Do not return anything outside JSON.
-"""
\ No newline at end of file
+"""
+
+ATS_RESULT_SYSTEM_PROMPT = """
+You are an intelligent ATS (Applicant Tracking System).
+
+Your task:
+Compare a CV and a Job Description, score the match and list the candidate's strengths and skill gaps.
+
+Scoring Rules:
+- Skills Match: 50%
+- Experience Match: 30%
+- Education Match: 20%
+
+Instructions:
+- Consider semantic similarity (e.g., ML = Machine Learning).
+- Consider relevant experience even if wording differs.
+- Be intelligent, not keyword-based.
+- For every requirement the candidate is missing, add a gap with its importance (High, Medium or Low) and a short YouTube search query for learning it.
+- Leave youtube_recommendations empty; it is filled in later.
+
+Return STRICT JSON format:
+
+{
+  "match_score": integer (0-100),
+  "strengths": [],
+  "gaps": [
+    {"missing_skill": "Skill", "importance_level": "High", "youtube_search_query": "skill tutorial for beginners"}
+  ],
+  "youtube_recommendations": []
+}
+
+Do not return anything outside JSON.
+"""
+
+
+# The CV comes before the JD: scoring one CV against many job descriptions
+# then also reuses the cached CV part of the prompt
+ATS_SCORE_USER_PROMPT = """Compare the following CV and job description according to your system instructions.
+
+CV DATA:
+{cv_data}
+
+JOB DESCRIPTION DATA:
+{jd_data}
+"""
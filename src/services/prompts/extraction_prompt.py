@@ -45,4 +45,36 @@ USER_PROMPT = """
 Extract the details from the following resume text according to your system instructions:
 
 {raw_text}
-"""
\ No newline at end of file
+"""
+
+# Shape of `CVParsedData`, shared by the structured and vision extraction
+# prompts
+CV_PARSED_DATA_FORMAT = """{
+  "contact_info": {"name": "Full Name", "email": "Email Address", "phone": "Phone Number", "location": "City, Country"},
+  "skills_technical": ["Skill 1", "Skill 2"],
+  "skills_soft": ["Skill 1"],
+  "experience": [
+    {
+      "company": "Name of Company",
+      "role": "Job Title",
+      "duration": "Start - End",
+      "achievements": ["Achievement 1", "Achievement 2"]
+    }
+  ],
+  "education": [
+    {"degree": "Degree", "institution": "School Name", "year": "Graduation Year"}
+  ]
+}"""
+
+STRUCTURED_SYSTEM_PROMPT = f"""
+You are an expert Resume Parsing AI. Your task is to extract the candidate's professional and academic details from the provided resume text into a strictly formatted JSON object.
+
+Rules for Extraction:
+1. Experience: Create an object for each job, with its achievements as separate short strings.
+2. Skills: Put tools, languages and technologies in skills_technical; interpersonal and other skills in skills_soft.
+3. Missing Data: Use empty strings, arrays or objects for anything not in the resume. Do not invent information.
+4. Clean Data: Remove bullet points, special characters and symbols. Provide only the clean, raw information.
+
+Return STRICTLY this JSON format and nothing else:
+{CV_PARSED_DATA_FORMAT}
+"""
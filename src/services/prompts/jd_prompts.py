@@ -6,8 +6,17 @@ You are an expert Job Description Parsing AI. Your task is to extract required e
   "Experience": [],
   "Skills": []
 }
+
+Rules for Extraction:
+- Education: List all required degrees or qualifications.
+- Experience: List required years or specific role experience.
+- Skills: List all required technical and soft skills.
+- If a category is not mentioned, leave the array empty [].
+- Output ONLY valid JSON. Do not include extra text, explanations, or markdown formatting.
 """
 
+# The job description comes last so every request shares the static prefix
+# above (see the prompt layout note in ats_service.py)
 JD_USER_PROMPT="""
 Extract the required education, experience, and skills from the following job description.
 
@@ -15,11 +24,4 @@ Job Description:
 \"\"\"
 {jd_text}
 \"\"\"
-
-Rules for Extraction:
-- Education: List all required degrees or qualifications.
-- Experience: List required years or specific role experience.
-- Skills: List all required technical and soft skills.
-- If a category is not mentioned, leave the array empty [].
-- Output ONLY valid JSON. Do not include extra text, explanations, or markdown formatting.
-"""
\ No newline at end of file
+"""
@@ -0,0 +1,234 @@
+import asyncio
+import time
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from constants import (
+    DEFAULT_RESUME_JOB_MAX_QUEUED_BYTES,
+    DEFAULT_RESUME_JOB_QUEUE_SIZE,
+    DEFAULT_RESUME_JOB_RETENTION_SECONDS,
+    DEFAULT_RESUME_JOB_WORKERS,
+)
+from logger import loggerUtils as logger
+from src.app import Pipeline, PipelineError
+from src.models.resume_job_models import ResumeJob, ResumeJobEvent, ResumeJobStatus
+from src.utilities.upload_buffer import SpooledUpload
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class ResumeJobManager:
+    """
+    Runs `Pipeline.process_resume` on a pool of background workers.
+
+    `submit` only enqueues the uploads and returns a job id immediately;
+    the status, per-stage progress and result of a job can then be polled
+    with `get` or followed with `events`. Finished jobs are kept for
+    `retention_seconds` before they are forgotten.
+
+    The queue holds the spooled uploads themselves rather than copies of
+    their bytes, so large uploads wait on disk, and it is bounded by their
+    total size as well as by the number of jobs.
+
+    Args:
+        workers (int): Number of jobs processed concurrently.
+        max_queue_size (int): Jobs waiting beyond this are rejected.
+        max_queued_bytes (int): Jobs whose uploads would take the waiting
+            uploads past this size are rejected (unless the queue is empty).
+        retention_seconds (float): How long finished jobs stay queryable.
+        pipeline_factory (Callable[[], Pipeline]): Returns the pipeline for a
+            job. Defaults to one pipeline shared by all jobs.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_RESUME_JOB_WORKERS,
+        max_queue_size: int = DEFAULT_RESUME_JOB_QUEUE_SIZE,
+        max_queued_bytes: int = DEFAULT_RESUME_JOB_MAX_QUEUED_BYTES,
+        retention_seconds: float = DEFAULT_RESUME_JOB_RETENTION_SECONDS,
+        pipeline_factory: Optional[Callable[[], Pipeline]] = None,
+    ) -> None:
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.max_queued_bytes = max_queued_bytes
+        self.retention_seconds = retention_seconds
+
+        if pipeline_factory is None:
+            pipeline = Pipeline()
+            pipeline_factory = lambda: pipeline
+        self.pipeline_factory = pipeline_factory
+
+        self._jobs: Dict[str, ResumeJob] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued_bytes = 0
+        self._worker_tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Starts the worker pool on the running event loop."""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"resume-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancels the workers; queued jobs that never started are dropped."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        while self._queue is not None and not self._queue.empty():
+            _, cv_upload, jd_upload = self._queue.get_nowait()
+            self._queued_bytes -= cv_upload.size + jd_upload.size
+            await _close_uploads(cv_upload, jd_upload)
+
+    def submit(self, cv_upload: SpooledUpload, jd_upload: SpooledUpload) -> ResumeJob:
+        """
+        Enqueues a CV/JD pair for processing. On success the manager owns the
+        uploads and closes them once the job has run; if the job is
+        rejected, they stay with the caller.
+
+        Raises:
+            JobQueueFullError: If `max_queue_size` jobs are already waiting,
+                or their uploads would exceed `max_queued_bytes`.
+        """
+        if self._queue is None:
+            raise RuntimeError("ResumeJobManager.start() has not been called")
+
+        self._forget_expired_jobs()
+
+        size = cv_upload.size + jd_upload.size
+        if self._queued_bytes and self._queued_bytes + size > self.max_queued_bytes:
+            raise JobQueueFullError(
+                f"Resume job queue is full ({self._queued_bytes} bytes waiting)"
+            )
+
+        job = ResumeJob(job_id=uuid.uuid4().hex, created_at=time.time())
+        try:
+            self._queue.put_nowait((job.job_id, cv_upload, jd_upload))
+        except asyncio.QueueFull:
+            raise JobQueueFullError(
+                f"Resume job queue is full ({self.max_queue_size} jobs waiting)"
+            )
+        self._queued_bytes += size
+
+        self._jobs[job.job_id] = job
+        self._changed[job.job_id] = asyncio.Event()
+        self._record(job, ResumeJobStatus.QUEUED)
+        return job
+
+    def get(self, job_id: str) -> Optional[ResumeJob]:
+        return self._jobs.get(job_id)
+
+    async def events(self, job_id: str) -> AsyncIterator[ResumeJobEvent]:
+        """
+        Yields the progress events of a job, starting with the ones already
+        recorded, until the job finishes.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        sent = 0
+        while True:
+            # The job may be forgotten while a stream waits on it
+            changed = self._changed.get(job_id)
+            if changed is None:
+                return
+            for event in job.events[sent:]:
+                yield event
+            sent = len(job.events)
+
+            if job.status.is_finished:
+                return
+            await changed.wait()
+
+    def stats(self) -> dict:
+        counts = {status.value: 0 for status in ResumeJobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queued_bytes": self._queued_bytes,
+            "jobs": counts,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, cv_upload, jd_upload = await self._queue.get()
+            self._queued_bytes -= cv_upload.size + jd_upload.size
+            try:
+                await self._run(self._jobs[job_id], cv_upload.source, jd_upload.source)
+            except Exception as e:
+                logger.exception(f"Resume job {job_id} crashed: {e}")
+            finally:
+                await _close_uploads(cv_upload, jd_upload)
+                self._queue.task_done()
+
+    async def _run(self, job: ResumeJob, cv_document, jd_document) -> None:
+        job.started_at = time.time()
+        self._record(job, ResumeJobStatus.RUNNING)
+
+        try:
+            pipeline = self.pipeline_factory()
+            result = await pipeline.process_resume(
+                cv_document,
+                jd_document,
+                progress_callback=lambda stage: self._record(
+                    job, ResumeJobStatus.RUNNING, stage
+                ),
+                raise_errors=True,
+            )
+        except Exception as e:
+            # process_resume wraps its own failures in PipelineError; anything
+            # else (e.g. from the pipeline factory) still fails the job
+            if not isinstance(e, PipelineError):
+                logger.exception(f"Resume job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.finished_at = time.time()
+            self._record(job, ResumeJobStatus.FAILED)
+            return
+
+        job.result = result
+        job.finished_at = time.time()
+        self._record(job, ResumeJobStatus.COMPLETED)
+
+    def _record(
+        self, job: ResumeJob, status: ResumeJobStatus, stage: Optional[str] = None
+    ) -> None:
+        job.status = status
+        if stage is not None:
+            job.stage = stage
+        job.events.append(
+            ResumeJobEvent(status=status, stage=stage, timestamp=time.time())
+        )
+        # Wake up every event stream waiting on this job, then arm a fresh
+        # event for the next change
+        self._changed[job.job_id].set()
+        self._changed[job.job_id] = asyncio.Event()
+
+    def _forget_expired_jobs(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            del self._changed[job_id]
+
+
+async def _close_uploads(*uploads: SpooledUpload) -> None:
+    for upload in uploads:
+        try:
+            await upload.close()
+        except Exception as e:
+            logger.exception(f"Failed to close a resume job upload: {e}")
@@ -1,28 +1,240 @@
-# import os
-# import aiohttp  # for async HTTP requests
-# import asyncio
-
-# class SearchService:
-#     def __init__(self):
-#         self.api_key = os.getenv('SERPER_API_KEY')
-#         self.url = "https://google.serper.dev/videos"
-
-#     async def get_youtube_tutorials(self, skill):
-#         headers = {
-#             "X-API-KEY": self.api_key,
-#             "Content-Type": "application/json"
-#         }
-#         payload = {"q": f"{skill} tutorial"}
-
-#         async with aiohttp.ClientSession() as session:
-#             async with session.post(self.url, json=payload, headers=headers) as response:
-#                 if response.status == 200:
-#                     data = await response.json()
-#                     # Extract YouTube video links from API response
-#                     video_links = []
-#                     for item in data.get("videos", []):
-#                         video_links.append(item.get("link"))
-#                     return video_links
-#                 else:
-#                     print(f"Error fetching videos: {response.status}")
-#                     return []  
\ No newline at end of file
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from config import SERPER_API_KEY, SERPER_BASE_URL
+from constants import (
+    DEFAULT_SEARCH_CACHE_MAX_ENTRIES,
+    DEFAULT_SEARCH_CACHE_TTL_SECONDS,
+    DEFAULT_SEARCH_CONCURRENCY,
+    DEFAULT_SEARCH_RESULTS_PER_QUERY,
+    DEFAULT_SEARCH_TIMEOUT_SECONDS,
+)
+from logger import loggerUtils as logger
+from src.models.ats_models import ATSResult
+
+
+class SearchService:
+    """
+    Async client for the Serper video search used for gap-learning
+    recommendations.
+
+    All requests share one keep-alive `aiohttp.ClientSession` whose
+    connection pool is capped at `max_concurrency`, so fanning out many
+    queries reuses a handful of connections. Queries are normalised
+    (case and whitespace) and:
+
+    - answered from an in-memory TTL cache (LRU-bounded) when possible,
+    - joined onto an identical request that is already in flight,
+    - otherwise sent once the concurrency cap allows.
+
+    Failed searches are logged, return no results and are not cached.
+    Use it as an async context manager, or call `close()` when done.
+
+    Args:
+        api_key (Optional[str]): Serper API key.
+        base_url (str): Serper endpoint; point it at a local stand-in for
+            tests.
+        max_concurrency (int): Requests in flight at once.
+        cache_ttl_seconds (float): Lifetime of a cached result.
+        cache_max_entries (int): Cached queries kept at most.
+        timeout_seconds (float): Timeout of a single request.
+        results_per_query (int): Videos kept per query.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = SERPER_API_KEY,
+        base_url: str = SERPER_BASE_URL,
+        max_concurrency: int = DEFAULT_SEARCH_CONCURRENCY,
+        cache_ttl_seconds: float = DEFAULT_SEARCH_CACHE_TTL_SECONDS,
+        cache_max_entries: int = DEFAULT_SEARCH_CACHE_MAX_ENTRIES,
+        timeout_seconds: float = DEFAULT_SEARCH_TIMEOUT_SECONDS,
+        results_per_query: int = DEFAULT_SEARCH_RESULTS_PER_QUERY,
+    ):
+        self.api_key = api_key
+        self.url = f"{base_url.rstrip('/')}/videos"
+        self.max_concurrency = max_concurrency
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_entries = cache_max_entries
+        self.timeout_seconds = timeout_seconds
+        self.results_per_query = results_per_query
+
+        self.requests = 0
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self.failures = 0
+
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        # Callers waiting on each in-flight search
+        self._waiters: Dict[str, int] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        session, loop = self._session, self._session_loop
+        self._session = self._session_loop = None
+        if session is None or session.closed:
+            return
+        if loop is not asyncio.get_running_loop() and loop.is_running():
+            # Its connections belong to a loop running in another thread
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            )
+        else:
+            await session.close()
+
+    async def get_youtube_tutorials(self, skill: str) -> List[str]:
+        """Links of tutorial videos for a skill."""
+        videos = await self.search_videos(f"{skill} tutorial")
+        return [video["link"] for video in videos if video.get("link")]
+
+    async def search_videos(self, query: str) -> List[dict]:
+        """Videos (title, link, channel, ...) found for a query."""
+        key = _normalize_query(query)
+        if not key:
+            return []
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        fetch = self._in_flight.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch(key))
+            self._in_flight[key] = fetch
+            self._waiters[key] = 0
+        else:
+            self.deduplicated += 1
+
+        self._waiters[key] += 1
+        try:
+            # Shielded: a caller that is cancelled gives up its own wait, not
+            # the search the other callers share
+            return await asyncio.shield(fetch)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._in_flight[key]
+                # No-op once it finished; stops it if everyone gave up
+                fetch.cancel()
+
+    async def search_many(self, queries: Iterable[str]) -> Dict[str, List[dict]]:
+        """Runs the unique queries concurrently; results keyed by query."""
+        queries = list(dict.fromkeys(queries))
+        results = await asyncio.gather(*(self.search_videos(q) for q in queries))
+        return dict(zip(queries, results))
+
+    async def recommend_for_gaps(self, results: Iterable[ATSResult]) -> List[ATSResult]:
+        """
+        Fills `youtube_recommendations` of every ATS result from its gaps'
+        search queries. Queries shared between candidates are searched once.
+        """
+        results = list(results)
+        videos = await self.search_many(
+            gap.youtube_search_query for result in results for gap in result.gaps
+        )
+        for result in results:
+            result.youtube_recommendations = [
+                {
+                    "skill": gap.missing_skill,
+                    "query": gap.youtube_search_query,
+                    "videos": videos.get(gap.youtube_search_query, []),
+                }
+                for gap in result.gaps
+            ]
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "failures": self.failures,
+            "cached_queries": len(self._cache),
+            "in_flight": len(self._in_flight),
+        }
+
+    async def _fetch(self, query: str) -> List[dict]:
+        session, semaphore = await self._get_session()
+        async with semaphore:
+            self.requests += 1
+            try:
+                async with session.post(self.url, json={"q": query}) as response:
+                    if response.status != 200:
+                        self.failures += 1
+                        logger.warning(
+                            f"Video search for {query!r} failed: HTTP {response.status}"
+                        )
+                        return []
+                    data = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.failures += 1
+                logger.warning(f"Video search for {query!r} failed: {e!r}")
+                return []
+
+        videos = [
+            {
+                "title": item.get("title"),
+                "link": item.get("link"),
+                "channel": item.get("channel"),
+                "duration": item.get("duration"),
+            }
+            for item in data.get("videos", [])[:self.results_per_query]
+        ]
+        self._cache_put(query, videos)
+        return videos
+
+    async def _get_session(self):
+        # The session and semaphore belong to the loop they are created on
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is not loop:
+            await self.close()
+        if self._session is None or self._session.closed:
+            self._session_loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency, keepalive_timeout=30
+                ),
+                headers={
+                    "X-API-KEY": self.api_key or "",
+                    "Content-Type": "application/json",
+                },
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session, self._semaphore
+
+    def _cache_get(self, key: str) -> Optional[List[dict]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, videos = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return videos
+
+    def _cache_put(self, key: str, videos: List[dict]) -> None:
+        self._cache[key] = (time.monotonic() + self.cache_ttl_seconds, videos)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
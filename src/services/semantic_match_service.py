@@ -0,0 +1,48 @@
+import os
+from typing import List, Optional, Tuple
+
+from constants import DEFAULT_VECTOR_STORE_DIR
+from src.utilities.ats_scorer import ScorerInput
+from src.utilities.embeddings import HashingEmbedder
+from src.utilities.vector_store import VectorStore
+
+
+class SemanticMatchService:
+    """
+    Nearest-neighbour matching between parsed CVs and job descriptions.
+
+    CVs and JDs are embedded locally with `HashingEmbedder` and kept in two
+    memory-mapped `VectorStore`s under `directory`, so matching works
+    offline and survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_VECTOR_STORE_DIR,
+        embedder: Optional[HashingEmbedder] = None,
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        self.cv_store = VectorStore(os.path.join(directory, "cvs"), dim=self.embedder.dim)
+        self.jd_store = VectorStore(os.path.join(directory, "jds"), dim=self.embedder.dim)
+
+    def add_cv(self, cv_id: str, cv_data: ScorerInput):
+        self.cv_store.add(cv_id, self.embedder.embed(cv_data))
+
+    def add_jd(self, jd_id: str, jd_data: ScorerInput):
+        self.jd_store.add(jd_id, self.embedder.embed(jd_data))
+
+    def recommend_jobs(
+        self, cv_data: ScorerInput, k: int = 10, exact: bool = False
+    ) -> List[Tuple[str, float]]:
+        """JD ids most similar to the CV, with their cosine similarity."""
+        return self.jd_store.search(self.embedder.embed(cv_data), k, exact=exact)
+
+    def find_candidates(
+        self, jd_data: ScorerInput, k: int = 10, exact: bool = False
+    ) -> List[Tuple[str, float]]:
+        """CV ids most similar to the JD, with their cosine similarity."""
+        return self.cv_store.search(self.embedder.embed(jd_data), k, exact=exact)
+
+    def close(self):
+        self.cv_store.close()
+        self.jd_store.close()
@@ -1,15 +1,23 @@
-# from src.utilities.skills_prompt import build_skills_prompt
-# from src.utilities.openai_llm_utils import async_generate_response
-# def extract_skills(raw_text):
+import threading
 
-#     # 1️⃣ Build prompt
-#     prompt = build_skills_prompt(raw_text)
+from src.utilities.skill_matcher import SkillMatcher
 
-#     # 2️⃣ Call LLM
-#     # response = async_generate_response(
-#         user_prompt=prompt,   # ✅ use prompt here
-#         system_prompt="Extract only technical skills in JSON format."
-#     )
+# Technical skills are extracted locally with the skills taxonomy automaton
+# instead of an LLM call (see build_skills_prompt for the old prompt)
+_matcher = None
+_matcher_lock = threading.Lock()
 
-#     # 3️⃣ Return cleaned response
-#     return response["response"]
\ No newline at end of file
+
+def get_skill_matcher():
+    """The shared matcher, loaded from its saved automaton on first use."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher.load()
+    return _matcher
+
+
+def extract_skills(raw_text):
+    """Canonical names of the technical skills found in the text."""
+    return get_skill_matcher().extract(raw_text)
@@ -0,0 +1,107 @@
+import asyncio
+from typing import List, Optional
+
+from constants import (
+    DEFAULT_VISION_FIDELITY,
+    DEFAULT_VISION_JPEG_QUALITY,
+    DEFAULT_VISION_MAX_PAGES,
+    DEFAULT_VISION_RENDER_DPI,
+)
+from logger import loggerUtils as logger
+from src.models.cv_models import CVParsedData
+from src.services.prompts.vision_extraction_prompt import (
+    VISION_SYSTEM_PROMPT,
+    VISION_USER_PROMPT,
+)
+from src.utilities.openai_llm_utils import OpenAI_Vision_Config, OpenAIVisionTextGenerator
+from src.utilities.page_images import encode_page, render_pages
+from src.utilities.text_extractor import DocumentSource, TextExtractor
+
+VISION_ROUTE = "vision"
+OCR_ROUTE = "ocr"
+
+
+class VisionExtractionService:
+    """
+    Extracts CVs straight from their page images with a vision model,
+    skipping local OCR and the separate text-model call.
+
+    All pages of a document go into one request as grayscale JPEGs sized to
+    what the API reads at the configured detail level, and the answer is
+    validated as `CVParsedData`. `route` decides per document whether this
+    path pays off: only scanned documents (every page lacking a text layer)
+    of at most `max_pages` pages go to the vision model, since text-layer
+    PDFs are extracted locally for free and long scans are cheaper to OCR.
+
+    Args:
+        text_extractor (TextExtractor): Used to inspect documents.
+        generator (Optional[OpenAIVisionTextGenerator]): The vision model
+            client. Defaults to one using `fidelity`.
+        max_pages (int): Longest document routed to the vision model.
+        render_dpi (int): DPI PDF pages are rasterized at.
+        jpeg_quality (int): JPEG quality of the uploaded pages.
+        fidelity (str): Image detail level, "low" or "high".
+    """
+
+    def __init__(
+        self,
+        text_extractor: TextExtractor,
+        generator: Optional[OpenAIVisionTextGenerator] = None,
+        max_pages: int = DEFAULT_VISION_MAX_PAGES,
+        render_dpi: int = DEFAULT_VISION_RENDER_DPI,
+        jpeg_quality: int = DEFAULT_VISION_JPEG_QUALITY,
+        fidelity: str = DEFAULT_VISION_FIDELITY,
+    ):
+        self.text_extractor = text_extractor
+        self.generator = generator or OpenAIVisionTextGenerator(
+            config=OpenAI_Vision_Config(fidelity=fidelity)
+        )
+        self.max_pages = max_pages
+        self.render_dpi = render_dpi
+        self.jpeg_quality = jpeg_quality
+
+    def route(self, source: DocumentSource) -> str:
+        """Routes short, fully scanned documents to "vision", others to "ocr"."""
+        profile = self.text_extractor.inspect(source, max_pages=self.max_pages)
+        if (
+            profile is not None
+            and profile["page_count"] <= self.max_pages
+            and len(profile["scanned_pages"]) == profile["page_count"]
+        ):
+            return VISION_ROUTE
+        return OCR_ROUTE
+
+    def encode_pages(self, source: DocumentSource) -> List[str]:
+        """The document's pages as base64 JPEGs, ready for the request."""
+        if not isinstance(source, str):
+            source = bytes(source)
+        pages = render_pages(
+            source, TextExtractor.is_pdf(source), dpi=self.render_dpi
+        )
+        try:
+            return [
+                encode_page(page, self.generator.config.fidelity, self.jpeg_quality)
+                for page in pages
+            ]
+        finally:
+            for page in pages:
+                page.close()
+
+    async def extract_cv_items(self, source: DocumentSource) -> dict:
+        """
+        Extracts a CV from its page images in a single vision call and
+        returns it as a `CVParsedData` dict.
+        """
+        # Rasterizing and compressing is CPU work; keep it off the loop
+        images = await asyncio.to_thread(self.encode_pages, source)
+        response = await self.generator.async_generate_response(
+            system_prompt=VISION_SYSTEM_PROMPT,
+            user_prompt=VISION_USER_PROMPT,
+            json_response=True,
+            base64_encoded_images=images,
+        )
+        logger.debug(
+            f"Vision extraction of {len(images)} page(s) used "
+            f"{response['input_tokens']} prompt tokens"
+        )
+        return CVParsedData.model_validate(response["response"]).model_dump()
@@ -0,0 +1,424 @@
+import json
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from constants import (
+    ATS_MATCH_THRESHOLDS,
+    ATS_SCORE_WEIGHTS,
+    DEFAULT_ATS_NGRAM_SIZES,
+    DEFAULT_ATS_SCORING_BLOCK_SIZE,
+)
+
+CATEGORIES = ("skills", "experience", "education")
+
+# Whole-token abbreviations expanded before comparing, so "ML" matches
+# "Machine Learning"
+SKILL_ALIASES = {
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "postgres": "postgresql",
+    "gcp": "google cloud platform",
+    "aws": "amazon web services",
+    "oop": "object oriented programming",
+    "ci/cd": "continuous integration continuous delivery",
+    "b.tech": "bachelor of technology",
+    "btech": "bachelor of technology",
+    "b.e": "bachelor of engineering",
+    "m.tech": "master of technology",
+    "mtech": "master of technology",
+    "bsc": "bachelor of science",
+    "msc": "master of science",
+    "phd": "doctor of philosophy",
+}
+
+# Requirements are short, CV experience entries are long: experience is
+# compared by how much of the requirement is contained in an entry, the
+# other categories by cosine similarity
+_SIMILARITY = {"skills": "cosine", "experience": "containment", "education": "cosine"}
+
+_NON_WORD_RE = re.compile(r"[^\w+#./ ]+")
+_SPACES_RE = re.compile(r"\s+")
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+ScorerInput = Union[str, dict, BaseModel]
+
+
+class SparseRows(NamedTuple):
+    """
+    Rows of n-gram weights in CSR layout: row `r`'s columns and values are
+    `indices[indptr[r]:indptr[r + 1]]` and `data[indptr[r]:indptr[r + 1]]`.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+
+
+def normalize_item(text: str) -> str:
+    """Lowercases, strips punctuation and expands known abbreviations."""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = _SPACES_RE.sub(" ", _NON_WORD_RE.sub(" ", text)).strip()
+    return " ".join(
+        SKILL_ALIASES.get(token, SKILL_ALIASES.get(token.strip("./"), token))
+        for token in text.split()
+    )
+
+
+def char_ngrams(text: str, sizes: Sequence[int] = DEFAULT_ATS_NGRAM_SIZES) -> Counter:
+    """Character n-grams taken within space-padded words."""
+    grams = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for n in sizes:
+            if len(padded) <= n:
+                grams[padded] += 1
+                continue
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class LocalATSScorer:
+    """
+    A deterministic, vectorised stand-in for the LLM ATS scorer.
+
+    Every requirement of the job description (skill, experience line,
+    education line) is compared with the CV items of the same category
+    using TF-IDF weighted character n-grams, and counts as met when its
+    best match reaches the category threshold. The match percentages of
+    the three categories are combined with the 50/30/20 weighting of
+    `ATS_SCORE_SYSTEM_PROMPT`; a category the job description does not
+    mention counts as fully matched.
+
+    IDF weights come from `fit`; until then every n-gram weighs the same,
+    so the score of a pair never depends on the other pairs in a batch.
+
+    Args:
+        weights (Dict[str, float]): Weight of each category.
+        thresholds (Dict[str, float]): Similarity at which a requirement
+            counts as met, per category.
+        ngram_sizes (Sequence[int]): Character n-gram sizes.
+        block_size (int): CVs processed per block in batch scoring.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        thresholds: Optional[Dict[str, float]] = None,
+        ngram_sizes: Sequence[int] = DEFAULT_ATS_NGRAM_SIZES,
+        block_size: int = DEFAULT_ATS_SCORING_BLOCK_SIZE,
+    ) -> None:
+        self.weights = weights or ATS_SCORE_WEIGHTS
+        self.thresholds = thresholds or ATS_MATCH_THRESHOLDS
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.block_size = block_size
+        self._idf: Dict[str, float] = {}
+        self._default_idf = 1.0
+
+    def fit(self, documents: Iterable[str]) -> "LocalATSScorer":
+        """Learns IDF weights from a reference corpus of skills/requirements."""
+        document_frequency = Counter()
+        total = 0
+        for document in documents:
+            total += 1
+            document_frequency.update(
+                char_ngrams(normalize_item(document), self.ngram_sizes).keys()
+            )
+        self._idf = {
+            gram: math.log((1 + total) / (1 + df)) + 1
+            for gram, df in document_frequency.items()
+        }
+        self._default_idf = math.log(1 + total) + 1
+        return self
+
+    def score(self, cv_data: ScorerInput, jd_data: ScorerInput) -> dict:
+        """Scores one CV against one job description."""
+        return self.score_batch([cv_data], [jd_data])[0][0]
+
+    def score_batch(
+        self, cvs: Sequence[ScorerInput], jds: Sequence[ScorerInput]
+    ) -> List[List[dict]]:
+        """
+        Scores every CV against every job description. Returns an N x M
+        nested list of results in the LLM scorer's JSON shape.
+        """
+        cv_items = [extract_items(cv) for cv in cvs]
+        jd_items = [extract_items(jd) for jd in jds]
+        matrices = self._score(cv_items, jd_items)
+
+        results = []
+        for i in range(len(cvs)):
+            row = []
+            for j, jd in enumerate(jd_items):
+                row.append(self._result(matrices, i, j, jd))
+            results.append(row)
+        return results
+
+    def score_matrix(
+        self, cvs: Sequence[ScorerInput], jds: Sequence[ScorerInput]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Scores every CV against every job description and returns N x M
+        arrays only ("ats_score" and the per-category percentages), which
+        is much cheaper than `score_batch` for ranking large batches.
+        """
+        matrices = self._score(
+            [extract_items(cv) for cv in cvs], [extract_items(jd) for jd in jds]
+        )
+        return {
+            "ats_score": matrices["ats_score"],
+            **{
+                f"{category}_match_percentage": matrices[category]["percentage"]
+                for category in CATEGORIES
+            },
+        }
+
+    def _score(self, cv_items, jd_items) -> dict:
+        matrices = {}
+        ats_score = np.zeros((len(cv_items), len(jd_items)), dtype=np.float32)
+        for category in CATEGORIES:
+            matrices[category] = self._category_matches(
+                [items[category] for items in cv_items],
+                [items[category] for items in jd_items],
+                category,
+            )
+            ats_score += self.weights[category] * matrices[category]["percentage"]
+        matrices["ats_score"] = ats_score
+        return matrices
+
+    def _category_matches(
+        self, cv_lists: List[List[str]], jd_lists: List[List[str]], category: str
+    ) -> dict:
+        """
+        Returns the N x M match percentages of a category, plus the R x N
+        boolean matrix of which of the R job requirements each CV meets.
+        """
+        texts, index = [], {}
+
+        def lookup(items):
+            ids = []
+            for item in items:
+                normalized = normalize_item(item)
+                if normalized not in index:
+                    index[normalized] = len(texts)
+                    texts.append(normalized)
+                ids.append(index[normalized])
+            return ids
+
+        cv_ids = [lookup(items) for items in cv_lists]
+        jd_ids = [lookup(items) for items in jd_lists]
+        cv_offsets = _offsets(cv_ids)
+        jd_offsets = _offsets(jd_ids)
+        cv_flat = np.fromiter((i for ids in cv_ids for i in ids), dtype=np.int64)
+        jd_flat = np.fromiter((i for ids in jd_ids for i in ids), dtype=np.int64)
+
+        n_cvs, n_jds = len(cv_lists), len(jd_lists)
+        met = np.zeros((len(jd_flat), n_cvs), dtype=bool)
+        if len(jd_flat) and len(cv_flat):
+            weights = self._weights(texts)
+            requirements, requirement_rows = np.unique(jd_flat, return_inverse=True)
+            if _SIMILARITY[category] == "cosine":
+                query = candidates = _l2_normalize(weights)
+            else:
+                query = _l1_normalize(weights)
+                candidates = weights._replace(data=np.ones_like(weights.data))
+
+            # Only one block's rows are ever dense, and only over the n-grams
+            # those rows contain
+            threshold = self.thresholds[category]
+            for start in range(0, n_cvs, self.block_size):
+                stop = min(n_cvs, start + self.block_size)
+                block = cv_flat[cv_offsets[start]:cv_offsets[stop]]
+                columns = np.union1d(
+                    _row_columns(query, requirements), _row_columns(candidates, block)
+                )
+                best = _segment_max(
+                    _dense_rows(query, requirements, columns)
+                    @ _dense_rows(candidates, block, columns).T,
+                    cv_offsets[start:stop + 1] - cv_offsets[start],
+                )
+                met[:, start:stop] = best[requirement_rows] >= threshold
+
+        # Requirements met per (JD, CV), via prefix sums over the R axis
+        counts = np.diff(jd_offsets)
+        cumulative = np.vstack(
+            [np.zeros((1, n_cvs), dtype=np.int64), np.cumsum(met, axis=0)]
+        )
+        met_per_jd = cumulative[jd_offsets[1:]] - cumulative[jd_offsets[:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = np.where(
+                counts[:, None] > 0,
+                100.0 * met_per_jd / np.maximum(counts, 1)[:, None],
+                100.0,
+            )
+        return {
+            "percentage": percentage.T.astype(np.float32),
+            "met": met,
+            "jd_offsets": jd_offsets,
+        }
+
+    def _weights(self, texts: List[str]) -> SparseRows:
+        """Sublinear TF-IDF weights of the texts' n-grams, one row per text."""
+        vocabulary: Dict[str, int] = {}
+        indptr, columns, values = [0], [], []
+        for text in texts:
+            for gram, count in char_ngrams(text, self.ngram_sizes).items():
+                columns.append(vocabulary.setdefault(gram, len(vocabulary)))
+                values.append(
+                    (1 + math.log(count)) * self._idf.get(gram, self._default_idf)
+                )
+            indptr.append(len(columns))
+        return SparseRows(
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(columns, dtype=np.int64),
+            np.asarray(values, dtype=np.float32),
+        )
+
+    def _result(self, matrices: dict, i: int, j: int, jd_items: dict) -> dict:
+        result = {"ats_score": int(round(float(matrices["ats_score"][i, j])))}
+        matched_skills, mismatched = [], []
+        summary = []
+        for category in CATEGORIES:
+            category_matrices = matrices[category]
+            result[f"{category}_match_percentage"] = int(
+                round(float(category_matrices["percentage"][i, j]))
+            )
+            start, stop = category_matrices["jd_offsets"][j:j + 2]
+            met = category_matrices["met"][start:stop, i]
+            for requirement, is_met in zip(jd_items[category], met):
+                if not is_met:
+                    mismatched.append(requirement)
+                elif category == "skills":
+                    matched_skills.append(requirement)
+            if len(met):
+                summary.append(f"{int(met.sum())}/{len(met)} {category}")
+
+        result["matched_skills"] = matched_skills
+        result["mismatched_requirements"] = mismatched
+        result["analysis"] = (
+            "Scored locally by n-gram similarity; requirements met: "
+            + (", ".join(summary) if summary else "none listed")
+            + "."
+        )
+        return result
+
+
+def extract_items(data: ScorerInput) -> Dict[str, List[str]]:
+    """
+    Pulls the skills, experience and education items out of extracted CV/JD
+    data. Accepts the prompt shape ("Skills", "Experience", "Education"),
+    `CVParsedData`, or either as a JSON string.
+    """
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    if isinstance(data, str):
+        data = json.loads(_FENCE_RE.sub("", data.strip()))
+    data = {str(key).lower(): value for key, value in (data or {}).items()}
+
+    skills = data.get("skills")
+    if skills is None:
+        skills = (data.get("skills_technical") or []) + (data.get("skills_soft") or [])
+    return {
+        "skills": _flatten(skills),
+        "experience": _flatten(data.get("experience")),
+        "education": _flatten(data.get("education")),
+    }
+
+
+def _flatten(value) -> List[str]:
+    """Turns a list of strings and/or dicts into one text per entry."""
+    if value is None:
+        return []
+    if isinstance(value, (str, dict)):
+        value = [value]
+    items = []
+    for entry in value:
+        if isinstance(entry, dict):
+            parts = []
+            for part in entry.values():
+                if isinstance(part, list):
+                    parts.extend(str(p) for p in part)
+                elif part:
+                    parts.append(str(part))
+            entry = " ".join(parts)
+        entry = str(entry).strip()
+        if entry:
+            items.append(entry)
+    return items
+
+
+def _offsets(groups: List[List[int]]) -> np.ndarray:
+    return np.concatenate([[0], np.cumsum([len(group) for group in groups])]).astype(
+        np.int64
+    )
+
+
+def _segment_max(similarity: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Row-wise maximum over each column segment; 0 for empty segments."""
+    rows, columns = similarity.shape
+    # A trailing zero column keeps reduceat's indices in range when the last
+    # segments are empty
+    padded = np.hstack([similarity, np.zeros((rows, 1), dtype=similarity.dtype)])
+    starts = offsets[:-1]
+    best = np.maximum.reduceat(padded, starts, axis=1)
+    best[:, starts == offsets[1:]] = 0.0
+    return best
+
+
+def _entry_rows(matrix: SparseRows) -> np.ndarray:
+    """The row of each stored entry."""
+    return np.repeat(np.arange(len(matrix.indptr) - 1), np.diff(matrix.indptr))
+
+
+def _l2_normalize(matrix: SparseRows) -> SparseRows:
+    rows = _entry_rows(matrix)
+    norms = np.sqrt(np.bincount(rows, matrix.data.astype(np.float64) ** 2,
+                                minlength=len(matrix.indptr) - 1))
+    return matrix._replace(
+        data=(matrix.data / np.maximum(norms, 1e-12)[rows]).astype(np.float32)
+    )
+
+
+def _l1_normalize(matrix: SparseRows) -> SparseRows:
+    rows = _entry_rows(matrix)
+    sums = np.bincount(rows, matrix.data, minlength=len(matrix.indptr) - 1)
+    return matrix._replace(
+        data=(matrix.data / np.maximum(sums, 1e-12)[rows]).astype(np.float32)
+    )
+
+
+def _entries(matrix: SparseRows, rows: np.ndarray):
+    """Positions in `indices`/`data` of the given rows' entries, and their row numbers."""
+    starts = matrix.indptr[rows]
+    lengths = matrix.indptr[rows + 1] - starts
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+    return positions, np.repeat(np.arange(len(rows)), lengths)
+
+
+def _row_columns(matrix: SparseRows, rows: np.ndarray) -> np.ndarray:
+    return np.unique(matrix.indices[_entries(matrix, rows)[0]])
+
+
+def _dense_rows(matrix: SparseRows, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """The given rows as a dense len(rows) x len(columns) array; `columns` is sorted."""
+    positions, local_rows = _entries(matrix, rows)
+    dense = np.zeros((len(rows), len(columns)), dtype=np.float32)
+    dense[local_rows, np.searchsorted(columns, matrix.indices[positions])] = (
+        matrix.data[positions]
+    )
+    return dense
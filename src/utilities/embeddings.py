@@ -0,0 +1,65 @@
+import math
+import zlib
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+from constants import DEFAULT_ATS_NGRAM_SIZES, DEFAULT_EMBEDDING_DIM
+from src.utilities.ats_scorer import ScorerInput, char_ngrams, extract_items, normalize_item
+
+# Relative weight of each part of a CV/JD in its embedding
+FIELD_WEIGHTS = {"skills": 2.0, "experience": 1.0, "education": 0.5}
+
+
+class HashingEmbedder:
+    """
+    Computes dense vectors locally, without a model or network access.
+
+    Character n-grams of the normalised skills, experience and education
+    items are hashed into `dim` buckets with a random sign (the "hashing
+    trick"), weighted per field and L2-normalised, so the dot product of two
+    vectors approximates the cosine similarity of their n-gram profiles.
+    CRC32 is used as the hash, so vectors are stable across processes.
+
+    Args:
+        dim (int): Vector dimension.
+        ngram_sizes (Sequence[int]): Character n-gram sizes.
+    """
+
+    def __init__(
+        self,
+        dim: int = DEFAULT_EMBEDDING_DIM,
+        ngram_sizes: Sequence[int] = DEFAULT_ATS_NGRAM_SIZES,
+    ) -> None:
+        self.dim = dim
+        self.ngram_sizes = tuple(ngram_sizes)
+
+    def embed_text(self, text: str, weight: float = 1.0, out: np.ndarray = None) -> np.ndarray:
+        vector = out if out is not None else np.zeros(self.dim, dtype=np.float32)
+        buckets, values = [], []
+        for gram, count in char_ngrams(normalize_item(text), self.ngram_sizes).items():
+            hashed = zlib.crc32(gram.encode("utf-8"))
+            buckets.append(hashed % self.dim)
+            value = weight * (1 + math.log(count))
+            values.append(value if hashed & 0x80000000 else -value)
+        np.add.at(vector, buckets, values)
+        return vector
+
+    def embed(self, data: ScorerInput) -> np.ndarray:
+        """Embeds extracted CV/JD data (dict, pydantic model or JSON string)."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for field, items in extract_items(data).items():
+            for item in items:
+                self.embed_text(item, FIELD_WEIGHTS[field], out=vector)
+        return _normalize(vector)
+
+    def embed_many(self, documents: Iterable[ScorerInput]) -> np.ndarray:
+        vectors: List[np.ndarray] = [self.embed(document) for document in documents]
+        if not vectors:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(vectors)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from logger import loggerUtils as logger
+
+# The OpenAI prompt cache only covers prefixes of at least 1024 tokens, and
+# grows in steps of 128 tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP_TOKENS = 128
+
+
+def echo_responder(request: dict) -> str:
+    """Default responder: echoes the last user message back as JSON."""
+    content = request["messages"][-1]["content"]
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content)
+    return json.dumps({"echo": content})
+
+
+def prompt_text(request: dict) -> str:
+    """The request's messages in order, as the text tokens are counted on."""
+    return "".join(
+        json.dumps(message.get("content", "")) for message in request.get("messages", [])
+    )
+
+
+def build_chat_completion(
+    request: dict, content: str, completion_id: str, cached_tokens: int = 0
+) -> dict:
+    """
+    Wraps `content` in a chat completion body for `request`, with token
+    usage approximated from the message sizes (about 4 characters a token).
+    `cached_tokens` is reported as the prompt tokens read from the cache.
+    """
+    prompt_tokens = max(1, len(prompt_text(request)) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "fake"),
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }
+
+
+class FakeOpenAIServer:
+    """
+    A local stand-in for the OpenAI chat completions endpoint.
+
+    It answers `POST /v1/chat/completions` with deterministic responses and
+    can inject latency and failures, which makes the LLM wrappers (retries,
+    hedging, circuit breaking, rate limiting) testable offline. Point the
+    clients at it with `OPENAI_BASE_URL=<server.base_url>`.
+
+    Args:
+        responder (Callable[[dict], str]): Builds the completion content from
+            the request body. Defaults to `echo_responder`.
+        latency_seconds (float): Base latency of every response.
+        latency_jitter_seconds (float): Extra uniformly random latency.
+        slow_request_rate (float): Fraction of requests that are delayed by
+            an additional `slow_request_seconds` (tail latency).
+        slow_request_seconds (float): Delay of a slow request.
+        fail_first (int): Number of initial requests answered with
+            `failure_status`.
+        failure_rate (float): Fraction of later requests that fail.
+        failure_status (int): HTTP status of injected failures.
+        seed (Optional[int]): Seed for the injected randomness.
+        stream_chunk_chars (int): Characters per chunk of a streamed
+            (`"stream": true`) response.
+        stream_chunk_delay_seconds (float): Delay between streamed chunks,
+            which simulates the model's generation speed.
+        prompt_cache (bool): Simulate the provider's prompt prefix cache:
+            prompt prefixes (of at least 1024 tokens, in 128 token steps)
+            already seen are reported as cached tokens.
+        prefill_seconds_per_1k_tokens (float): Extra latency per 1000
+            uncached prompt tokens, so cache hits are also faster.
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[dict], str] = echo_responder,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        slow_request_rate: float = 0.0,
+        slow_request_seconds: float = 0.0,
+        fail_first: int = 0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        seed: Optional[int] = None,
+        stream_chunk_chars: int = 8,
+        stream_chunk_delay_seconds: float = 0.0,
+        prompt_cache: bool = False,
+        prefill_seconds_per_1k_tokens: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.responder = responder
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.slow_request_rate = slow_request_rate
+        self.slow_request_seconds = slow_request_seconds
+        self.fail_first = fail_first
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_delay_seconds = stream_chunk_delay_seconds
+        self.prompt_cache = prompt_cache
+        self.prefill_seconds_per_1k_tokens = prefill_seconds_per_1k_tokens
+        self.requests = []
+        self._cached_prefixes = set()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-openai", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _plan(self, request: dict):
+        """Decides the delay, outcome and cached prompt tokens of a request."""
+        with self._lock:
+            index = len(self.requests)
+            self.requests.append(request)
+            delay = self.latency_seconds + self._random.uniform(
+                0, self.latency_jitter_seconds
+            )
+            if self._random.random() < self.slow_request_rate:
+                delay += self.slow_request_seconds
+            fail = index < self.fail_first or self._random.random() < self.failure_rate
+
+            text = prompt_text(request)
+            cached_tokens = self._cached_prefix_tokens(text) if self.prompt_cache else 0
+            uncached_tokens = max(0, len(text) // 4 - cached_tokens)
+            delay += uncached_tokens / 1000 * self.prefill_seconds_per_1k_tokens
+        return delay, fail, cached_tokens
+
+    def _cached_prefix_tokens(self, text: str) -> int:
+        """Longest cached prefix of `text` in tokens; caches its prefixes."""
+        cached = 0
+        tokens = PROMPT_CACHE_MIN_TOKENS
+        while tokens * 4 <= len(text):
+            digest = hashlib.sha256(text[:tokens * 4].encode("utf-8")).digest()
+            if digest in self._cached_prefixes:
+                cached = tokens
+            else:
+                self._cached_prefixes.add(digest)
+            tokens += PROMPT_CACHE_STEP_TOKENS
+        return cached
+
+    def _completion(self, request: dict, cached_tokens: int = 0) -> dict:
+        return build_chat_completion(
+            request,
+            self.responder(request),
+            f"chatcmpl-fake-{len(self.requests)}",
+            cached_tokens,
+        )
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"No route {self.path}"}})
+                    return
+
+                delay, fail, cached_tokens = server._plan(request)
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self._send(
+                        server.failure_status,
+                        {"error": {"message": "Injected failure", "type": "server_error"}},
+                    )
+                    return
+                if request.get("stream"):
+                    self._stream(request, cached_tokens)
+                    return
+                self._send(200, server._completion(request, cached_tokens))
+
+            def _stream(self, request, cached_tokens):
+                completion = server._completion(request, cached_tokens)
+                content = completion["choices"][0]["message"]["content"]
+                size = max(1, server.stream_chunk_chars)
+                deltas = [{"role": "assistant", "content": ""}] + [
+                    {"content": content[i:i + size]}
+                    for i in range(0, len(content), size)
+                ]
+
+                def chunk(choices, usage=None):
+                    return {
+                        "id": completion["id"],
+                        "object": "chat.completion.chunk",
+                        "created": completion["created"],
+                        "model": completion["model"],
+                        "choices": choices,
+                        "usage": usage,
+                    }
+
+                events = [
+                    chunk([{"index": 0, "delta": delta, "finish_reason": None}])
+                    for delta in deltas
+                ]
+                events.append(
+                    chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                )
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    events.append(chunk([], completion["usage"]))
+
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    # No Content-Length: the body ends when the connection does
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    for index, event in enumerate(events):
+                        if index > 1 and server.stream_chunk_delay_seconds:
+                            time.sleep(server.stream_chunk_delay_seconds)
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                self.close_connection = True
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout or a hedge won the race)
+                    pass
+
+            def log_message(self, format, *args):
+                logger.debug(f"fake-openai: {format % args}")
+
+        return Handler
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from logger import loggerUtils as logger
+
+
+class FakeSerperServer:
+    """
+    A local stand-in for the Serper video search endpoint.
+
+    It answers `POST /videos` with `videos_per_query` deterministic results
+    for the query in the body, after `latency_seconds`, and records every
+    request and the highest number of requests it served at once. Point
+    `SearchService` at it with `base_url=server.base_url`.
+
+    Args:
+        latency_seconds (float): Latency of every response.
+        videos_per_query (int): Videos returned per query.
+        fail_queries (Optional[set]): Queries answered with HTTP 500.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        videos_per_query: int = 10,
+        fail_queries: Optional[set] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.videos_per_query = videos_per_query
+        self.fail_queries = set(fail_queries or ())
+        self.requests = []
+        self.max_in_flight = 0
+
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeSerperServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-serper", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _videos(self, query: str) -> dict:
+        slug = "-".join(query.split())
+        return {
+            "searchParameters": {"q": query, "type": "videos"},
+            "videos": [
+                {
+                    "title": f"{query} - part {i + 1}",
+                    "link": f"https://www.youtube.com/watch?v={slug}-{i + 1}",
+                    "channel": "Fake Channel",
+                    "duration": "10:00",
+                }
+                for i in range(self.videos_per_query)
+            ],
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != "/videos":
+                    self._send(404, {"message": f"No route {self.path}"})
+                    return
+
+                with server._lock:
+                    server.requests.append(
+                        {"body": request, "api_key": self.headers.get("X-API-KEY")}
+                    )
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                try:
+                    if server.latency_seconds:
+                        time.sleep(server.latency_seconds)
+                    query = request.get("q", "")
+                    if query in server.fail_queries:
+                        self._send(500, {"message": "Injected failure"})
+                    else:
+                        self._send(200, server._videos(query))
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                logger.debug(f"fake-serper: {format % args}")
+
+        return Handler
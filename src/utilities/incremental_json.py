@@ -0,0 +1,81 @@
+import json
+from typing import Any, List, Tuple
+
+_OPENING = "{["
+_CLOSING = "}]"
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object as it streams in and emits each top-level field as
+    soon as its value is complete.
+
+    Chunks are scanned once, character by character, tracking string,
+    escape and nesting state; a field is complete when a `,` or the closing
+    `}` of the top-level object is reached outside of any string or nested
+    value. Anything before the opening `{` (e.g. a markdown code fence) and
+    after the closing `}` is ignored.
+
+    Example:
+        parser = IncrementalJSONParser()
+        parser.feed('{"Name": "Jane", "Sk')   # -> [("Name", "Jane")]
+        parser.feed('ills": ["Go"]}')          # -> [("Skills", ["Go"])]
+    """
+
+    def __init__(self) -> None:
+        self.started = False
+        self.finished = False
+        self._member: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consumes a chunk and returns the fields completed by it."""
+        fields = []
+        for char in chunk:
+            if self.finished:
+                break
+
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 1 and char in ",}":
+                field = self._complete_member()
+                if field is not None:
+                    fields.append(field)
+                if char == "}":
+                    self._depth = 0
+                    self.finished = True
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in _OPENING:
+                self._depth += 1
+            elif char in _CLOSING:
+                self._depth -= 1
+            self._member.append(char)
+        return fields
+
+    def _complete_member(self):
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return None
+        # A single `"key": value` member is itself a valid object body
+        ((key, value),) = json.loads("{" + member + "}").items()
+        return key, value
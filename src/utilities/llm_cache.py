@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from pydantic import BaseModel
+from openai.types.chat.chat_completion import ChatCompletion
+
+from constants import (
+    DEFAULT_LLM_CACHE_MAX_BYTES,
+    DEFAULT_LLM_CACHE_MAX_TEMPERATURE,
+    DEFAULT_LLM_CACHE_PATH,
+    DEFAULT_LLM_CACHE_TTL_SECONDS,
+)
+from logger import loggerUtils as logger
+from src.utilities.structured_output import json_schema_for
+
+
+class LLMResponseCache:
+    """
+    A persistent SQLite cache of chat completions.
+
+    Entries are keyed on the full request payload (model, messages, seed,
+    temperature, response_format and every other sampling parameter) and
+    store the complete serialised completion, including its token usage, so
+    a cached response reports exactly what the original call cost. Entries
+    expire after `ttl_seconds`, and the least recently used entries are
+    evicted once the stored responses exceed `max_bytes`.
+
+    Only requests with a temperature up to `max_temperature` are cached;
+    above that, repeated prompts are expected to produce different answers.
+
+    Args:
+        path (str): Location of the SQLite database.
+        ttl_seconds (float): Lifetime of an entry.
+        max_bytes (int): Upper bound on the size of the stored responses.
+        max_temperature (float): Highest temperature eligible for caching.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LLM_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = DEFAULT_LLM_CACHE_MAX_BYTES,
+        max_temperature: float = DEFAULT_LLM_CACHE_MAX_TEMPERATURE,
+    ) -> None:
+        self.path = os.path.join(os.getcwd(), path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+        self.saved_input_tokens = 0
+        self.saved_output_tokens = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+            "ON responses (accessed_at)"
+        )
+        self._connection.commit()
+
+    def is_cacheable(self, payload: dict) -> bool:
+        temperature = payload.get("temperature")
+        return temperature is None or temperature <= self.max_temperature
+
+    @staticmethod
+    def make_key(payload: dict) -> str:
+        """Hashes a chat completion payload into a cache key."""
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=_json_default).encode("utf-8")
+        ).hexdigest()
+
+    def get(
+        self, payload: dict, response_format: Optional[BaseModel] = None
+    ) -> Optional[ChatCompletion]:
+        """
+        Returns the cached completion for `payload`, or None on a miss.
+        When `response_format` is given, the cached content is parsed into
+        it again, mirroring `beta.chat.completions.parse`.
+        """
+        key = self.make_key(payload)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._connection.execute(
+                        "DELETE FROM responses WHERE key = ?", (key,)
+                    )
+                    self._connection.commit()
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+
+        try:
+            response = ChatCompletion.model_validate_json(row[0])
+            if response_format is not None:
+                message = response.choices[0].message
+                message.parsed = response_format.model_validate_json(message.content)
+        except Exception as e:
+            logger.exception(f"Discarding unreadable LLM cache entry {key}: {e}")
+            with self._lock:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                self.misses += 1
+            return None
+
+        # Lets callers tell cached responses apart from billed ones
+        response.cache_hit = True
+        with self._lock:
+            self.hits += 1
+            if response.usage:
+                self.saved_input_tokens += response.usage.prompt_tokens
+                self.saved_output_tokens += response.usage.completion_tokens
+        return response
+
+    def put(self, payload: dict, response: ChatCompletion) -> None:
+        """Stores the completion returned for `payload`."""
+        key = self.make_key(payload)
+        # Per-call bookkeeping attached by the generator is not part of the
+        # completion and must not leak into later hits
+        serialized = response.model_dump_json(
+            exclude={"cache_hit", "call_retries", "call_hedges"}
+        )
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized), now, now),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def delete(self, payload: dict) -> None:
+        """Removes the completion stored for `payload`, if any."""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key = ?", (self.make_key(payload),)
+            )
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_input_tokens": self.saved_input_tokens,
+                "saved_output_tokens": self.saved_output_tokens,
+                "entries": entries,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self) -> None:
+        # Called with the lock held
+        self._connection.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        (size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if size <= self.max_bytes:
+            return
+
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        )
+        evicted = []
+        for key, entry_size in rows:
+            if size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            size -= entry_size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+def _json_default(value):
+    # Pydantic response formats are keyed on their full JSON schema so that
+    # changing a model invalidates its cached responses
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {
+            "model": f"{value.__module__}.{value.__qualname__}",
+            "schema": json_schema_for(value),
+        }
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,361 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import openai
+
+from constants import (
+    DEFAULT_LLM_BACKOFF_BASE_SECONDS,
+    DEFAULT_LLM_BACKOFF_MAX_SECONDS,
+    DEFAULT_LLM_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_LLM_BREAKER_RESET_SECONDS,
+    DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+    DEFAULT_LLM_MAX_RETRIES,
+    DEFAULT_LLM_TIMEOUT_SECONDS,
+)
+from logger import loggerUtils as logger
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class ResiliencePolicy:
+    """
+    Timeout, retry, hedging and circuit breaker settings for LLM calls.
+
+    Args:
+        timeout_seconds (float): Timeout of a single attempt.
+        max_retries (int): Retries after the first attempt on retryable
+            errors (timeouts, connection errors, 408/409/429/5xx).
+        backoff_base_seconds (float): Base of the exponential backoff; the
+            n-th retry sleeps a random time in [0, base * 2**n] ("full
+            jitter"), capped at `backoff_max_seconds`.
+        backoff_max_seconds (float): Upper bound of a single backoff sleep.
+        hedge_percentile (Optional[float]): When set (e.g. 0.95), an attempt
+            still running after this percentile of recent latencies gets a
+            duplicate request; the first response wins. None disables
+            hedging.
+        max_hedges (int): Duplicate requests allowed per attempt.
+        hedge_min_samples (int): Latencies observed before hedging starts.
+        breaker_failure_threshold (int): Consecutive failures that open the
+            circuit breaker.
+        breaker_reset_seconds (float): How long the breaker stays open
+            before letting a probe request through.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float = DEFAULT_LLM_TIMEOUT_SECONDS,
+        max_retries: int = DEFAULT_LLM_MAX_RETRIES,
+        backoff_base_seconds: float = DEFAULT_LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = DEFAULT_LLM_BACKOFF_MAX_SECONDS,
+        hedge_percentile: Optional[float] = None,
+        max_hedges: int = 1,
+        hedge_min_samples: int = DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+        breaker_failure_threshold: int = DEFAULT_LLM_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_seconds: float = DEFAULT_LLM_BREAKER_RESET_SECONDS,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_percentile = hedge_percentile
+        self.max_hedges = max_hedges
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+
+        self.validate_params()
+
+    def validate_params(self):
+        try:
+            assert self.timeout_seconds > 0, "timeout_seconds must be positive"
+            assert self.max_retries >= 0, "max_retries must not be negative"
+            assert self.hedge_percentile is None or 0 < self.hedge_percentile < 1, (
+                "hedge_percentile must be between 0 and 1"
+            )
+            assert self.breaker_failure_threshold > 0, (
+                "breaker_failure_threshold must be positive"
+            )
+        except AssertionError as e:
+            logger.exception(f"Invalid resilience policy: {str(e)}")
+            raise e
+
+    def backoff(self, retry: int) -> float:
+        ceiling = min(
+            self.backoff_max_seconds, self.backoff_base_seconds * (2 ** retry)
+        )
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_seconds`; then lets a single probe through (half-open) and
+    closes again if it succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if (
+                self.state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_seconds
+            ):
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """
+        Ends a call that says nothing about the provider's health (e.g. a
+        bad request): frees the half-open probe slot, but leaves the state
+        and the failure count as they were.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if (
+                self.state == self.HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit breaker opened after "
+                        f"{self.consecutive_failures} consecutive failures"
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CallStats:
+    """Retries and hedged requests used by one logical call."""
+
+    def __init__(self) -> None:
+        self.retries = 0
+        self.hedges = 0
+
+
+class ResilientExecutor:
+    """
+    Runs LLM requests under a `ResiliencePolicy`.
+
+    `call`/`call_sync` take a zero-argument function that performs one
+    attempt, so the attempt can re-acquire rate limiter slots and apply the
+    per-attempt timeout itself. They return the result together with the
+    `CallStats` of the call.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[ResiliencePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.policy = policy or ResiliencePolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            self.policy.breaker_failure_threshold, self.policy.breaker_reset_seconds
+        )
+        self.latencies = LatencyTracker()
+
+    async def call(
+        self, attempt: Callable[[], Awaitable[T]], hedge: bool = True
+    ) -> Tuple[T, CallStats]:
+        stats = CallStats()
+        while True:
+            self._check_breaker()
+            try:
+                result = await self._hedged_attempt(attempt, stats, hedge)
+            except Exception as e:
+                if not self._handle_failure(e, stats):
+                    raise
+                await asyncio.sleep(self.policy.backoff(stats.retries - 1))
+                continue
+            except BaseException:
+                # Cancelled (e.g. the client went away): the attempt says
+                # nothing about the provider, but a half-open probe must not
+                # keep its slot forever
+                self.circuit_breaker.release_probe()
+                raise
+
+            self.circuit_breaker.record_success()
+            return result, stats
+
+    def call_sync(self, attempt: Callable[[], T]) -> Tuple[T, CallStats]:
+        stats = CallStats()
+        while True:
+            self._check_breaker()
+            started = time.monotonic()
+            try:
+                result = attempt()
+            except Exception as e:
+                if not self._handle_failure(e, stats):
+                    raise
+                time.sleep(self.policy.backoff(stats.retries - 1))
+                continue
+            except BaseException:
+                self.circuit_breaker.release_probe()
+                raise
+
+            self.latencies.record(time.monotonic() - started)
+            self.circuit_breaker.record_success()
+            return result, stats
+
+    async def _hedged_attempt(self, attempt, stats: CallStats, hedge: bool = True):
+        started = time.monotonic()
+        tasks = {asyncio.ensure_future(attempt())}
+        # Attempts holding resources beyond their result (e.g. an open
+        # stream) must not be raced against duplicates
+        hedge_delay = self._hedge_delay() if hedge else None
+        error = None
+
+        try:
+            while tasks:
+                can_hedge = (
+                    hedge_delay is not None and stats.hedges < self.policy.max_hedges
+                )
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    # The attempt is slower than the hedge percentile: race a
+                    # duplicate request against it
+                    stats.hedges += 1
+                    tasks.add(asyncio.ensure_future(attempt()))
+                    continue
+
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        self.latencies.record(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.policy.hedge_percentile is None:
+            return None
+        if len(self.latencies) < self.policy.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.policy.hedge_percentile)
+
+    def _check_breaker(self) -> None:
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError(
+                "LLM circuit breaker is open; failing fast until it resets"
+            )
+
+    def _handle_failure(self, error: Exception, stats: CallStats) -> bool:
+        """Records the failure and returns whether the call should be retried."""
+        retryable = is_retryable(error)
+        if retryable:
+            self.circuit_breaker.record_failure()
+        else:
+            # Not the provider's fault (e.g. a bad request): neither a
+            # failure nor evidence that the provider has recovered
+            self.circuit_breaker.release_probe()
+
+        if not retryable or stats.retries >= self.policy.max_retries:
+            return False
+
+        stats.retries += 1
+        logger.warning(
+            f"Retrying LLM call ({stats.retries}/{self.policy.max_retries}) "
+            f"after {type(error).__name__}: {error}"
+        )
+        return True
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(
+        error,
+        (
+            asyncio.TimeoutError,
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+        ),
+    ):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+_CIRCUIT_BREAKERS: Dict[str, CircuitBreaker] = {}
+_CIRCUIT_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(model: str, policy: ResiliencePolicy) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker for `model`."""
+    with _CIRCUIT_BREAKERS_LOCK:
+        breaker = _CIRCUIT_BREAKERS.get(model)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                policy.breaker_failure_threshold, policy.breaker_reset_seconds
+            )
+            _CIRCUIT_BREAKERS[model] = breaker
+        return breaker
@@ -0,0 +1,293 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from constants import (
+    DEFAULT_ROUTING_HISTORY_SIZE,
+    DEFAULT_ROUTING_MAX_NOISE_RATIO,
+    DEFAULT_STRUCTURED_OUTPUT_MAX_RECALLS,
+    MODEL_ROUTING_RULES,
+)
+from logger import loggerUtils as logger
+from src.models.ats_models import ATSResult, FusedATSResult, JobRequirements
+from src.models.cv_models import CVParsedData
+from src.utilities.openai_llm_utils import AIGeneratorResponse, OpenAITextGenerator
+from src.utilities.structured_output import StructuredOutputError
+from src.utilities.text_compaction import CompactionResult, count_tokens
+
+# Returns why an output looks unreliable, or None when it looks fine. Gets
+# the parsed output and the prompt's size in tokens
+ConfidenceCheck = Callable[[BaseModel, int], Optional[str]]
+
+ESCALATED_INVALID = "invalid"
+ESCALATED_LOW_CONFIDENCE = "low_confidence"
+
+# Prompts at least this long are expected to yield a non-empty extraction
+_MIN_CONTENT_TOKENS = 400
+_IMPORTANCE_LEVELS = {"high", "medium", "low"}
+_PLAIN_PUNCTUATION = set(".,;:!?'\"()-/&%+@#*|$€£•–—")
+
+
+def text_noise_ratio(text: str) -> float:
+    """
+    Share of the non-space characters that are neither letters, digits nor
+    ordinary punctuation; OCR of a poor scan tends to leave these behind.
+    """
+    characters = [char for char in text or "" if not char.isspace()]
+    if not characters:
+        return 0.0
+    noise = sum(
+        1 for char in characters
+        if not char.isalnum() and char not in _PLAIN_PUNCTUATION
+    )
+    return noise / len(characters)
+
+
+def check_cv(cv: CVParsedData, prompt_tokens: int) -> Optional[str]:
+    if prompt_tokens >= _MIN_CONTENT_TOKENS and not (
+        cv.experience or cv.skills_technical or cv.education
+    ):
+        return "no experience, skills or education extracted"
+    if any(not (job.company or job.role) for job in cv.experience):
+        return "experience entry without company or role"
+    return None
+
+
+def check_jd(jd: JobRequirements, prompt_tokens: int) -> Optional[str]:
+    if not (jd.education or jd.experience or jd.skills):
+        return "no requirements extracted"
+    return None
+
+
+def check_ats(ats: ATSResult, prompt_tokens: int) -> Optional[str]:
+    if ats.match_score < 100 and not ats.gaps:
+        return "score below 100 without any gaps"
+    if any(gap.importance_level.lower() not in _IMPORTANCE_LEVELS for gap in ats.gaps):
+        return "gap with an unknown importance level"
+    return None
+
+
+def check_fused(result: FusedATSResult, prompt_tokens: int) -> Optional[str]:
+    return (
+        check_cv(result.cv, prompt_tokens)
+        or check_jd(result.jd, prompt_tokens)
+        or check_ats(result.ats, prompt_tokens)
+    )
+
+
+DEFAULT_CONFIDENCE_CHECKS: Dict[str, ConfidenceCheck] = {
+    "cv_extraction": check_cv,
+    "jd_extraction": check_jd,
+    "ats_scoring": check_ats,
+    "fused": check_fused,
+}
+
+
+class RoutingStats:
+    """Thread-safe per-task counts of where calls started, ended and why they escalated."""
+
+    def __init__(self, history_size: int = DEFAULT_ROUTING_HISTORY_SIZE) -> None:
+        self._tasks: Dict[str, dict] = {}
+        self._decisions = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def record(self, decision: dict) -> None:
+        with self._lock:
+            task = self._tasks.setdefault(decision["task"], {
+                "calls": 0,
+                "escalated_calls": 0,
+                "failures": 0,
+                "started_on": {},
+                "finished_on": {},
+                "escalations": {},
+                "tokens_by_model": {},
+            })
+            task["calls"] += 1
+            task["escalated_calls"] += int(bool(decision["escalations"]))
+            task["failures"] += int(decision["final_model"] is None)
+            _increment(task["started_on"], decision["start_model"])
+            if decision["final_model"] is not None:
+                _increment(task["finished_on"], decision["final_model"])
+            for escalation in decision["escalations"]:
+                _increment(task["escalations"], escalation["reason"])
+            for model, tokens in decision["tokens"].items():
+                _increment(task["tokens_by_model"], model, tokens)
+            self._decisions.append(decision)
+
+    def as_dict(self, decisions: bool = False) -> dict:
+        with self._lock:
+            tasks = {}
+            for name, task in self._tasks.items():
+                tasks[name] = {
+                    **task,
+                    "escalation_rate": round(task["escalated_calls"] / task["calls"], 4),
+                    "started_on": dict(task["started_on"]),
+                    "finished_on": dict(task["finished_on"]),
+                    "escalations": dict(task["escalations"]),
+                    "tokens_by_model": dict(task["tokens_by_model"]),
+                }
+            stats = {"tasks": tasks}
+            if decisions:
+                stats["decisions"] = list(self._decisions)
+            return stats
+
+
+def _increment(counts: dict, key: str, amount: int = 1) -> None:
+    counts[key] = counts.get(key, 0) + amount
+
+
+class ModelRouter:
+    """
+    Picks the model for each structured LLM call, cheapest first.
+
+    Each task has a list of (model, max prompt tokens) tiers (see
+    `MODEL_ROUTING_RULES`). A call starts on the first tier whose limit
+    covers its prompt; document text that looks like noisy OCR skips the
+    cheapest tier. When the output fails schema validation (even after
+    local repair) or a task's confidence check flags it, the call is
+    repeated on the next tier. Only the last tier spends structured-output
+    re-calls, since escalating already asks again. Every decision is
+    recorded in `stats` for tuning the limits.
+
+    Args:
+        generator_factory (Callable[[str], OpenAITextGenerator]): Creates
+            the generator of a model; called once per model.
+        rules (Dict[str, List[Tuple[str, Optional[int]]]]): Tiers per task.
+        confidence_checks (Optional[Dict[str, ConfidenceCheck]]): Low-
+            confidence checks per task. Defaults to
+            `DEFAULT_CONFIDENCE_CHECKS`.
+        max_noise_ratio (float): Noise ratio (see `text_noise_ratio`) above
+            which the cheapest tier is skipped.
+        history_size (int): Recent decisions kept by `stats`.
+    """
+
+    def __init__(
+        self,
+        generator_factory: Callable[[str], OpenAITextGenerator],
+        rules: Dict[str, List[Tuple[str, Optional[int]]]] = MODEL_ROUTING_RULES,
+        confidence_checks: Optional[Dict[str, ConfidenceCheck]] = None,
+        max_noise_ratio: float = DEFAULT_ROUTING_MAX_NOISE_RATIO,
+        history_size: int = DEFAULT_ROUTING_HISTORY_SIZE,
+    ):
+        self.generator_factory = generator_factory
+        self.rules = rules
+        self.confidence_checks = (
+            DEFAULT_CONFIDENCE_CHECKS if confidence_checks is None else confidence_checks
+        )
+        self.max_noise_ratio = max_noise_ratio
+        self.stats = RoutingStats(history_size)
+        self._generators: Dict[str, OpenAITextGenerator] = {}
+        self._lock = threading.Lock()
+
+    def generator(self, model: str) -> OpenAITextGenerator:
+        with self._lock:
+            if model not in self._generators:
+                self._generators[model] = self.generator_factory(model)
+            return self._generators[model]
+
+    @property
+    def generators(self) -> List[OpenAITextGenerator]:
+        """The generators created so far."""
+        with self._lock:
+            return list(self._generators.values())
+
+    def tiers(self, task: str) -> List[str]:
+        if task not in self.rules:
+            raise ValueError(f"No routing rule for task {task!r}")
+        return [model for model, _ in self.rules[task]]
+
+    def start_tier(self, task: str, prompt_tokens: int, noise_ratio: float = 0.0) -> int:
+        """Index of the tier a call of `prompt_tokens` tokens starts on."""
+        self.tiers(task)
+        rules = self.rules[task]
+        start = next(
+            (
+                index for index, (_, max_tokens) in enumerate(rules)
+                if max_tokens is None or prompt_tokens <= max_tokens
+            ),
+            len(rules) - 1,
+        )
+        if start == 0 and noise_ratio > self.max_noise_ratio and len(rules) > 1:
+            start = 1
+        return start
+
+    async def generate_structured(
+        self,
+        task: str,
+        user_prompt: str,
+        output_model: Type[BaseModel],
+        system_prompt: Optional[str] = None,
+        compaction: Optional[CompactionResult] = None,
+        document_text: Optional[str] = None,
+    ) -> AIGeneratorResponse:
+        """
+        `OpenAITextGenerator.async_generate_structured` on the routed model,
+        escalating as described above.
+
+        Args:
+            task (str): The routing rule to follow, e.g. "cv_extraction".
+            document_text (Optional[str]): The document in the prompt, used
+                to judge its OCR quality. Defaults to None (not judged).
+
+        Raises:
+            StructuredOutputError: If even the last tier gave unusable output.
+        """
+        models = self.tiers(task)
+        prompt_tokens = count_tokens((system_prompt or "") + user_prompt)
+        noise_ratio = text_noise_ratio(document_text) if document_text else 0.0
+        start = self.start_tier(task, prompt_tokens, noise_ratio)
+        check = self.confidence_checks.get(task)
+
+        decision = {
+            "task": task,
+            "prompt_tokens": prompt_tokens,
+            "noise_ratio": round(noise_ratio, 4),
+            "start_model": models[start],
+            "final_model": None,
+            "escalations": [],
+            "tokens": {},
+            "seconds": None,
+        }
+        started = time.perf_counter()
+        try:
+            for index in range(start, len(models)):
+                model = models[index]
+                last = index == len(models) - 1
+                try:
+                    response = await self.generator(model).async_generate_structured(
+                        user_prompt=user_prompt,
+                        output_model=output_model,
+                        system_prompt=system_prompt,
+                        compaction=compaction,
+                        max_recalls=DEFAULT_STRUCTURED_OUTPUT_MAX_RECALLS if last else 0,
+                    )
+                except StructuredOutputError as e:
+                    _increment(decision["tokens"], model, e.input_tokens + e.output_tokens)
+                    if last:
+                        raise
+                    self._escalate(decision, model, ESCALATED_INVALID, str(e))
+                    continue
+
+                _increment(
+                    decision["tokens"], model,
+                    response["input_tokens"] + response["output_tokens"],
+                )
+                reason = check(response["response"], prompt_tokens) if check else None
+                if reason and not last:
+                    self._escalate(decision, model, ESCALATED_LOW_CONFIDENCE, reason)
+                    continue
+                if reason:
+                    logger.warning(f"{task} output from {model} looks unreliable: {reason}")
+                decision["final_model"] = model
+                return response
+        finally:
+            decision["seconds"] = round(time.perf_counter() - started, 4)
+            self.stats.record(decision)
+
+    @staticmethod
+    def _escalate(decision: dict, model: str, reason: str, detail: str) -> None:
+        logger.info(f"Escalating {decision['task']} from {model} ({reason}): {detail}")
+        decision["escalations"].append({"model": model, "reason": reason, "detail": detail})
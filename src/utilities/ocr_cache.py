@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Optional
+
+from constants import DEFAULT_OCR_CACHE_DIR, DEFAULT_OCR_CACHE_MAX_BYTES
+from logger import loggerUtils as logger
+
+
+class OCRCache:
+    """
+    A content-addressed, size-bounded on-disk cache for OCR results.
+
+    Entries are keyed by the SHA-256 of the document bytes combined with the
+    OCR settings used to produce them, so the same file OCRed with a
+    different DPI or tesseract configuration gets its own entry. Each entry
+    is a small JSON file; the file modification time doubles as the LRU
+    clock and is refreshed on every hit. When the total size of the cache
+    exceeds `max_bytes`, the least recently used entries are evicted.
+
+    Args:
+        cache_dir (str): Directory holding the cache entries.
+        max_bytes (int): Upper bound on the total size of the cache on disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_OCR_CACHE_DIR,
+        max_bytes: int = DEFAULT_OCR_CACHE_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = os.path.join(os.getcwd(), cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def make_key(data: bytes, settings: dict) -> str:
+        """
+        Builds the cache key for a document.
+
+        Args:
+            data (bytes): The raw document bytes.
+            settings (dict): The OCR settings that influence the output.
+
+        Returns:
+            str: A hex digest identifying the (document, settings) pair.
+        """
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Touch the entry so it becomes the most recently used one
+            os.utime(path, None)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores a JSON-serialisable `value` under `key`."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            # Atomic rename so concurrent readers never see a partial entry
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.exception(f"Failed to write OCR cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._total_bytes += size - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current cache footprint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def _evict(self) -> None:
+        # Called with the lock held. Drop the oldest entries until the cache
+        # is back under its budget.
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def _entries(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import LLM_BATCH_BACKEND
+from constants import DEFAULT_BATCH_COMPLETION_WINDOW, DEFAULT_LOCAL_BATCH_DIR
+from logger import loggerUtils as logger
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Batch statuses after which nothing changes any more
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchBackend(ABC):
+    """Somewhere to run a JSONL file of chat completion requests."""
+
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Submits the JSONL request file and returns the batch id."""
+        pass
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Returns the batch status, e.g. "in_progress" or "completed"."""
+        pass
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterable[dict]:
+        """Yields the output lines (successes and errors) of a finished batch."""
+        pass
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Runs batches through the OpenAI Batch API."""
+
+    def __init__(
+        self, client=None, completion_window: str = DEFAULT_BATCH_COMPLETION_WINDOW
+    ) -> None:
+        if client is None:
+            from src.utilities.openai_llm_utils import OPENAI_CLIENT
+            client = OPENAI_CLIENT
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        logger.info(f"Submitted batch {batch.id} ({input_path})")
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> Iterable[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    A file-based stand-in for the Batch API that runs fully offline.
+
+    Each batch gets a directory holding its `input.jsonl`; a background
+    thread answers every request with `responder` and writes an
+    `output.jsonl` in the same format as the Batch API output file.
+
+    Args:
+        directory (str): Where batch directories are created.
+        responder (Callable[[dict], str]): Builds the completion content for
+            a request body. Defaults to the fake server's echo responder.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_LOCAL_BATCH_DIR,
+        responder: Optional[Callable[[dict], str]] = None,
+    ) -> None:
+        from src.utilities.fake_openai_server import echo_responder
+
+        self.directory = os.path.join(os.getcwd(), directory)
+        self.responder = responder or echo_responder
+        os.makedirs(self.directory, exist_ok=True)
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex}"
+        batch_dir = self._batch_dir(batch_id)
+        os.makedirs(batch_dir)
+        shutil.copyfile(input_path, os.path.join(batch_dir, "input.jsonl"))
+        self._write_status(batch_id, "in_progress")
+
+        threading.Thread(
+            target=self._process, args=(batch_id,), name=batch_id, daemon=True
+        ).start()
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        with open(os.path.join(self._batch_dir(batch_id), "status")) as f:
+            return f.read().strip()
+
+    def results(self, batch_id: str) -> Iterable[dict]:
+        with open(os.path.join(self._batch_dir(batch_id), "output.jsonl")) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _process(self, batch_id: str) -> None:
+        from src.utilities.fake_openai_server import build_chat_completion
+
+        batch_dir = self._batch_dir(batch_id)
+        try:
+            with open(os.path.join(batch_dir, "input.jsonl")) as f_in, \
+                    open(os.path.join(batch_dir, "output.jsonl"), "w") as f_out:
+                for index, line in enumerate(f_in):
+                    if not line.strip():
+                        continue
+                    request = json.loads(line)
+                    output = {
+                        "id": f"{batch_id}_req_{index}",
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": None,
+                    }
+                    try:
+                        body = build_chat_completion(
+                            request["body"],
+                            self.responder(request["body"]),
+                            f"chatcmpl-{batch_id}-{index}",
+                        )
+                        output["response"] = {"status_code": 200, "body": body}
+                    except Exception as e:
+                        output["error"] = {"code": "responder_error", "message": str(e)}
+                    f_out.write(json.dumps(output) + "\n")
+            self._write_status(batch_id, "completed")
+        except Exception as e:
+            logger.exception(f"Local batch {batch_id} failed: {e}")
+            self._write_status(batch_id, "failed")
+
+    def _write_status(self, batch_id: str, status: str) -> None:
+        path = os.path.join(self._batch_dir(batch_id), "status")
+        with open(f"{path}.tmp", "w") as f:
+            f.write(status)
+        os.replace(f"{path}.tmp", path)
+
+    def _batch_dir(self, batch_id: str) -> str:
+        return os.path.join(self.directory, batch_id)
+
+
+def create_batch_backend(name: str = LLM_BATCH_BACKEND) -> BatchBackend:
+    """Builds the batch backend selected by `LLM_BATCH_BACKEND`."""
+    if name == "local":
+        return LocalBatchBackend()
+    if name == "openai":
+        return OpenAIBatchBackend()
+    raise ValueError(f"Unknown batch backend {name!r}; use 'openai' or 'local'")
+
+
+def write_batch_file(requests: List[dict], path: str) -> None:
+    """Writes batch request lines, refusing duplicate custom ids."""
+    seen = set()
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            custom_id = request["custom_id"]
+            if custom_id in seen:
+                raise ValueError(f"Duplicate custom_id in batch: {custom_id}")
+            seen.add(custom_id)
+            f.write(json.dumps(request) + "\n")
+
+
+def index_batch_results(lines: Iterable[dict]) -> Dict[str, dict]:
+    """Maps the output lines of a batch by their custom id."""
+    return {line["custom_id"]: line for line in lines}
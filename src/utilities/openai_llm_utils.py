@@ -1,17 +1,59 @@
+import asyncio
 import json
+import os
+import tempfile
+import time
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
-from typing import Iterable, Optional, TypedDict, Union
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Type, TypedDict, Union
 
 from openai import AsyncOpenAI, OpenAI
 from openai.types.chat.chat_completion import ChatCompletion
 
-from config import OPENAI_API_KEY
-from constants import DEFAULT_OPENAI_SEED_VALUE, GPT_Model
+from config import OPENAI_API_KEY, OPENAI_BASE_URL
+from constants import (
+    DEFAULT_BATCH_POLL_INTERVAL_SECONDS,
+    DEFAULT_ESTIMATED_COMPLETION_TOKENS,
+    DEFAULT_OPENAI_SEED_VALUE,
+    DEFAULT_STRUCTURED_OUTPUT_MAX_RECALLS,
+    GPT_Model,
+)
 from logger import loggerUtils as logger
-
-OPENAI_CLIENT = OpenAI(api_key=OPENAI_API_KEY)
-ASYNC_OPENAI_CLIENT = AsyncOpenAI(api_key=OPENAI_API_KEY)
+from src.utilities.llm_cache import LLMResponseCache
+from src.utilities.text_compaction import CompactionResult
+from src.utilities.openai_batch import (
+    CHAT_COMPLETIONS_ENDPOINT,
+    TERMINAL_BATCH_STATUSES,
+    BatchBackend,
+    index_batch_results,
+    write_batch_file,
+)
+from src.utilities.llm_resilience import (
+    ResiliencePolicy,
+    ResilientExecutor,
+    get_circuit_breaker,
+)
+from src.utilities.rate_limiter import (
+    ModelRateLimiter,
+    estimate_tokens,
+    get_model_rate_limiter,
+)
+from src.utilities.tracing import LLMCallSpan, record_llm_cache_hit
+from src.utilities.structured_output import (
+    StructuredOutputError,
+    StructuredOutputStats,
+    parse_structured,
+    response_format_for,
+)
+
+# Retries are handled by ResilientExecutor (see llm_resilience.py), so the
+# SDK's own retry loop is disabled to keep attempts and backoff in one place
+OPENAI_CLIENT = OpenAI(
+    api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=0
+)
+ASYNC_OPENAI_CLIENT = AsyncOpenAI(
+    api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=0
+)
 
 
 class AIGeneratorResponse(TypedDict):
@@ -19,8 +61,24 @@ class AIGeneratorResponse(TypedDict):
     model: str
     input_tokens: int
     output_tokens: int
+    # Input tokens served from the provider's prompt prefix cache (billed at
+    # a discount and processed faster); None when the API did not report it
+    cached_input_tokens: Optional[int]
     system_prompt: Optional[str] 
     user_prompt: Optional[str] 
+    cached: bool
+    retries: int
+    hedges: int
+    # Tokens of the document text before and after `TextCompactor`, when the
+    # caller compacted it
+    text_tokens_before_compaction: Optional[int]
+    text_tokens_after_compaction: Optional[int]
+
+
+class BatchResult(TypedDict):
+    batch_id: str
+    responses: Dict[str, AIGeneratorResponse]
+    errors: Dict[str, str]
 
 
 class BaseGenerator(ABC):
@@ -87,15 +145,37 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
     A class for generating text responses using the OpenAI models with vision
     capabilities.
 
+    Like `OpenAITextGenerator`, request state is kept per call so one
+    instance can be shared by concurrent requests, and calls go through the
+    model's shared rate limiter and the resilience policy. Vision requests
+    are large, so they are retried but never hedged.
+
     Args:
-        VisionTextGenerator (class): The base class for text generation.
+        config (Optional[OpenAI_Vision_Config]): Configuration for the
+            vision generator. If None, default configuration will be used.
+        rate_limiter (Optional[ModelRateLimiter]): Limiter to use instead of
+            the shared one for the configured model.
+        resilience (Optional[ResiliencePolicy]): Timeout, retry and circuit
+            breaker settings. Defaults to `ResiliencePolicy()`.
     """
 
     # TODO: Add support for response_format(pydantic response) as done for
     # OpenAITextGenerator
 
-    def __init__(self, config: Optional[OpenAI_Vision_Config] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[OpenAI_Vision_Config] = None,
+        rate_limiter: Optional[ModelRateLimiter] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+    ) -> None:
         self.config = OpenAI_Vision_Config.get_or_create(config)
+        self.rate_limiter = rate_limiter or get_model_rate_limiter(self.config.model)
+
+        resilience = resilience or ResiliencePolicy()
+        self.resilience = ResilientExecutor(
+            resilience,
+            circuit_breaker=get_circuit_breaker(self.config.model, resilience),
+        )
 
     def generate_response(
         self,
@@ -125,8 +205,8 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
                 images to be included in the prompt. Defaults to None.
 
             `base64_encoded_images` (Optional[Iterable[bytes]], optional):
-                Base64-encoded images to be included in the prompt. Defaults
-                to None.
+                Base64-encoded JPEG images to be included in the prompt.
+                Defaults to None.
 
             *args: Variable length argument list.
             **kwargs: Arbitrary keyword arguments.
@@ -145,7 +225,9 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
             **kwargs,
         )
 
-        return self._construct_response(response, json_response)
+        return self._construct_response(
+            response, user_prompt, system_prompt, json_response
+        )
 
     def generate_raw_response(
         self,
@@ -158,15 +240,31 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
         """
         Generates a text response based on the provided prompt.
         """
-        self.user_prompt = user_prompt
-        self.system_prompt = system_prompt
-        self.json_response = json_response
-        self.image_file_urls = image_file_urls
-        self.base64_encoded_images = base64_encoded_images
+        payload = self._create_payload(
+            user_prompt,
+            system_prompt,
+            json_response,
+            image_file_urls,
+            base64_encoded_images,
+        )
+        estimated_tokens = estimate_tokens(
+            payload, DEFAULT_ESTIMATED_COMPLETION_TOKENS
+        )
+        timeout = self.resilience.policy.timeout_seconds
 
-        payload = self._create_payload()
+        def attempt():
+            with self.rate_limiter.limit_sync(estimated_tokens) as reservation:
+                response = OPENAI_CLIENT.chat.completions.create(
+                    **payload, timeout=timeout
+                )
+                reservation.settle(_total_tokens(response))
+            return response
 
-        return OPENAI_CLIENT.chat.completions.create(**payload)
+        with LLMCallSpan(self.config.model) as call:
+            response, stats = self.resilience.call_sync(attempt)
+            call.record(response)
+        response.call_retries = stats.retries
+        return response
 
     def _parse_response_content(
         self,
@@ -179,15 +277,25 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
         return _response_content
 
     def _construct_response(
-        self, response: ChatCompletion, json_response: bool = False
+        self,
+        response: ChatCompletion,
+        user_prompt: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        json_response: bool = False,
     ) -> AIGeneratorResponse:
         return {
             "response": self._parse_response_content(response, json_response),
             "input_tokens": response.usage.prompt_tokens,
             "output_tokens": response.usage.completion_tokens,
+            "cached_input_tokens": _cached_input_tokens(response),
             "model": self.config.model,
-            "system_prompt": self.system_prompt,
-            "user_prompt": self.user_prompt,
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "cached": getattr(response, "cache_hit", False),
+            "retries": getattr(response, "call_retries", 0),
+            "hedges": 0,
+            "text_tokens_before_compaction": None,
+            "text_tokens_after_compaction": None,
         }
 
     async def async_generate_response(
@@ -210,7 +318,9 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
             *args,
             **kwargs,
         )
-        return self._construct_response(response, json_response)
+        return self._construct_response(
+            response, user_prompt, system_prompt, json_response
+        )
 
     async def async_generate_raw_response(
         self,
@@ -223,17 +333,40 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
         """
         Generates a text response based on the provided prompt.
         """
-        self.user_prompt = user_prompt
-        self.system_prompt = system_prompt
-        self.json_response = json_response
-        self.image_file_urls = image_file_urls
-        self.base64_encoded_images = base64_encoded_images
+        payload = self._create_payload(
+            user_prompt,
+            system_prompt,
+            json_response,
+            image_file_urls,
+            base64_encoded_images,
+        )
+        estimated_tokens = estimate_tokens(
+            payload, DEFAULT_ESTIMATED_COMPLETION_TOKENS
+        )
+        timeout = self.resilience.policy.timeout_seconds
 
-        payload = self._create_payload()
+        async def attempt():
+            async with self.rate_limiter.limit(estimated_tokens) as reservation:
+                response = await ASYNC_OPENAI_CLIENT.chat.completions.create(
+                    **payload, timeout=timeout
+                )
+                reservation.settle(_total_tokens(response))
+            return response
 
-        return await ASYNC_OPENAI_CLIENT.chat.completions.create(**payload)
+        with LLMCallSpan(self.config.model) as call:
+            response, stats = await self.resilience.call(attempt, hedge=False)
+            call.record(response)
+        response.call_retries = stats.retries
+        return response
 
-    def _create_payload(self) -> dict:
+    def _create_payload(
+        self,
+        user_prompt: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        json_response: bool = False,
+        image_file_urls: Optional[Iterable[str]] = None,
+        base64_encoded_images: Optional[Iterable[bytes]] = None,
+    ) -> dict:
         payload = dict()
 
         payload["model"] = self.config.model
@@ -241,63 +374,44 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
         payload["temperature"] = self.config.temperature
         payload["seed"] = self.config.seed
 
-        if self.json_response:
+        if json_response:
             payload["response_format"] = {"type": "json_object"}
 
         if self.config.max_tokens:
             payload["max_tokens"] = self.config.max_tokens
 
-        system_prompt_payload = self.__create_system_prompt_payload()
-        if system_prompt_payload:
-            payload["messages"].append(system_prompt_payload)
-
-        user_prompt_payload = self.__create_user_prompt_payload()
-        if user_prompt_payload:
-            payload["messages"].append(user_prompt_payload)
+        if system_prompt:
+            payload["messages"].append({"role": "system", "content": system_prompt})
 
-        return payload
-
-    def __create_system_prompt_payload(self) -> Optional[dict]:
-        return (
-            {"role": "system", "content": self.system_prompt}
-            if self.system_prompt
-            else None
+        payload["messages"].append(
+            {
+                "role": "user",
+                "content": self.__create_user_content_payload(
+                    user_prompt, image_file_urls, base64_encoded_images
+                ),
+            }
         )
 
-    def __create_user_prompt_payload(self) -> Optional[dict]:
-        return {"role": "user", "content": self.__create_user_content_payload()}
+        return payload
 
-    def __create_user_content_payload(self):
+    def __create_user_content_payload(
+        self,
+        user_prompt: Optional[str],
+        image_file_urls: Optional[Iterable[str]],
+        base64_encoded_images: Optional[Iterable[bytes]],
+    ) -> List[dict]:
         content = []
 
-        if self.user_prompt:
-            content.append({"type": "text", "text": self.user_prompt})
-
-        if self.image_file_urls:
-            for image_file_url in self.image_file_urls:
-                content.append(
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": image_file_url,
-                            "detail": self.config.fidelity,
-                        },
-                    }
-                )
-
-        elif self.base64_encoded_images:
-            for base64_encoded_image in self.base64_encoded_images:
-                base64_image_link = f"data:image/jpeg;base64,{base64_encoded_image}"
-                content.append(
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": base64_image_link,
-                            "detail": self.config.fidelity,
-                        },
-                    }
-                )
+        if user_prompt:
+            content.append({"type": "text", "text": user_prompt})
 
+        if image_file_urls:
+            image_links = list(image_file_urls)
+        elif base64_encoded_images:
+            image_links = [
+                f"data:image/jpeg;base64,{_as_text(image)}"
+                for image in base64_encoded_images
+            ]
         else:
             raise ValueError(
                 "Invalid request. "
@@ -305,6 +419,14 @@ class OpenAIVisionTextGenerator(VisionTextGenerator):
                 "base64_encoded_images."
             )
 
+        for image_link in image_links:
+            content.append(
+                {
+                    "type": "image_url",
+                    "image_url": {"url": image_link, "detail": self.config.fidelity},
+                }
+            )
+
         return content
 
 
@@ -360,13 +482,45 @@ class OpenAITextGenerator(BaseGenerator):
     text generation using OpenAI's API. It supports system and user prompts,
     and can return responses in both plain text and JSON formats.
 
+    Request state is kept per call, so a single instance can safely be
+    shared by concurrent requests. Calls go through the process-wide rate
+    limiter of the configured model, which caps in-flight requests and keeps
+    the request and token rates within the model's limits.
+
     Args:
         config (Optional[OpenAI_Text_Config]): Configuration for the text
             generator. If None, default configuration will be used.
+        cache (Optional[LLMResponseCache]): Opt-in response cache. Identical
+            requests (same model, messages, seed, temperature,
+            response_format, ...) are then answered from the cache instead
+            of the API. Defaults to None (no caching).
+        rate_limiter (Optional[ModelRateLimiter]): Limiter to use instead of
+            the shared one for the configured model.
+        resilience (Optional[ResiliencePolicy]): Timeout, retry, hedging and
+            circuit breaker settings. The breaker is shared by every
+            generator of the same model. Defaults to `ResiliencePolicy()`.
+
+    Structured calls (`generate_structured`) count in `structured_stats` how
+    many responses were valid as returned, repaired locally or re-requested.
     """
 
-    def __init__(self, config: Optional[OpenAI_Text_Config] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[OpenAI_Text_Config] = None,
+        cache: Optional[LLMResponseCache] = None,
+        rate_limiter: Optional[ModelRateLimiter] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+    ) -> None:
         self.config: OpenAI_Text_Config = OpenAI_Text_Config.get_or_create(config)
+        self.cache = cache
+        self.rate_limiter = rate_limiter or get_model_rate_limiter(self.config.model)
+        self.structured_stats = StructuredOutputStats()
+
+        resilience = resilience or ResiliencePolicy()
+        self.resilience = ResilientExecutor(
+            resilience,
+            circuit_breaker=get_circuit_breaker(self.config.model, resilience),
+        )
 
     def generate_response(
         self,
@@ -375,6 +529,7 @@ class OpenAITextGenerator(BaseGenerator):
         json_response: bool = False,
         project_name: Optional[str] = None,
         response_format: Optional[BaseModel] = None,
+        compaction: Optional[CompactionResult] = None,
         *args,
         **kwargs,
     ) -> AIGeneratorResponse:
@@ -389,6 +544,9 @@ class OpenAITextGenerator(BaseGenerator):
                 format. Defaults to False.
             project_name (Optional[str]): Name of the project for logging
                 purposes. Defaults to None.
+            compaction (Optional[CompactionResult]): Result of compacting the
+                document text in `user_prompt`, reported in the response.
+                Defaults to None.
             *args: Variable length argument list
             **kwargs: Arbitrary keyword arguments
 
@@ -405,7 +563,14 @@ class OpenAITextGenerator(BaseGenerator):
             **kwargs,
         )
 
-        return self._construct_response(response, json_response)
+        return self._construct_response(
+            response,
+            user_prompt,
+            system_prompt,
+            json_response,
+            response_format,
+            compaction,
+        )
 
     def generate_raw_response(
         self,
@@ -413,6 +578,8 @@ class OpenAITextGenerator(BaseGenerator):
         system_prompt: Optional[str] = None,
         json_response: bool = False,
         response_format: Optional[BaseModel] = None,
+        output_model: Optional[Type[BaseModel]] = None,
+        store_in_cache: bool = True,
     ) -> ChatCompletion:
         """
         Generates a raw API response based on the provided prompts.
@@ -423,29 +590,63 @@ class OpenAITextGenerator(BaseGenerator):
                 generation. Defaults to None.
             json_response (bool): Whether to return the response in JSON
                 format. Defaults to False.
+            output_model (Optional[Type[BaseModel]]): Ask for JSON following
+                this model's schema; the content is left unparsed.
+            store_in_cache (bool): Whether to write the response to the cache.
+                Callers that validate the content first store it themselves
+                (see `_store_in_cache`). Defaults to True.
 
         Returns:
             ChatCompletion: The raw response from the OpenAI API
         """
-        self.user_prompt = user_prompt
-        self.system_prompt = system_prompt
-        self.json_response = json_response
-        self.response_format = response_format
-
-        payload = self._create_payload()
+        payload = self._create_payload(
+            user_prompt, system_prompt, json_response, response_format, output_model
+        )
 
-        # Use beta for custom response format since it's not supported in
-        # stable
-        if self.response_format is not None:
-            return OPENAI_CLIENT.beta.chat.completions.parse(**payload)
+        use_cache = self.cache is not None and self.cache.is_cacheable(payload)
+        if use_cache:
+            cached_response = self.cache.get(payload, response_format)
+            if cached_response is not None:
+                record_llm_cache_hit(self.config.model)
+                return cached_response
 
-        else:
-            return OPENAI_CLIENT.chat.completions.create(**payload)
+        estimated_tokens = estimate_tokens(
+            payload, DEFAULT_ESTIMATED_COMPLETION_TOKENS
+        )
+        timeout = self.resilience.policy.timeout_seconds
+
+        def attempt():
+            with self.rate_limiter.limit_sync(estimated_tokens) as reservation:
+                # Use beta for custom response format since it's not supported
+                # in stable
+                if response_format is not None:
+                    response = OPENAI_CLIENT.beta.chat.completions.parse(
+                        **payload, timeout=timeout
+                    )
+
+                else:
+                    response = OPENAI_CLIENT.chat.completions.create(
+                        **payload, timeout=timeout
+                    )
+
+                reservation.settle(_total_tokens(response))
+            return response
+
+        with LLMCallSpan(self.config.model) as call:
+            response, stats = self.resilience.call_sync(attempt)
+            call.record(response)
+        response.call_retries = stats.retries
+        response.call_hedges = stats.hedges
+
+        if use_cache and store_in_cache:
+            self.cache.put(payload, response)
+        return response
 
     def _parse_response_content(
         self,
         response: ChatCompletion,
         json_response: bool = False,
+        response_format: Optional[BaseModel] = None,
     ):
         """
         Parses the content from the API response.
@@ -453,11 +654,13 @@ class OpenAITextGenerator(BaseGenerator):
         Args:
             response (ChatCompletion): The API response to parse
             json_response (bool): Whether to parse the response as JSON
+            response_format (Optional[BaseModel]): The pydantic model the
+                response was parsed into, if any
 
         Returns:
-            Union[str, dict]: The parsed response content
+            Union[str, dict, BaseModel]: The parsed response content
         """
-        if self.response_format is not None:
+        if response_format is not None:
             return response.choices[0].message.parsed
 
         else:
@@ -467,25 +670,49 @@ class OpenAITextGenerator(BaseGenerator):
             return _response_content
 
     def _construct_response(
-        self, response: ChatCompletion, json_response: bool = False
+        self,
+        response: ChatCompletion,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        json_response: bool = False,
+        response_format: Optional[BaseModel] = None,
+        compaction: Optional[CompactionResult] = None,
     ) -> AIGeneratorResponse:
         """
         Constructs the final response dictionary.
 
         Args:
             response (ChatCompletion): The API response
+            user_prompt (str): The user prompt of the request
+            system_prompt (Optional[str]): The system prompt of the request
             json_response (bool): Whether the response is in JSON format
+            response_format (Optional[BaseModel]): The pydantic model the
+                response was parsed into, if any
+            compaction (Optional[CompactionResult]): Compaction applied to
+                the document text, if any
 
         Returns:
             dict: The constructed response with metadata
         """
         return {
-            "response": self._parse_response_content(response, json_response),
+            "response": self._parse_response_content(
+                response, json_response, response_format
+            ),
             "input_tokens": response.usage.prompt_tokens,
             "output_tokens": response.usage.completion_tokens,
+            "cached_input_tokens": _cached_input_tokens(response),
             "model": self.config.model,
-            "system_prompt": self.system_prompt,
-            "user_prompt": self.user_prompt,
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "cached": getattr(response, "cache_hit", False),
+            "retries": getattr(response, "call_retries", 0),
+            "hedges": getattr(response, "call_hedges", 0),
+            "text_tokens_before_compaction": (
+                compaction["tokens_before"] if compaction else None
+            ),
+            "text_tokens_after_compaction": (
+                compaction["tokens_after"] if compaction else None
+            ),
         }
 
     async def async_generate_response(
@@ -495,6 +722,7 @@ class OpenAITextGenerator(BaseGenerator):
         json_response: bool = False,
         response_format: Optional[BaseModel] = None,
         project_name: Optional[str] = None,
+        compaction: Optional[CompactionResult] = None,
         *args,
         **kwargs,
     ) -> AIGeneratorResponse:
@@ -509,6 +737,9 @@ class OpenAITextGenerator(BaseGenerator):
                 format. Defaults to False.
             project_name (Optional[str]): Name of the project for logging
                 purposes. Defaults to None.
+            compaction (Optional[CompactionResult]): Result of compacting the
+                document text in `user_prompt`, reported in the response.
+                Defaults to None.
             *args: Variable length argument list
             **kwargs: Arbitrary keyword arguments
 
@@ -524,7 +755,14 @@ class OpenAITextGenerator(BaseGenerator):
             *args,
             **kwargs,
         )
-        async_
+        return self._construct_response(
+            response,
+            user_prompt,
+            system_prompt,
+            json_response,
+            response_format,
+            compaction,
+        )
 
     async def async_generate_raw_response(
         self,
@@ -532,6 +770,8 @@ class OpenAITextGenerator(BaseGenerator):
         system_prompt: Optional[str] = None,
         json_response: bool = False,
         response_format: Optional[BaseModel] = None,
+        output_model: Optional[Type[BaseModel]] = None,
+        store_in_cache: bool = True,
     ) -> ChatCompletion:
         """
         Asynchronously generates a raw API response based on the provided prompts.
@@ -542,26 +782,417 @@ class OpenAITextGenerator(BaseGenerator):
                 generation. Defaults to None.
             json_response (bool): Whether to return the response in JSON
                 format. Defaults to False.
+            output_model (Optional[Type[BaseModel]]): Ask for JSON following
+                this model's schema; the content is left unparsed.
+            store_in_cache (bool): Whether to write the response to the cache.
+                Callers that validate the content first store it themselves
+                (see `_store_in_cache`). Defaults to True.
 
         Returns:
             ChatCompletion: The raw response from the OpenAI API
         """
-        self.user_prompt = user_prompt
-        self.system_prompt = system_prompt
-        self.json_response = json_response
-        self.response_format = response_format
+        payload = self._create_payload(
+            user_prompt, system_prompt, json_response, response_format, output_model
+        )
 
-        payload = self._create_payload()
+        # SQLite lookups are quick but blocking, so keep them off the loop
+        use_cache = self.cache is not None and self.cache.is_cacheable(payload)
+        if use_cache:
+            cached_response = await asyncio.to_thread(
+                self.cache.get, payload, response_format
+            )
+            if cached_response is not None:
+                record_llm_cache_hit(self.config.model)
+                return cached_response
+
+        estimated_tokens = estimate_tokens(
+            payload, DEFAULT_ESTIMATED_COMPLETION_TOKENS
+        )
+        timeout = self.resilience.policy.timeout_seconds
+
+        async def attempt():
+            # Every attempt, including hedged duplicates, takes its own slot
+            async with self.rate_limiter.limit(estimated_tokens) as reservation:
+                # Use beta for custom response format since it's not supported
+                # in stable
+                if response_format is not None:
+                    response = await ASYNC_OPENAI_CLIENT.beta.chat.completions.parse(
+                        **payload, timeout=timeout
+                    )
+
+                else:
+                    response = await ASYNC_OPENAI_CLIENT.chat.completions.create(
+                        **payload, timeout=timeout
+                    )
+
+                reservation.settle(_total_tokens(response))
+            return response
+
+        with LLMCallSpan(self.config.model) as call:
+            response, stats = await self.resilience.call(attempt)
+            call.record(response)
+        response.call_retries = stats.retries
+        response.call_hedges = stats.hedges
+
+        if use_cache and store_in_cache:
+            await asyncio.to_thread(self.cache.put, payload, response)
+        return response
+
+    async def async_stream_response(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        json_response: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Asynchronously generates a text response and yields the content
+        deltas as the model produces them.
 
-        # Use beta for custom response format since it's not supported in
-        # stable
-        if self.response_format is not None:
-            return await ASYNC_OPENAI_CLIENT.beta.chat.completions.parse(**payload)
+        Opening the stream goes through the resilience policy (timeouts,
+        retries, circuit breaker) but is not hedged, and once the first
+        chunk has arrived a failure is raised to the caller rather than
+        retried. The rate limiter slot is held until the stream ends. A
+        cache hit is yielded as a single delta; streamed responses are not
+        written to the cache.
 
-        else:
-            return await ASYNC_OPENAI_CLIENT.chat.completions.create(**payload)
+        Args:
+            user_prompt (str): The input prompt for text generation
+            system_prompt (Optional[str]): The system prompt for text
+                generation. Defaults to None.
+            json_response (bool): Whether to request a JSON response.
+                Defaults to False.
+
+        Yields:
+            str: The content deltas of the response
+        """
+        payload = self._create_payload(user_prompt, system_prompt, json_response)
+
+        if self.cache is not None and self.cache.is_cacheable(payload):
+            cached_response = await asyncio.to_thread(self.cache.get, payload)
+            if cached_response is not None:
+                record_llm_cache_hit(self.config.model)
+                yield cached_response.choices[0].message.content
+                return
+
+        estimated_tokens = estimate_tokens(
+            payload, DEFAULT_ESTIMATED_COMPLETION_TOKENS
+        )
+        timeout = self.resilience.policy.timeout_seconds
+
+        async def open_stream():
+            return await ASYNC_OPENAI_CLIENT.chat.completions.create(
+                **payload,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+            )
+
+        # The span covers the whole stream, so its duration is the time to
+        # the last chunk
+        with LLMCallSpan(self.config.model) as call:
+            async with self.rate_limiter.limit(estimated_tokens) as reservation:
+                stream, _ = await self.resilience.call(open_stream, hedge=False)
+                try:
+                    async for chunk in stream:
+                        if chunk.usage is not None:
+                            reservation.settle(chunk.usage.total_tokens)
+                            call.record(chunk)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await stream.close()
+
+    def generate_structured(
+        self,
+        user_prompt: str,
+        output_model: Type[BaseModel],
+        system_prompt: Optional[str] = None,
+        compaction: Optional[CompactionResult] = None,
+        max_recalls: int = DEFAULT_STRUCTURED_OUTPUT_MAX_RECALLS,
+    ) -> AIGeneratorResponse:
+        """
+        Generates a response parsed into `output_model`.
+
+        The model is asked for JSON following the schema of `output_model`.
+        Malformed output (code fences, text around the JSON, trailing commas,
+        truncation) is repaired locally; only output that still does not fit
+        the model is requested again, at most `max_recalls` times, with the
+        validation error added to the prompt.
+
+        Args:
+            user_prompt (str): The input prompt for text generation
+            output_model (Type[BaseModel]): The pydantic model to parse into
+            system_prompt (Optional[str]): The system prompt for text
+                generation. Defaults to None.
+            compaction (Optional[CompactionResult]): Result of compacting the
+                document text in `user_prompt`. Defaults to None.
+            max_recalls (int): Extra calls allowed for unusable output.
+
+        Returns:
+            dict: The response, with the parsed model under "response"
+
+        Raises:
+            StructuredOutputError: If no call produced usable output.
+        """
+        prompt = user_prompt
+        usage = [0, 0]
+        for recall in range(max_recalls + 1):
+            # Cached only once it parses, so unusable output is not replayed
+            response = self.generate_raw_response(
+                user_prompt=prompt,
+                system_prompt=system_prompt,
+                output_model=output_model,
+                store_in_cache=False,
+            )
+            _add_usage(usage, response)
+            try:
+                parsed = self._parse_structured(response, output_model)
+                usable = True
+            except StructuredOutputError as e:
+                error, usable = e, False
+                error.input_tokens, error.output_tokens = usage
+            self._store_in_cache(prompt, system_prompt, output_model, response, usable)
+            if usable:
+                break
+            prompt = self._handle_unusable_output(user_prompt, error, recall, max_recalls)
+
+        result = self._construct_response(
+            response, prompt, system_prompt, compaction=compaction
+        )
+        result["response"] = parsed
+        # Count the discarded attempts too, not only the final response
+        result["input_tokens"], result["output_tokens"] = usage
+        return result
+
+    async def async_generate_structured(
+        self,
+        user_prompt: str,
+        output_model: Type[BaseModel],
+        system_prompt: Optional[str] = None,
+        compaction: Optional[CompactionResult] = None,
+        max_recalls: int = DEFAULT_STRUCTURED_OUTPUT_MAX_RECALLS,
+    ) -> AIGeneratorResponse:
+        """Asynchronous version of `generate_structured`."""
+        prompt = user_prompt
+        usage = [0, 0]
+        for recall in range(max_recalls + 1):
+            response = await self.async_generate_raw_response(
+                user_prompt=prompt,
+                system_prompt=system_prompt,
+                output_model=output_model,
+                store_in_cache=False,
+            )
+            _add_usage(usage, response)
+            try:
+                parsed = self._parse_structured(response, output_model)
+                usable = True
+            except StructuredOutputError as e:
+                error, usable = e, False
+                error.input_tokens, error.output_tokens = usage
+            if self.cache is not None:
+                await asyncio.to_thread(
+                    self._store_in_cache, prompt, system_prompt, output_model, response, usable
+                )
+            if usable:
+                break
+            prompt = self._handle_unusable_output(user_prompt, error, recall, max_recalls)
+
+        result = self._construct_response(
+            response, prompt, system_prompt, compaction=compaction
+        )
+        result["response"] = parsed
+        # Count the discarded attempts too, not only the final response
+        result["input_tokens"], result["output_tokens"] = usage
+        return result
+
+    def _parse_structured(
+        self, response: ChatCompletion, output_model: Type[BaseModel]
+    ) -> BaseModel:
+        try:
+            parsed, repaired = parse_structured(
+                response.choices[0].message.content, output_model
+            )
+        except StructuredOutputError:
+            self.structured_stats.record(responses=1)
+            raise
+        self.structured_stats.record(
+            responses=1, valid=int(not repaired), repaired=int(repaired)
+        )
+        return parsed
+
+    def _store_in_cache(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str],
+        output_model: Type[BaseModel],
+        response: ChatCompletion,
+        usable: bool,
+    ) -> None:
+        """
+        Caches a structured response once its content has parsed. An unusable
+        response that came from the cache (written before it was validated)
+        is dropped instead.
+        """
+        if self.cache is None:
+            return
+        payload = self._create_payload(
+            user_prompt, system_prompt, output_model=output_model
+        )
+        if not self.cache.is_cacheable(payload):
+            return
+        cache_hit = getattr(response, "cache_hit", False)
+        if usable and not cache_hit:
+            self.cache.put(payload, response)
+        elif not usable and cache_hit:
+            self.cache.delete(payload)
+
+    def _handle_unusable_output(
+        self, user_prompt: str, error: StructuredOutputError, recall: int, max_recalls: int
+    ) -> str:
+        """Counts the failure and returns the prompt to ask again with."""
+        if recall == max_recalls:
+            self.structured_stats.record(failures=1)
+            raise error
+        self.structured_stats.record(recalls=1)
+        logger.warning(f"Re-requesting unusable structured output: {error}")
+        return (
+            f"{user_prompt}\n\nYour previous reply could not be used ({error}). "
+            "Reply with only the JSON object, following the schema exactly."
+        )
+
+    def build_batch_request(
+        self,
+        custom_id: str,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        json_response: bool = False,
+    ) -> dict:
+        """
+        Builds one line of a batch input file for the given prompts.
+
+        Args:
+            custom_id (str): Identifier used to map the result back
+            user_prompt (str): The input prompt for text generation
+            system_prompt (Optional[str]): The system prompt for text
+                generation. Defaults to None.
+            json_response (bool): Whether to request a JSON response.
+                Defaults to False.
+
+        Returns:
+            dict: The batch request line
+        """
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": CHAT_COMPLETIONS_ENDPOINT,
+            "body": self._create_payload(user_prompt, system_prompt, json_response),
+        }
+
+    def run_batch(
+        self,
+        requests: List[dict],
+        backend: BatchBackend,
+        json_response: bool = False,
+        poll_interval_seconds: float = DEFAULT_BATCH_POLL_INTERVAL_SECONDS,
+        timeout_seconds: Optional[float] = None,
+    ) -> BatchResult:
+        """
+        Runs requests built with `build_batch_request` as a single batch job
+        and waits for it to finish. This trades latency (a batch can take up
+        to its completion window) for throughput and cost on large offline
+        runs.
+
+        Args:
+            requests (List[dict]): The batch request lines
+            backend (BatchBackend): Where to run the batch
+            json_response (bool): Whether to parse the responses as JSON
+            poll_interval_seconds (float): Delay between status checks
+            timeout_seconds (Optional[float]): Give up waiting after this
+                long. Defaults to None (wait for the batch to finish).
+
+        Returns:
+            dict: The batch id, the responses keyed by custom id, and an
+                error message for every request that did not succeed
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, "batch_input.jsonl")
+            write_batch_file(requests, input_path)
+            batch_id = backend.submit(input_path)
+
+        started = time.monotonic()
+        status = backend.status(batch_id)
+        while status not in TERMINAL_BATCH_STATUSES:
+            if timeout_seconds and time.monotonic() - started > timeout_seconds:
+                raise TimeoutError(
+                    f"Batch {batch_id} still {status} after {timeout_seconds}s"
+                )
+            time.sleep(poll_interval_seconds)
+            status = backend.status(batch_id)
+
+        if status != "completed":
+            raise RuntimeError(f"Batch {batch_id} finished with status {status}")
+
+        results = index_batch_results(backend.results(batch_id))
+        responses, errors = {}, {}
+        for request in requests:
+            custom_id = request["custom_id"]
+            result = results.get(custom_id)
+            if result is None:
+                errors[custom_id] = "Missing from batch output"
+                continue
+
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                errors[custom_id] = json.dumps(
+                    result.get("error") or response.get("body")
+                )
+                continue
+
+            messages = request["body"]["messages"]
+            system_prompt = next(
+                (m["content"] for m in messages if m["role"] == "system"), None
+            )
+            try:
+                responses[custom_id] = self._construct_response(
+                    ChatCompletion.model_validate(response["body"]),
+                    messages[-1]["content"],
+                    system_prompt,
+                    json_response,
+                )
+            except Exception as e:
+                errors[custom_id] = f"Unparseable response: {e}"
 
-    def _create_payload(self) -> dict:
+        logger.info(
+            f"Batch {batch_id}: {len(responses)} succeeded, {len(errors)} failed"
+        )
+        return {"batch_id": batch_id, "responses": responses, "errors": errors}
+
+    async def async_run_batch(
+        self,
+        requests: List[dict],
+        backend: BatchBackend,
+        json_response: bool = False,
+        poll_interval_seconds: float = DEFAULT_BATCH_POLL_INTERVAL_SECONDS,
+        timeout_seconds: Optional[float] = None,
+    ) -> BatchResult:
+        """Async counterpart of `run_batch`; polls in a worker thread."""
+        return await asyncio.to_thread(
+            self.run_batch,
+            requests,
+            backend,
+            json_response,
+            poll_interval_seconds,
+            timeout_seconds,
+        )
+
+    def _create_payload(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        json_response: bool = False,
+        response_format: Optional[BaseModel] = None,
+        output_model: Optional[Type[BaseModel]] = None,
+    ) -> dict:
         """
         Creates the payload for the API request.
 
@@ -578,20 +1209,44 @@ class OpenAITextGenerator(BaseGenerator):
             "presence_penalty": self.config.presence_penalty,
         }
 
-        if self.json_response:
+        if json_response:
             payload["response_format"] = {"type": "json_object"}
 
-        if self.response_format:
-            payload["response_format"] = self.response_format
+        if response_format:
+            payload["response_format"] = response_format
+
+        if output_model is not None:
+            payload["response_format"] = response_format_for(output_model)
 
         if self.config.max_tokens:
             payload["max_tokens"] = self.config.max_tokens
 
-        if self.system_prompt:
+        if system_prompt:
             payload["messages"].append(
-                {"role": "system", "content": self.system_prompt}
+                {"role": "system", "content": system_prompt}
             )
 
-        payload["messages"].append({"role": "user", "content": self.user_prompt})
+        payload["messages"].append({"role": "user", "content": user_prompt})
+
+        return payload
+
+
+def _as_text(image: Union[str, bytes]) -> str:
+    return image.decode("ascii") if isinstance(image, (bytes, bytearray)) else image
+
+
+def _cached_input_tokens(response: ChatCompletion) -> Optional[int]:
+    details = getattr(response.usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None) if details else None
+
+
+def _add_usage(usage: List[int], response: ChatCompletion) -> None:
+    """Adds a response's input and output tokens to a running [input, output] total."""
+    if response.usage is not None:
+        usage[0] += response.usage.prompt_tokens or 0
+        usage[1] += response.usage.completion_tokens or 0
+
 
-        return payload
\ No newline at end of file
+def _total_tokens(response: ChatCompletion) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return usage.total_tokens if usage else None
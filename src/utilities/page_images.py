@@ -0,0 +1,56 @@
+import base64
+import io
+import math
+from typing import List, Tuple, Union
+
+from PIL import Image
+
+from constants import DEFAULT_VISION_JPEG_QUALITY, DEFAULT_VISION_RENDER_DPI
+
+
+def vision_image_size(width: int, height: int, fidelity: str) -> Tuple[int, int]:
+    """
+    Size the OpenAI vision API scales an image to before reading it: within
+    512x512 for "low" detail; for "high", within 2048x2048 and then with the
+    shortest side at most 768px. Images are never scaled up.
+    """
+    if fidelity == "low":
+        scale = min(1.0, 512 / max(width, height))
+    else:
+        scale = min(1.0, 2048 / max(width, height), 768 / min(width, height))
+    return max(1, math.floor(width * scale)), max(1, math.floor(height * scale))
+
+
+def render_pages(
+    source: Union[str, bytes], is_pdf: bool, dpi: int = DEFAULT_VISION_RENDER_DPI
+) -> List[Image.Image]:
+    """Page images of a PDF (rendered at `dpi`) or of an image file."""
+    if is_pdf:
+        from pdf2image import convert_from_bytes, convert_from_path
+
+        convert = convert_from_path if isinstance(source, str) else convert_from_bytes
+        return convert(source, dpi=dpi)
+
+    image = Image.open(source if isinstance(source, str) else io.BytesIO(source))
+    image.load()
+    return [image]
+
+
+def encode_page(
+    image: Image.Image,
+    fidelity: str = "high",
+    quality: int = DEFAULT_VISION_JPEG_QUALITY,
+    grayscale: bool = True,
+) -> str:
+    """
+    Compresses a page image into a base64 JPEG no larger than the vision
+    API would use at `fidelity`.
+    """
+    image = image.convert("L" if grayscale else "RGB")
+    size = vision_image_size(image.width, image.height, fidelity)
+    if size != image.size:
+        image = image.resize(size, Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
@@ -0,0 +1,329 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from constants import (
+    DEFAULT_MODEL_RATE_LIMIT,
+    GPT_MODEL_RATE_LIMITS,
+    VISION_IMAGE_TOKEN_ESTIMATES,
+)
+from logger import loggerUtils as logger
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket holding up to `capacity` tokens and refilling
+    at `capacity / period_seconds` tokens per second.
+
+    The level may go negative when a reservation turns out to be smaller
+    than what was actually used; later callers then wait for the debt to be
+    refilled.
+    """
+
+    def __init__(self, capacity: float, period_seconds: float = 60.0) -> None:
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period_seconds
+        self._level = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, amount: float) -> float:
+        """
+        Takes `amount` tokens if they are available and returns 0. Otherwise
+        takes nothing and returns the seconds to wait before retrying.
+        """
+        # A request larger than the whole bucket would never fit; let it
+        # through once the bucket is full instead of blocking forever
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._level >= amount:
+                self._level -= amount
+                return 0.0
+            return (amount - self._level) / self.refill_rate
+
+    def adjust(self, amount: float) -> None:
+        """Returns (positive) or charges (negative) tokens after the fact."""
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+
+    @property
+    def level(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._level
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated_at) * self.refill_rate
+        )
+        self._updated_at = now
+
+
+class RateLimitReservation:
+    """Handle for one admitted request; settle it with the real usage."""
+
+    def __init__(self, limiter: "ModelRateLimiter", estimated_tokens: int) -> None:
+        self._limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.wait_seconds = 0.0
+
+    def settle(self, actual_tokens: Optional[int]) -> None:
+        if actual_tokens is None or self._limiter.tokens is None:
+            return
+        self._limiter.tokens.adjust(self.estimated_tokens - actual_tokens)
+        self.estimated_tokens = actual_tokens
+
+
+class _SharedSlots:
+    """
+    A counting semaphore shared by threads and by coroutines on any event
+    loop. Freed slots are handed to waiters in arrival order, whichever
+    kind they are; coroutines wait on a future rather than a thread.
+    """
+
+    def __init__(self, value: int) -> None:
+        self._value = value
+        self._lock = threading.Lock()
+        # threading.Event for threads, (loop, future) for coroutines
+        self._waiters = deque()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._value > 0:
+                self._value -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        # Set once a slot has been handed over to this thread
+        event.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0:
+                self._value -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            # A slot handed over just before the cancellation is given back;
+            # one still on its way is given back by `_hand_over`
+            if handed_over and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+            self._value += 1
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        # Runs on the waiter's loop
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ModelRateLimiter:
+    """
+    Client-side limits for one model: a cap on in-flight requests plus
+    token buckets for requests per minute and tokens per minute.
+
+    Requests are admitted once a concurrency slot is free and both buckets
+    can cover the request; the token bucket is charged with an estimate up
+    front and corrected with the real usage when the response arrives. The
+    in-flight cap is shared by sync and async callers (and by every event
+    loop), so together they never exceed `max_in_flight`.
+
+    Args:
+        max_in_flight (int): Concurrent requests allowed.
+        requests_per_minute (Optional[int]): RPM limit, None to disable.
+        tokens_per_minute (Optional[int]): TPM limit, None to disable.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.in_flight = 0
+        self.throttled = 0
+        # Guards the counters, which threads and event loops all update
+        self._counters_lock = threading.Lock()
+
+        self._slots = _SharedSlots(max_in_flight)
+        # Admission is serialised per event loop; asyncio locks are bound to
+        # the loop they are used on
+        self._admission_locks = weakref.WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def limit(self, estimated_tokens: int):
+        """Waits until the request may be sent, holding a slot while it runs."""
+        await self._slots.acquire_async()
+        try:
+            reservation = RateLimitReservation(self, estimated_tokens)
+            # Admission is serialised so waiting requests go out in order
+            async with self._admission_lock():
+                while True:
+                    wait = self._try_admit(estimated_tokens)
+                    if not wait:
+                        break
+                    reservation.wait_seconds += wait
+                    await asyncio.sleep(wait)
+
+            with self._in_flight():
+                yield reservation
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def limit_sync(self, estimated_tokens: int):
+        """Blocking counterpart of `limit` for synchronous callers."""
+        self._slots.acquire()
+        try:
+            reservation = RateLimitReservation(self, estimated_tokens)
+            while True:
+                wait = self._try_admit(estimated_tokens)
+                if not wait:
+                    break
+                reservation.wait_seconds += wait
+                time.sleep(wait)
+
+            with self._in_flight():
+                yield reservation
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "throttled": self.throttled,
+            "request_tokens_available": self.requests.level if self.requests else None,
+            "tokens_available": self.tokens.level if self.tokens else None,
+        }
+
+    def _try_admit(self, estimated_tokens: int) -> float:
+        if self.requests is not None:
+            wait = self.requests.try_acquire(1)
+            if wait:
+                self._count_throttled()
+                return wait
+
+        if self.tokens is not None:
+            wait = self.tokens.try_acquire(estimated_tokens)
+            if wait:
+                # Give the request slot back; the whole request is retried
+                if self.requests is not None:
+                    self.requests.adjust(1)
+                self._count_throttled()
+                return wait
+
+        return 0.0
+
+    def _count_throttled(self) -> None:
+        with self._counters_lock:
+            self.throttled += 1
+
+    @contextmanager
+    def _in_flight(self):
+        with self._counters_lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._counters_lock:
+                self.in_flight -= 1
+
+    def _admission_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._counters_lock:
+            lock = self._admission_locks.get(loop)
+            if lock is None:
+                lock = self._admission_locks[loop] = asyncio.Lock()
+            return lock
+
+
+_MODEL_RATE_LIMITERS: Dict[str, ModelRateLimiter] = {}
+_MODEL_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_model_rate_limiter(model: str) -> ModelRateLimiter:
+    """
+    Returns the process-wide limiter for `model`, so every generator using
+    the same model shares one budget. Limits come from
+    `GPT_MODEL_RATE_LIMITS`.
+    """
+    with _MODEL_RATE_LIMITERS_LOCK:
+        limiter = _MODEL_RATE_LIMITERS.get(model)
+        if limiter is None:
+            limits = GPT_MODEL_RATE_LIMITS.get(model, DEFAULT_MODEL_RATE_LIMIT)
+            limiter = ModelRateLimiter(**limits)
+            _MODEL_RATE_LIMITERS[model] = limiter
+            logger.debug(f"Created rate limiter for {model}: {limits}")
+        return limiter
+
+
+def set_model_rate_limit(
+    model: str,
+    max_in_flight: int,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+) -> ModelRateLimiter:
+    """Replaces the shared limiter for `model`, e.g. to match an account tier."""
+    limiter = ModelRateLimiter(max_in_flight, requests_per_minute, tokens_per_minute)
+    with _MODEL_RATE_LIMITERS_LOCK:
+        _MODEL_RATE_LIMITERS[model] = limiter
+    return limiter
+
+
+def estimate_tokens(payload: dict, default_completion_tokens: int) -> int:
+    """
+    Rough token estimate for a chat payload (about 4 characters per token,
+    a fixed cost per image by detail level), plus the completion budget.
+    """
+    characters = 0
+    image_tokens = 0
+    for message in payload.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "image_url":
+                    detail = part["image_url"].get("detail", "high")
+                    image_tokens += VISION_IMAGE_TOKEN_ESTIMATES.get(
+                        detail, VISION_IMAGE_TOKEN_ESTIMATES["high"]
+                    )
+                else:
+                    characters += len(part.get("text", ""))
+    completion_tokens = payload.get("max_tokens") or default_completion_tokens
+    return characters // 4 + image_tokens + completion_tokens
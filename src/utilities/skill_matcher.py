@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from constants import DEFAULT_SKILLS_AUTOMATON_PATH
+from logger import loggerUtils as logger
+from src.utilities.skills_taxonomy import (
+    CASE_SENSITIVE_ALIASES,
+    CONTEXT_REQUIRED_ALIASES,
+    SKILLS_TAXONOMY,
+)
+
+# Bump when the saved layout changes so stale automata are rebuilt
+_FORMAT_VERSION = 2
+
+# A context-requiring match needs the nearest token on either side, skipping
+# connectors, to be another skill or one of the context words
+_CONTEXT_WORDS = {
+    "language", "languages", "programming", "program", "programs", "code",
+    "coding", "developer", "development", "embedded", "firmware", "scripting",
+    "skills",
+}
+_CONNECTOR_WORDS = {"and", "or", "in", "with", "/", "&"}
+
+# Words, optionally with a leading dot (".NET"), inner dots or dashes
+# ("Node.js", "scikit-learn") and trailing +/# ("C++", "C#"); "/" and "&"
+# are tokens of their own so "CI/CD" matches however it is spaced
+_TOKEN_RE = re.compile(r"\.?[A-Za-z0-9][A-Za-z0-9+#]*(?:[.\-][A-Za-z0-9+#]+)*|[/&]")
+
+
+def tokenize(text: str) -> List[re.Match]:
+    return list(_TOKEN_RE.finditer(text))
+
+
+class SkillMatcher:
+    """
+    Finds the skills of a taxonomy in free text with a token-level
+    Aho-Corasick automaton.
+
+    Every canonical skill name and alias is split into tokens and inserted
+    into one trie, so a document is scanned once, token by token, whatever
+    the size of the taxonomy. Matching works on whole tokens (no "Java" in
+    "JavaScript") and is case-insensitive, except for aliases listed in
+    `case_sensitive` ("Go", "R", "React"...), which must appear exactly as
+    written there. Aliases listed in `context_required` ("C", "R") are
+    also initials and grades, so they only count next to another skill or
+    a word like "programming" ("C and Python", not "John C. Smith"). Overlapping matches
+    resolve to the leftmost, longest one ("Machine Learning Engineer" ->
+    "Machine Learning"), and every match is reported under its canonical
+    name ("k8s" -> "Kubernetes").
+
+    Building the automaton for a large taxonomy takes a moment, so `load`
+    keeps a JSON copy keyed by a fingerprint of the taxonomy.
+
+    Args:
+        taxonomy (Dict[str, List[str]]): Canonical skill name -> aliases.
+        case_sensitive (Iterable[str]): Aliases that only match with this
+            exact spelling.
+        context_required (Iterable[str]): Aliases that only match next to
+            another skill or a programming word.
+    """
+
+    def __init__(
+        self,
+        taxonomy: Dict[str, List[str]] = SKILLS_TAXONOMY,
+        case_sensitive: Iterable[str] = CASE_SENSITIVE_ALIASES,
+        context_required: Iterable[str] = CONTEXT_REQUIRED_ALIASES,
+    ) -> None:
+        self.fingerprint = _fingerprint(taxonomy, case_sensitive, context_required)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        # Per pattern: canonical name, length in tokens, exact spelling and
+        # whether it needs context
+        self._canonical: List[str] = []
+        self._lengths: List[int] = []
+        self._required: List[Optional[Tuple[str, ...]]] = []
+        self._needs_context: List[bool] = []
+
+        exact = {alias.casefold(): alias for alias in case_sensitive}
+        needs_context = {alias.casefold() for alias in context_required}
+        for canonical, aliases in taxonomy.items():
+            for alias in dict.fromkeys([canonical, *aliases]):
+                self._add_pattern(
+                    alias,
+                    canonical,
+                    exact.get(alias.casefold()),
+                    alias.casefold() in needs_context,
+                )
+        self._build_failure_links()
+
+    @classmethod
+    def load(
+        cls,
+        path: str = DEFAULT_SKILLS_AUTOMATON_PATH,
+        taxonomy: Dict[str, List[str]] = SKILLS_TAXONOMY,
+        case_sensitive: Iterable[str] = CASE_SENSITIVE_ALIASES,
+        context_required: Iterable[str] = CONTEXT_REQUIRED_ALIASES,
+    ) -> "SkillMatcher":
+        """
+        Loads the automaton saved at `path`, rebuilding it if stale. The
+        file's first line is the fingerprint; the rest is only parsed when
+        that matches.
+        """
+        path = os.path.join(os.getcwd(), path)
+        fingerprint = _fingerprint(taxonomy, case_sensitive, context_required)
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.readline().strip() == fingerprint:
+                    return cls._from_state(fingerprint, json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable skills automaton {path}: {e}")
+
+        matcher = cls(taxonomy, case_sensitive, context_required)
+        matcher.save(path)
+        return matcher
+
+    def save(self, path: str = DEFAULT_SKILLS_AUTOMATON_PATH) -> None:
+        path = os.path.join(os.getcwd(), path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        state = {
+            "goto": self._goto,
+            "fail": self._fail,
+            "outputs": self._outputs,
+            "canonical": self._canonical,
+            "lengths": self._lengths,
+            "required": self._required,
+            "needs_context": self._needs_context,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.fingerprint + "\n")
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def _from_state(cls, fingerprint: str, state: dict) -> "SkillMatcher":
+        matcher = cls.__new__(cls)
+        matcher.fingerprint = fingerprint
+        matcher._goto = [
+            {str(key): int(child) for key, child in edges.items()}
+            for edges in state["goto"]
+        ]
+        matcher._fail = [int(fallback) for fallback in state["fail"]]
+        matcher._outputs = [[int(pattern) for pattern in patterns] for patterns in state["outputs"]]
+        matcher._canonical = [str(name) for name in state["canonical"]]
+        matcher._lengths = [int(length) for length in state["lengths"]]
+        matcher._required = [
+            None if tokens is None else tuple(str(token) for token in tokens)
+            for tokens in state["required"]
+        ]
+        matcher._needs_context = [bool(flag) for flag in state["needs_context"]]
+        patterns = len(matcher._canonical)
+        if not (
+            len(matcher._fail) == len(matcher._outputs) == len(matcher._goto)
+            and len(matcher._lengths) == len(matcher._required)
+            == len(matcher._needs_context) == patterns
+        ):
+            raise ValueError("inconsistent automaton state")
+        return matcher
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical names of the skills in `text`, in order of appearance."""
+        skills = []
+        seen = set()
+        for _, _, pattern in self._match(_TOKEN_RE.findall(text or "")):
+            canonical = self._canonical[pattern]
+            if canonical not in seen:
+                seen.add(canonical)
+                skills.append(canonical)
+        return skills
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.extract(text) for text in texts]
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """Non-overlapping matches as (canonical name, start, end) offsets."""
+        tokens = tokenize(text or "")
+        return [
+            (self._canonical[pattern], tokens[start].start(), tokens[end].end())
+            for start, end, pattern in self._match([token.group() for token in tokens])
+        ]
+
+    def _match(self, tokens: List[str]) -> List[Tuple[int, int, int]]:
+        """Leftmost-longest, non-overlapping (first, last token, pattern) matches."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+
+        candidates = []
+        state = 0
+        for index, token in enumerate(tokens):
+            key = token.casefold()
+            while state and key not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(key, 0)
+            if not state:
+                continue
+
+            for pattern in outputs[state]:
+                start = index - self._lengths[pattern] + 1
+                required = self._required[pattern]
+                if required is not None and required != tuple(tokens[start:index + 1]):
+                    continue
+                candidates.append((start, index, pattern))
+
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        next_free = 0
+        for start, end, pattern in candidates:
+            if start >= next_free:
+                matches.append((start, end, pattern))
+                next_free = end + 1
+
+        if not any(self._needs_context[pattern] for _, _, pattern in matches):
+            return matches
+        # Tokens covered by skills that stand on their own
+        anchored = {
+            index
+            for start, end, pattern in matches
+            if not self._needs_context[pattern]
+            for index in range(start, end + 1)
+        }
+        return [
+            (start, end, pattern)
+            for start, end, pattern in matches
+            if not self._needs_context[pattern]
+            or _has_context(tokens, anchored, start, end)
+        ]
+
+    def _add_pattern(
+        self, alias: str, canonical: str, exact: Optional[str], needs_context: bool
+    ) -> None:
+        tokens = [match.group() for match in tokenize(alias)]
+        if not tokens:
+            return
+
+        state = 0
+        for token in tokens:
+            key = token.casefold()
+            next_state = self._goto[state].get(key)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][key] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+
+        pattern = len(self._canonical)
+        self._canonical.append(canonical)
+        self._lengths.append(len(tokens))
+        self._required.append(
+            tuple(match.group() for match in tokenize(exact)) if exact else None
+        )
+        self._needs_context.append(needs_context)
+        self._outputs[state].append(pattern)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for key, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and key not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(key, 0)
+                # Patterns ending at the fallback state also end here
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+
+def _has_context(tokens: List[str], anchored: set, start: int, end: int) -> bool:
+    for index, step in ((start - 1, -1), (end + 1, 1)):
+        while 0 <= index < len(tokens) and tokens[index].casefold() in _CONNECTOR_WORDS:
+            index += step
+        if 0 <= index < len(tokens) and (
+            index in anchored or tokens[index].casefold() in _CONTEXT_WORDS
+        ):
+            return True
+    return False
+
+
+def _fingerprint(
+    taxonomy: Dict[str, List[str]],
+    case_sensitive: Iterable[str],
+    context_required: Iterable[str],
+) -> str:
+    payload = json.dumps(
+        [
+            _FORMAT_VERSION,
+            taxonomy,
+            sorted(set(case_sensitive)),
+            sorted(set(context_required)),
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
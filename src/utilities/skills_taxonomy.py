@@ -0,0 +1,152 @@
+# Technical skills recognised by the local skill extractor: canonical name
+# -> aliases. The canonical name itself is always matched as well.
+SKILLS_TAXONOMY = {
+    # Languages
+    "Python": ["python3", "py"],
+    "Java": [],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": ["ts"],
+    "C": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Ruby": [],
+    "PHP": [],
+    "Swift": [],
+    "Kotlin": [],
+    "Scala": [],
+    "R": [],
+    "MATLAB": [],
+    "Perl": [],
+    "Dart": [],
+    "Bash": ["shell scripting", "shell script"],
+    "SQL": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    # Web and backend frameworks
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angular.js", "angularjs"],
+    "Vue.js": ["vue", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Node.js": ["node", "nodejs"],
+    "Express.js": ["express", "expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring Boot": ["spring"],
+    "Ruby on Rails": ["rails"],
+    ".NET": ["dotnet", "asp.net"],
+    "GraphQL": [],
+    "REST APIs": ["rest", "restful", "rest api", "restful apis", "rest apis", "restful api"],
+    "gRPC": [],
+    "Microservices": ["microservice", "micro services"],
+    # Data and ML
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "Artificial Intelligence": ["ai"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": [],
+    "Large Language Models": ["llm", "llms"],
+    "Generative AI": ["genai", "gen ai"],
+    "Retrieval-Augmented Generation": ["rag"],
+    "TensorFlow": ["tf"],
+    "PyTorch": ["torch"],
+    "Keras": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "XGBoost": [],
+    "LightGBM": [],
+    "Pandas": [],
+    "NumPy": [],
+    "SciPy": [],
+    "Matplotlib": [],
+    "OpenCV": [],
+    "Hugging Face": ["huggingface", "hugging face transformers"],
+    "LangChain": [],
+    "Data Analysis": ["data analytics"],
+    "Data Visualization": [],
+    "Statistics": ["statistical analysis"],
+    "Apache Spark": ["spark", "pyspark"],
+    "Hadoop": [],
+    "Apache Kafka": ["kafka"],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "ETL": [],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["microsoft excel", "ms excel"],
+    # Databases
+    "PostgreSQL": ["postgres"],
+    "MySQL": [],
+    "SQLite": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "Cassandra": [],
+    "DynamoDB": [],
+    "Oracle Database": ["oracle db"],
+    "Snowflake": [],
+    "BigQuery": [],
+    # Cloud and DevOps
+    "Amazon Web Services": ["aws"],
+    "Google Cloud Platform": ["gcp", "google cloud"],
+    "Microsoft Azure": ["azure"],
+    "Docker": [],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "Ansible": [],
+    "Jenkins": [],
+    "GitHub Actions": [],
+    "CI/CD": ["continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": ["github", "gitlab"],
+    "Linux": ["unix"],
+    "Nginx": [],
+    "Prometheus": [],
+    "Grafana": [],
+    # Practices and tools
+    "Agile": ["scrum"],
+    "Object-Oriented Programming": ["oop", "object oriented programming"],
+    "Data Structures": [],
+    "Algorithms": [],
+    "System Design": [],
+    "Unit Testing": ["pytest", "junit"],
+    "Jira": [],
+    "Figma": [],
+}
+
+# Aliases that are also ordinary English words or single letters; they only
+# match when written exactly like this (so "Go" matches, "go" does not)
+CASE_SENSITIVE_ALIASES = {
+    "C",
+    "R",
+    "Go",
+    "Rust",
+    "Ruby",
+    "Swift",
+    "Dart",
+    "Scala",
+    "React",
+    "Angular",
+    "Flask",
+    "Express",
+    "Spring",
+    "Rails",
+    "Node",
+    "Spark",
+    "Excel",
+    "AI",
+    "ML",
+    "DL",
+    "TF",
+    "TS",
+    "JS",
+    "RAG",
+    "REST",
+    "ETL",
+    "Unix",
+}
+
+# Single letters that are also initials or grades ("John C. Smith", "Grade
+# C"); besides matching case-sensitively, they only count next to another
+# skill or a word like "programming" (see `SkillMatcher`)
+CONTEXT_REQUIRED_ALIASES = {"C", "R"}
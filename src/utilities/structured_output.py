@@ -0,0 +1,192 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(Exception):
+    """Raised when a response cannot be parsed into its model, even repaired."""
+
+    # Usage of the calls that produced the unusable output, set by the
+    # generator when it gives up
+    input_tokens = 0
+    output_tokens = 0
+
+
+@lru_cache(maxsize=None)
+def json_schema_for(model: Type[BaseModel]) -> dict:
+    """The model's JSON schema; generated once per model class."""
+    return model.model_json_schema()
+
+
+@lru_cache(maxsize=None)
+def response_format_for(model: Type[BaseModel]) -> dict:
+    """
+    The `response_format` asking the API for JSON following the model's
+    schema. Not strict: strict mode rejects free-form fields such as
+    `CVParsedData.contact_info`.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__,
+            "schema": json_schema_for(model),
+            "strict": False,
+        },
+    }
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    Repairs the usual ways a model's JSON goes wrong, without another call:
+    markdown code fences and text around the value, trailing commas, and
+    output cut off mid-way (an unterminated string or unclosed arrays and
+    objects, whose last incomplete entry is dropped). Returns None when
+    there is no JSON object or array to repair.
+    """
+    return next(repair_candidates(text), None)
+
+
+def repair_candidates(text: str) -> Iterator[str]:
+    """
+    Yields repairs of `text`, most complete first. A complete value yields
+    one repair; truncated output yields one per nesting level, cutting back
+    to the last complete entry of each, because the innermost cut may leave
+    an entry (e.g. an object in a list) that is missing required fields.
+    """
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return
+
+    out = []
+    stack = []
+    in_string = escaped = False
+    # A string right after ":" (or inside an array) is a value, not a key
+    value_string = False
+    # (length of `out`, open containers) where the text could be cut and
+    # closed, i.e. right after a complete value or an opening bracket
+    safe_points = []
+
+    for char in text[min(starts):]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                if value_string or stack[-1] == "[":
+                    safe_points.append((len(out), "".join(stack)))
+                value_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            value_string = False
+            stack.append(char)
+            out.append(char)
+            safe_points.append((len(out), "".join(stack)))
+            continue
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if not stack or _CLOSERS[stack[-1]] != char:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                yield "".join(out)
+                return
+            safe_points.append((len(out), "".join(stack)))
+            continue
+        elif char == ",":
+            value_string = False
+            safe_points.append((len(out), "".join(stack)))
+        elif char == ":":
+            value_string = True
+        out.append(char)
+
+    # Truncated: cut after the last complete value and close what is open,
+    # then retry one nesting level further out each time
+    depth = None
+    for length, open_containers in reversed(safe_points):
+        if depth is not None and len(open_containers) >= depth:
+            continue
+        depth = len(open_containers)
+        cut = out[:length]
+        _drop_trailing_comma(cut)
+        yield "".join(cut) + "".join(_CLOSERS[c] for c in reversed(open_containers))
+
+
+def _drop_trailing_comma(out: list) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+
+
+def parse_structured(content: str, model: Type[Model]) -> Tuple[Model, bool]:
+    """
+    Parses a response into `model`, repairing it locally if needed.
+
+    Returns:
+        Tuple[Model, bool]: The parsed model and whether it was repaired.
+
+    Raises:
+        StructuredOutputError: If the content does not fit the model even
+            after repair (missing fields, wrong types, no JSON at all).
+    """
+    try:
+        return model.model_validate_json(content or ""), False
+    except ValidationError as e:
+        error = e
+
+    for repaired in repair_candidates(content or ""):
+        if repaired == content:
+            continue
+        try:
+            return model.model_validate_json(repaired), True
+        except ValidationError as e:
+            error = e
+    raise StructuredOutputError(
+        f"Response does not match {model.__name__}: {error.errors()[0]['msg']}"
+    )
+
+
+class StructuredOutputStats:
+    """Thread-safe counters of how structured responses were obtained."""
+
+    def __init__(self) -> None:
+        self.responses = 0
+        self.valid = 0
+        self.repaired = 0
+        self.recalls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record(self, **increments: int) -> None:
+        with self._lock:
+            for name, increment in increments.items():
+                setattr(self, name, getattr(self, name) + increment)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "valid": self.valid,
+                "repaired": self.repaired,
+                "recalls": self.recalls,
+                "failures": self.failures,
+            }
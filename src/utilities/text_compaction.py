@@ -0,0 +1,323 @@
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, TypedDict
+
+from constants import (
+    DEFAULT_MIN_DUPLICATE_LINE_CHARS,
+    DEFAULT_TEXT_TOKEN_BUDGET,
+    GPT_Model,
+)
+from logger import loggerUtils as logger
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+TRUNCATION_MARKER = "[...]"
+
+# Relative share of the token budget a section gets when the text has to be
+# truncated. Sections not listed here get a weight of 1.
+SECTION_WEIGHTS = {
+    "experience": 3.0,
+    "work experience": 3.0,
+    "professional experience": 3.0,
+    "employment": 3.0,
+    "employment history": 3.0,
+    "skills": 3.0,
+    "technical skills": 3.0,
+    "requirements": 3.0,
+    "qualifications": 3.0,
+    "education": 2.0,
+    "projects": 2.0,
+    "responsibilities": 2.0,
+    "summary": 1.0,
+    "profile": 1.0,
+    "certifications": 1.0,
+    "achievements": 1.0,
+    "awards": 1.0,
+    "publications": 1.0,
+    "languages": 1.0,
+    "about us": 0.5,
+    "company": 0.5,
+    "benefits": 0.25,
+    "interests": 0.25,
+    "hobbies": 0.25,
+    "references": 0.25,
+}
+# Text before the first heading usually holds the name and contact details
+PREAMBLE_WEIGHT = 3.0
+
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.I)
+_SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+# Lines at the top and bottom of a page checked for running headers/footers
+_PAGE_EDGE_LINES = 3
+
+
+class CompactionResult(TypedDict):
+    text: str
+    tokens_before: int
+    tokens_after: int
+    dropped_lines: int
+    truncated: bool
+
+
+def combine_compactions(*results: CompactionResult) -> CompactionResult:
+    """
+    One result for a prompt that holds several compacted documents: their
+    texts joined and their counts added up.
+    """
+    return {
+        "text": "\n\n".join(result["text"] for result in results),
+        "tokens_before": sum(result["tokens_before"] for result in results),
+        "tokens_after": sum(result["tokens_after"] for result in results),
+        "dropped_lines": sum(result["dropped_lines"] for result in results),
+        "truncated": any(result["truncated"] for result in results),
+    }
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # The BPE files are downloaded on first use; offline we estimate
+        logger.warning(f"No tokenizer for {model}, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = GPT_Model.GPT_40_MINI.value) -> int:
+    """
+    Counts the tokens of `text` with the model's tokenizer, falling back to
+    about 4 characters per token when tiktoken is not available.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, model: str = GPT_Model.GPT_40_MINI.value
+) -> str:
+    """
+    The longest prefix of `text` that fits in `max_tokens`, cut at a token
+    boundary (at a word boundary when tiktoken is not available).
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        prefix = text[:max_tokens * 4]
+        if len(prefix) < len(text) and " " in prefix:
+            prefix = prefix.rsplit(" ", 1)[0]
+        return prefix
+    tokens = encoding.encode(text, disallowed_special=())
+    # A cut inside a multi-byte character decodes to a replacement character
+    return encoding.decode(tokens[:max_tokens]).rstrip("\ufffd")
+
+
+class TextCompactor:
+    """
+    Shrinks OCR output before it is put into a prompt.
+
+    The text is cleaned up in three passes:
+
+    1. Whitespace is normalised, form feeds, blank-line runs, page numbers
+       and lines without any letters or digits (rules, stray bullets) are
+       removed.
+    2. Running headers and footers (lines repeated at the top or bottom of
+       most pages, when page breaks are known) and repeated long lines are
+       dropped after their first occurrence. Short lines such as
+       "Responsibilities:" legitimately repeat and are kept.
+    3. If the text still exceeds `max_tokens`, every section gets a share of
+       the budget according to `SECTION_WEIGHTS`, so a long list of
+       references cannot crowd out the work experience, and each section is
+       cut at a line boundary. A single line longer than its section's whole
+       share (OCR output without line breaks) is cut at a token boundary
+       instead.
+
+    Args:
+        max_tokens (Optional[int]): Token budget of the compacted text; None
+            disables truncation.
+        model (str): Model whose tokenizer counts the tokens.
+        min_duplicate_line_chars (int): Minimum length of a line for its
+            repetitions to be dropped.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = DEFAULT_TEXT_TOKEN_BUDGET,
+        model: str = GPT_Model.GPT_40_MINI.value,
+        min_duplicate_line_chars: int = DEFAULT_MIN_DUPLICATE_LINE_CHARS,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.model = model
+        self.min_duplicate_line_chars = min_duplicate_line_chars
+
+    def count_tokens(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def compact(self, text: str) -> CompactionResult:
+        text = text or ""
+        tokens_before = self.count_tokens(text)
+
+        pages = [self._normalize(page) for page in text.split("\f")]
+        lines = self._drop_repeated_lines(pages)
+        dropped_lines = sum(1 for line in text.splitlines() if line.strip()) - sum(
+            1 for line in lines if line
+        )
+
+        truncated = False
+        compacted = "\n".join(lines).strip()
+        if self.max_tokens is not None and self.count_tokens(compacted) > self.max_tokens:
+            compacted = self._truncate(lines)
+            truncated = True
+
+        tokens_after = self.count_tokens(compacted)
+        logger.debug(
+            f"Compacted text from {tokens_before} to {tokens_after} tokens "
+            f"({dropped_lines} lines dropped, truncated={truncated})"
+        )
+        return {
+            "text": compacted,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "dropped_lines": dropped_lines,
+            "truncated": truncated,
+        }
+
+    @staticmethod
+    def _normalize(page: str) -> List[str]:
+        """Returns the cleaned non-noise lines of a page; '' marks a paragraph break."""
+        lines = []
+        for line in unicodedata.normalize("NFKC", page).splitlines():
+            line = _SPACES_RE.sub(" ", line).strip()
+            if not any(char.isalnum() for char in line) or _PAGE_NUMBER_RE.match(line):
+                line = ""
+            if line or (lines and lines[-1]):
+                lines.append(line)
+        while lines and not lines[-1]:
+            lines.pop()
+        return lines
+
+    def _drop_repeated_lines(self, pages: List[List[str]]) -> List[str]:
+        running = self._running_headers_and_footers(pages)
+
+        seen = set()
+        lines = []
+        for page in pages:
+            for line in page:
+                key = line.casefold()
+                if line and lines and key == lines[-1].casefold():
+                    continue
+                if line and key in seen and (
+                    key in running or len(line) >= self.min_duplicate_line_chars
+                ):
+                    continue
+                if not line and (not lines or not lines[-1]):
+                    continue
+                seen.add(key)
+                lines.append(line)
+        return lines
+
+    @staticmethod
+    def _running_headers_and_footers(pages: List[List[str]]) -> set:
+        pages = [page for page in pages if page]
+        if len(pages) < 2:
+            return set()
+
+        counts = Counter()
+        for page in pages:
+            content = [line for line in page if line]
+            edges = content[:_PAGE_EDGE_LINES] + content[-_PAGE_EDGE_LINES:]
+            counts.update({line.casefold() for line in edges})
+        threshold = max(2, (len(pages) + 1) // 2)
+        return {line for line, count in counts.items() if count >= threshold}
+
+    def _truncate(self, lines: List[str]) -> str:
+        sections = self._split_sections(lines)
+        costs = [
+            [self.count_tokens(line + "\n") for line in section["lines"]]
+            for section in sections
+        ]
+        marker_tokens = self.count_tokens(TRUNCATION_MARKER + "\n")
+        budget = max(0, self.max_tokens - marker_tokens * len(sections))
+        allowances = _allocate(
+            [sum(cost) for cost in costs],
+            [section["weight"] for section in sections],
+            budget,
+        )
+
+        output = []
+        for section, cost, allowance in zip(sections, costs, allowances):
+            used = 0
+            for line, line_tokens in zip(section["lines"], cost):
+                if used + line_tokens > allowance:
+                    if line_tokens > allowance:
+                        # One newline token stays reserved for the marker
+                        prefix = truncate_to_tokens(
+                            line, allowance - used - 1, self.model
+                        ).rstrip()
+                        if prefix:
+                            output.append(prefix)
+                    output.append(TRUNCATION_MARKER)
+                    break
+                output.append(line)
+                used += line_tokens
+        return "\n".join(output).strip()
+
+    @staticmethod
+    def _split_sections(lines: List[str]) -> List[Dict]:
+        sections = [{"weight": PREAMBLE_WEIGHT, "lines": []}]
+        for line in lines:
+            heading = _section_heading(line)
+            if heading is not None:
+                sections.append(
+                    {"weight": SECTION_WEIGHTS.get(heading, 1.0), "lines": []}
+                )
+            sections[-1]["lines"].append(line)
+        return [section for section in sections if section["lines"]]
+
+
+def _section_heading(line: str) -> Optional[str]:
+    """Returns the normalised heading if `line` looks like a section title."""
+    candidate = line.strip(" :-|#*").casefold()
+    if not candidate or len(candidate) > 40:
+        return None
+    if candidate in SECTION_WEIGHTS:
+        return candidate
+    letters = [char for char in line if char.isalpha()]
+    if len(letters) >= 4 and len(candidate.split()) <= 4 and line.isupper():
+        return candidate
+    return None
+
+
+def _allocate(needs: List[int], weights: List[float], budget: int) -> List[int]:
+    """
+    Weighted water-filling: sections needing less than their weighted share
+    keep everything, and what they leave over is shared among the rest.
+    """
+    allowances = [0] * len(needs)
+    pending = set(range(len(needs)))
+    while pending:
+        total_weight = sum(weights[i] for i in pending)
+        shares = {i: budget * weights[i] / total_weight for i in pending}
+        satisfied = {i for i in pending if needs[i] <= shares[i]}
+        if not satisfied:
+            for i in pending:
+                allowances[i] = int(shares[i])
+            break
+        for i in satisfied:
+            allowances[i] = needs[i]
+            budget -= needs[i]
+        pending -= satisfied
+    return allowances
@@ -1,42 +1,479 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple, TypedDict, Union
+
 import pytesseract
 from PIL import Image
 
+from constants import (
+    DEFAULT_OCR_DPI,
+    DEFAULT_OCR_LANG,
+    DEFAULT_MIN_TEXT_LAYER_CHARS,
+    DEFAULT_OCR_PAGE_WINDOW,
+    DEFAULT_TESSERACT_OEM,
+    DEFAULT_TESSERACT_PSM,
+    OCR_PRESETS,
+)
+from logger import loggerUtils as logger
+from src.utilities.image_preprocessing import preprocess_image
+from src.utilities.ocr_cache import OCRCache
+from src.utilities.tracing import observe_stage, span
+
+
+class PageExtraction(TypedDict):
+    page_number: int
+    method: str  # "text_layer" or "ocr"
+    text: str
+
+
+class ExtractionResult(TypedDict):
+    text: str
+    pages: List[PageExtraction]
+
+
+class DocumentProfile(TypedDict):
+    is_pdf: bool
+    page_count: int
+    # Pages without a usable text layer; None when the document was longer
+    # than the page limit it was inspected with
+    scanned_pages: Optional[List[int]]
+
+
+# A document is either a path on disk or its raw bytes
+DocumentSource = Union[str, bytes, bytearray, memoryview]
+
+
+def available_cpu_count() -> int:
+    """Number of cores this process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class WindowTimings(TypedDict):
+    # Seconds to rasterize the whole window, and to OCR each of its pages
+    rasterize: float
+    ocr: List[float]
+
+
+def _ocr_pdf_window(
+    pdf_source, first_page, last_page, dpi, lang, config,
+    preprocessing=None, thread_count=1,
+) -> Tuple[List[str], WindowTimings]:
+    """
+    Rasterizes and OCRs the pages `first_page`..`last_page` (1-based,
+    inclusive) of a PDF given as a path or as bytes. Defined at module level
+    so it can be shipped to worker processes; only the extracted text and
+    the stage timings travel back to the caller, which records the timings
+    (metrics recorded inside a worker process would be lost).
+    """
+    from pdf2image import convert_from_bytes, convert_from_path
+
+    preprocessing = preprocessing or {}
+    convert = convert_from_path if isinstance(pdf_source, str) else convert_from_bytes
+    start = time.perf_counter()
+    images = convert(
+        pdf_source, dpi=dpi, first_page=first_page, last_page=last_page,
+        # Let poppler render gray pages instead of converting them afterwards
+        grayscale=_wants_grayscale(preprocessing),
+        thread_count=thread_count,
+    )
+    timings: WindowTimings = {"rasterize": time.perf_counter() - start, "ocr": []}
+    texts = []
+    for image in images:
+        start = time.perf_counter()
+        processed = preprocess_image(image, **preprocessing)
+        texts.append(pytesseract.image_to_string(processed, lang=lang, config=config))
+        timings["ocr"].append(time.perf_counter() - start)
+        processed.close()
+        image.close()
+    return texts, timings
+
+
+def _record_window_timings(timings: WindowTimings) -> None:
+    pages = len(timings["ocr"])
+    if pages:
+        observe_stage("rasterize_page", timings["rasterize"] / pages, count=pages)
+    for seconds in timings["ocr"]:
+        observe_stage("ocr_page", seconds)
+
+
+def _wants_grayscale(preprocessing: dict) -> bool:
+    return any(preprocessing.get(key) for key in ("grayscale", "binarize", "deskew"))
+
+
 class TextExtractor:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        dpi: int = DEFAULT_OCR_DPI,
+        lang: str = DEFAULT_OCR_LANG,
+        psm: int = DEFAULT_TESSERACT_PSM,
+        oem: int = DEFAULT_TESSERACT_OEM,
+        cache: Optional[OCRCache] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        page_window: int = DEFAULT_OCR_PAGE_WINDOW,
+        use_text_layer: bool = True,
+        min_text_layer_chars: int = DEFAULT_MIN_TEXT_LAYER_CHARS,
+        grayscale: bool = False,
+        binarize: bool = False,
+        deskew: bool = False,
+        max_pixels: Optional[int] = None,
+        thread_count: int = 1,
+        tesseract_flags: str = "",
+    ):
+        self.dpi = dpi
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.grayscale = grayscale
+        self.binarize = binarize
+        self.deskew = deskew
+        self.max_pixels = max_pixels
+        # pdf2image splits each page window across this many pdftoppm runs
+        # (never more than the window's pages). Only used when OCRing
+        # serially: the worker pool already keeps every core busy
+        self.thread_count = max(1, thread_count)
+        self.tesseract_flags = tesseract_flags
+        self.cache = cache
+        self.parallel = parallel
+        self.max_workers = max_workers or available_cpu_count()
+        self.page_window = max(1, page_window)
+        self.use_text_layer = use_text_layer
+        self.min_text_layer_chars = min_text_layer_chars
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_preset(cls, preset: str, **kwargs) -> "TextExtractor":
+        """
+        Builds an extractor from one of the OCR_PRESETS ("default", "fast",
+        "balanced", "accurate"); keyword arguments override the preset's
+        settings.
+        """
+        if preset not in OCR_PRESETS:
+            raise ValueError(
+                f"Unknown OCR preset {preset!r}, expected one of {sorted(OCR_PRESETS)}"
+            )
+        return cls(**{**OCR_PRESETS[preset], **kwargs})
+
+    @property
+    def ocr_settings(self) -> dict:
+        """Settings that change the OCR output and therefore the cache key."""
+        return {
+            "dpi": self.dpi,
+            "lang": self.lang,
+            "psm": self.psm,
+            "oem": self.oem,
+            "text_layer": self.use_text_layer,
+            "min_text_layer_chars": self.min_text_layer_chars,
+            "tesseract_flags": self.tesseract_flags,
+            # Bumped when the shape of the extracted text changes (2: pages
+            # joined with form feeds)
+            "text_format": 2,
+            **self.preprocessing,
+        }
+
+    @property
+    def preprocessing(self) -> dict:
+        """Keyword arguments of `preprocess_image` for every page."""
+        return {
+            "grayscale": self.grayscale,
+            "binarize": self.binarize,
+            "deskew": self.deskew,
+            "max_pixels": self.max_pixels,
+        }
+
+    @property
+    def tesseract_config(self) -> str:
+        return f"--oem {self.oem} --psm {self.psm} {self.tesseract_flags}".strip()
+
+    def close(self):
+        """Shuts down the OCR worker pool, if one was started."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def extract_text(self, file_path: DocumentSource):
+        result = self.extract_text_with_details(file_path)
+        return result["text"] if result else None
+
+    def extract_text_from_bytes(self, data: Union[bytes, bytearray, memoryview]):
+        """Extract text from an in-memory document (PDF or image)."""
+        return self.extract_text(data)
+
+    def extract_text_with_details(
+        self, file_path: DocumentSource
+    ) -> Optional[ExtractionResult]:
+        """
+        Extracts the text of a document along with the path each page took:
+        "text_layer" when the embedded PDF text was used directly, "ocr" when
+        the page had to be rasterized and run through tesseract.
+
+        `file_path` may also be the raw document bytes (or a memoryview over
+        them), in which case nothing is written to disk.
+        """
+        if not isinstance(file_path, str):
+            # Normalise to bytes once; memoryviews can't be sent to the OCR
+            # worker processes
+            file_path = bytes(file_path)
+
+        if self.cache is None:
+            return self._extract(file_path)
+
+        if isinstance(file_path, str):
+            with open(file_path, "rb") as f:
+                key = self.cache.make_key(f.read(), self.ocr_settings)
+        else:
+            key = self.cache.make_key(file_path, self.ocr_settings)
 
-    def extract_text(self, file_path):
-        if file_path.lower().endswith('.pdf'):
-            return self.extract_text_from_image_pdf(file_path)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._extract(file_path)
+        # Failed extractions are not cached so they get retried next time
+        if result is not None:
+            self.cache.put(key, result)
+        return result
+
+    def inspect(
+        self, source: DocumentSource, max_pages: Optional[int] = None
+    ) -> Optional[DocumentProfile]:
+        """
+        Counts the pages of a document and finds the scanned ones (pages
+        whose text layer is missing or unusable) without OCRing anything.
+        Text layers are only read when the document has at most `max_pages`
+        pages. Images count as one scanned page.
+        """
+        if not isinstance(source, str):
+            source = bytes(source)
+        if not self.is_pdf(source):
+            return {"is_pdf": False, "page_count": 1, "scanned_pages": [1]}
+
+        try:
+            from pypdf import PdfReader
+            reader = PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+            page_count = len(reader.pages)
+            if max_pages is not None and page_count > max_pages:
+                return {"is_pdf": True, "page_count": page_count, "scanned_pages": None}
+
+            scanned = []
+            for page_number, page in enumerate(reader.pages, start=1):
+                try:
+                    text = page.extract_text() or ""
+                except Exception:
+                    text = ""
+                if not self._has_text_layer(text):
+                    scanned.append(page_number)
+            return {"is_pdf": True, "page_count": page_count, "scanned_pages": scanned}
+        except Exception as e:
+            logger.warning(f"Error inspecting PDF: {e}")
+            return None
+
+    def _extract(self, source) -> Optional[ExtractionResult]:
+        if self.is_pdf(source):
+            if self.use_text_layer:
+                return self.extract_text_from_pdf(source)
+            text = self.extract_text_from_image_pdf(source)
+        else:
+            text = self.extract_text_from_image(source)
+
+        if text is None:
+            return None
+        return {
+            "text": text,
+            "pages": [{"page_number": 1, "method": "ocr", "text": text}],
+        }
+
+    @staticmethod
+    def is_pdf(source) -> bool:
+        """
+        Whether a document is a PDF, judged by its header: the PDF header
+        may be preceded by up to 1 KB of junk. Paths are sniffed the same
+        way (uploads spilled to disk keep whatever suffix the client sent),
+        falling back to the suffix when the file cannot be read.
+        """
+        if isinstance(source, str):
+            try:
+                with open(source, "rb") as f:
+                    head = f.read(1024)
+            except OSError:
+                return source.lower().endswith(".pdf")
         else:
-            return self.extract_text_from_image(file_path)
+            # `in` on a memoryview compares items, not subsequences
+            head = bytes(source[:1024])
+        return b"%PDF-" in head
 
-    def extract_text_from_image(image_path):
+    def extract_text_from_image(self, image_path):
         try:
             # Open the image file
-            image = Image.open(image_path)
-            # Use pytesseract to do OCR on the image
-            text = pytesseract.image_to_string(image)
+            if not isinstance(image_path, str):
+                image_path = io.BytesIO(image_path)
+            with span("ocr_page"):
+                image = preprocess_image(Image.open(image_path), **self.preprocessing)
+                # Use pytesseract to do OCR on the image
+                text = pytesseract.image_to_string(
+                    image, lang=self.lang, config=self.tesseract_config
+                )
             return text
         except Exception as e:
             print(f"Error processing image: {e}")
             return None
-    
+
+    def extract_text_from_pdf(self, pdf_path) -> Optional[ExtractionResult]:
+        """
+        Reads the embedded text layer of every page and only OCRs the pages
+        that have none (or too little to be trusted), i.e. scanned pages.
+        """
+        try:
+            from pypdf import PdfReader
+            reader = PdfReader(
+                pdf_path if isinstance(pdf_path, str) else io.BytesIO(pdf_path)
+            )
+
+            pages: List[PageExtraction] = []
+            for page_number, page in enumerate(reader.pages, start=1):
+                try:
+                    text = page.extract_text() or ""
+                except Exception:
+                    text = ""
+                method = "text_layer" if self._has_text_layer(text) else "ocr"
+                pages.append(
+                    {"page_number": page_number, "method": method, "text": text}
+                )
+
+            scanned = [p["page_number"] for p in pages if p["method"] == "ocr"]
+            if scanned:
+                ocr_texts = self._ocr_pdf_pages(pdf_path, scanned)
+                for page in pages:
+                    if page["method"] == "ocr":
+                        page["text"] = ocr_texts[page["page_number"]]
+
+            # Pages are separated by form feeds, like tesseract's output, so
+            # TextCompactor can tell them apart (OCRed pages already end in one)
+            return {
+                "text": "\f".join(page["text"].rstrip("\f") for page in pages),
+                "pages": pages,
+            }
+        except Exception as e:
+            print(f"Error processing PDF: {e}")
+            return None
+
     def extract_text_from_image_pdf(self, pdf_path):
         try:
-            # Convert PDF to images
-            from pdf2image import convert_from_path
-            images = convert_from_path(pdf_path)
-            text = ""
-            for image in images:
-                text += pytesseract.image_to_string(image)
-            return text
+            from pdf2image import pdfinfo_from_bytes, pdfinfo_from_path
+            if isinstance(pdf_path, str):
+                page_count = pdfinfo_from_path(pdf_path)["Pages"]
+            else:
+                page_count = pdfinfo_from_bytes(pdf_path)["Pages"]
+
+            page_texts = self._ocr_pdf_pages(pdf_path, range(1, page_count + 1))
+            return "".join(page_texts[number] for number in sorted(page_texts))
         except Exception as e:
             print(f"Error processing PDF: {e}")
             return None
-        
-        
+
+    def _has_text_layer(self, text: str) -> bool:
+        # Scanned pages come back empty or with a few stray glyphs; broken
+        # font encodings come back as mostly non-alphanumeric noise
+        visible = [char for char in text if not char.isspace()]
+        if len(visible) < self.min_text_layer_chars:
+            return False
+        alphanumeric = sum(char.isalnum() for char in visible)
+        return alphanumeric / len(visible) >= 0.5
+
+    def _ocr_pdf_pages(self, pdf_path, page_numbers) -> Dict[int, str]:
+        """
+        OCRs the given 1-based pages and returns their text keyed by page
+        number. Consecutive pages are grouped into windows of at most
+        `page_window` pages, so only a handful of page images are ever alive
+        regardless of the document length.
+        """
+        windows = []
+        for number in page_numbers:
+            if (
+                windows
+                and number == windows[-1][1] + 1
+                and number - windows[-1][0] < self.page_window
+            ):
+                windows[-1] = (windows[-1][0], number)
+            else:
+                windows.append((number, number))
+
+        if self.parallel and len(windows) > 1:
+            window_texts = self._ocr_windows_in_parallel(pdf_path, windows)
+        else:
+            window_texts = {}
+            for first, last in windows:
+                window_texts[first], timings = _ocr_pdf_window(
+                    pdf_path, first, last,
+                    self.dpi, self.lang, self.tesseract_config,
+                    self.preprocessing, self.thread_count,
+                )
+                _record_window_timings(timings)
+
+        page_texts = {}
+        for first, _ in windows:
+            for offset, text in enumerate(window_texts[first]):
+                page_texts[first + offset] = text
+        return page_texts
+
+    def _ocr_windows_in_parallel(self, pdf_path, windows) -> Dict[int, List[str]]:
+        """
+        OCRs the page windows on the worker pool and returns their text keyed
+        by the first page of each window. At most two windows per worker are
+        in flight at any time, which keeps memory flat for long documents.
+        """
+        # Documents may be extracted from several threads at once (e.g. the
+        # CV and JD of one request); make sure they share a single pool
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        max_in_flight = 2 * self.max_workers
+        pending_windows = iter(windows)
+        in_flight = {}
+        page_texts = {}
+
+        def submit_next():
+            window = next(pending_windows, None)
+            if window is None:
+                return False
+            first, last = window
+            future = self._executor.submit(
+                _ocr_pdf_window, pdf_path, first, last,
+                self.dpi, self.lang, self.tesseract_config,
+                self.preprocessing,
+            )
+            in_flight[future] = first
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                texts, timings = future.result()
+                page_texts[in_flight.pop(future)] = texts
+                _record_window_timings(timings)
+                submit_next()
+
+        return page_texts
+
+
 if __name__ == "__main__":
     text_extractor = TextExtractor()
     text = text_extractor.extract_text('C:/Users/ASUS/Downloads/Mt.pdf')
-    print(text)
\ No newline at end of file
+    print(text)
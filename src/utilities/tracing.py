@@ -0,0 +1,275 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from constants import DEFAULT_METRICS_LATENCY_BUCKETS
+
+
+class Counter:
+    """A monotonically increasing count per label combination."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_values(self.labelnames, labels), 0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            (self.name, dict(zip(self.labelnames, key)), value)
+            for key, value in sorted(values)
+        ]
+
+
+class Histogram:
+    """
+    Observations per label combination, counted into cumulative `le`
+    buckets (as Prometheus expects) along with their sum and count.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_METRICS_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: [count per bucket (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_values(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(_label_values(self.labelnames, labels))
+            return series[2] if series else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            series = [
+                (key, list(buckets), total, count)
+                for key, (buckets, total, count) in self._series.items()
+            ]
+        samples = []
+        for key, buckets, total, count in sorted(series):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), buckets):
+                cumulative += bucket_count
+                samples.append(
+                    (f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative)
+                )
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text
+    format. Recording only updates counters in memory under a lock; nothing
+    is formatted or written until `render` is called by a scrape.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_METRICS_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _label_values(labelnames: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    if len(labels) != len(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Process-wide registry served at /metrics
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "resume_stage_duration_seconds",
+    "Wall-clock seconds spent in each processing stage.",
+    ("stage",),
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "resume_stage_errors_total",
+    "Stages that raised an exception.",
+    ("stage",),
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds",
+    "Seconds per LLM API call, including rate limiting and retries.",
+    ("model", "outcome"),
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "llm_requests_total",
+    "LLM calls by outcome (ok, error, cancelled, or cached when answered from the response cache).",
+    ("model", "outcome"),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "Tokens used by LLM calls, by kind (input, output, cached_input).",
+    ("model", "kind"),
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Times the enclosed block as one `stage`, counting it as an error if it
+    raises. Cancellation (a client going away, a losing hedge) is timed but
+    not an error.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def observe_stage(stage: str, seconds: float, count: int = 1) -> None:
+    """
+    Records `count` occurrences of a stage measured elsewhere (e.g. in an
+    OCR worker process), `seconds` each.
+    """
+    for _ in range(count):
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+class LLMCallSpan:
+    """
+    Times one LLM API call and records its outcome and token usage:
+
+        with LLMCallSpan(model) as call:
+            response = client.chat.completions.create(...)
+            call.record(response)
+
+    For a stream, record the final chunk that carries the usage.
+    """
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.response = None
+
+    def record(self, response) -> None:
+        self.response = response
+
+    def __enter__(self) -> "LLMCallSpan":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, Exception):
+            outcome = "error"
+        else:
+            outcome = "cancelled"
+        LLM_REQUEST_SECONDS.observe(
+            time.perf_counter() - self._start, model=self.model, outcome=outcome
+        )
+        LLM_REQUESTS.inc(model=self.model, outcome=outcome)
+        usage = getattr(self.response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(usage.prompt_tokens or 0, model=self.model, kind="input")
+            LLM_TOKENS.inc(usage.completion_tokens or 0, model=self.model, kind="output")
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) if details else None
+            if cached:
+                LLM_TOKENS.inc(cached, model=self.model, kind="cached_input")
+
+
+def record_llm_cache_hit(model: str) -> None:
+    LLM_REQUESTS.inc(model=model, outcome="cached")
+
+
+def render_metrics(registry: Optional[MetricsRegistry] = None) -> str:
+    """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+    return (registry or REGISTRY).render()
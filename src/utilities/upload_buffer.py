@@ -0,0 +1,135 @@
+import asyncio
+import io
+import os
+import tempfile
+from typing import Optional, Union
+
+from constants import (
+    DEFAULT_MAX_UPLOAD_BYTES,
+    DEFAULT_UPLOAD_CHUNK_BYTES,
+    DEFAULT_UPLOAD_SPOOL_BYTES,
+)
+from logger import loggerUtils as logger
+from src.utilities.tracing import span
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class SpooledUpload:
+    """
+    A bounded buffer for streaming an upload in chunks.
+
+    Chunks are kept in memory until the upload grows past
+    `max_memory_bytes`; only then is the buffer spilled to a uniquely named
+    temporary file. All file I/O runs in a worker thread so the event loop is
+    never blocked, and the temporary file is removed when the buffer is
+    closed (or the `async with` block exits).
+
+    Args:
+        max_memory_bytes (int): Size at which the buffer spills to disk.
+        max_bytes (int): Hard limit on the upload size.
+        suffix (str): Suffix for the temporary file, e.g. ".pdf".
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = DEFAULT_UPLOAD_SPOOL_BYTES,
+        max_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+        suffix: str = "",
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.size = 0
+        self.path: Optional[str] = None
+        self._memory = io.BytesIO()
+        self._file = None
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    @property
+    def source(self) -> Union[memoryview, str]:
+        """
+        The buffered upload, ready to hand to `TextExtractor`: a memoryview
+        over the bytes when it fits in memory, otherwise the temp file path.
+        """
+        if self.in_memory:
+            return self._memory.getbuffer()
+        return self.path
+
+    async def read_all(self) -> bytes:
+        """Returns a copy of the buffered upload as bytes."""
+        if self.in_memory:
+            return self._memory.getvalue()
+
+        def read_file():
+            with open(self.path, "rb") as f:
+                return f.read()
+
+        return await asyncio.to_thread(read_file)
+
+    async def read_from(self, upload, chunk_size: int = DEFAULT_UPLOAD_CHUNK_BYTES):
+        """Streams an `UploadFile` (or anything with `async read(n)`) in."""
+        with span("upload_receive"):
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                await self.write(chunk)
+
+            if self._file is not None:
+                await asyncio.to_thread(self._file.flush)
+        return self
+
+    async def write(self, chunk: bytes) -> None:
+        if self.size + len(chunk) > self.max_bytes:
+            raise UploadTooLargeError(
+                f"Upload exceeds the {self.max_bytes} byte limit"
+            )
+        self.size += len(chunk)
+
+        if self.in_memory and self.size <= self.max_memory_bytes:
+            self._memory.write(chunk)
+            return
+
+        if self.in_memory:
+            await asyncio.to_thread(self._spill)
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def close(self) -> None:
+        self._memory = io.BytesIO()
+        if self._file is not None:
+            # Cancelling a pending to_thread call would drop the removal and
+            # leak the file; let it finish even if the caller is cancelled
+            removal = asyncio.get_running_loop().run_in_executor(
+                None, self._remove_file
+            )
+            await asyncio.shield(removal)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _spill(self) -> None:
+        self._file = tempfile.NamedTemporaryFile(
+            prefix="upload-", suffix=self.suffix, delete=False
+        )
+        self.path = self._file.name
+        self._file.write(self._memory.getbuffer())
+        self._memory = io.BytesIO()
+        logger.debug(f"Upload spilled to {self.path} after {self.size} bytes")
+
+    def _remove_file(self) -> None:
+        try:
+            self._file.close()
+            os.remove(self.path)
+        except OSError as e:
+            logger.exception(f"Failed to remove spooled upload {self.path}: {e}")
+        finally:
+            self._file = None
@@ -0,0 +1,406 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants import (
+    DEFAULT_IVF_NPROBE,
+    DEFAULT_IVF_RETRAIN_GROWTH,
+    DEFAULT_IVF_TRAIN_MIN_VECTORS,
+)
+from logger import loggerUtils as logger
+
+_VECTORS_FILE = "vectors.f16"
+_IDS_FILE = "ids.jsonl"
+_META_FILE = "meta.json"
+_CENTROIDS_FILE = "centroids.npy"
+_ASSIGNMENTS_FILE = "assignments.npy"
+
+# Rows scanned per block in exact search, bounding the float32 copy
+_EXACT_BLOCK_ROWS = 65536
+
+
+class _RowList:
+    """Growable int32 array of row numbers (one IVF inverted list)."""
+
+    def __init__(self, rows: Optional[np.ndarray] = None) -> None:
+        rows = np.asarray(rows if rows is not None else [], dtype=np.int32)
+        self._rows = np.concatenate([rows, np.empty(max(8, len(rows)), dtype=np.int32)])
+        self.size = len(rows)
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._rows[:self.size]
+
+    def append(self, row: int) -> None:
+        if self.size == len(self._rows):
+            self._rows = np.concatenate([self._rows, np.empty_like(self._rows)])
+        self._rows[self.size] = row
+        self.size += 1
+
+
+class VectorStore:
+    """
+    An append-only, memory-mapped store of float16 vectors with an IVF
+    (inverted file) index for approximate nearest-neighbour search.
+
+    Layout of `directory`:
+        vectors.f16      rows of `dim` float16 values, memory-mapped
+        ids.jsonl        one id per row, in row order
+        meta.json        dimension and allocated capacity
+        centroids.npy    IVF centroids, once trained
+        assignments.npy  IVF list of every row
+
+    Vectors are L2-normalised on insert, so scores are cosine
+    similarities. Adding an existing id appends a new row and retires the
+    old one; `remove` only retires rows. Rows are written before their id,
+    so a crash can at worst lose the last insert.
+
+    Until `DEFAULT_IVF_TRAIN_MIN_VECTORS` vectors are stored, every search
+    is exact. The index is then trained with k-means (about sqrt(n)
+    lists) and new vectors join the list of their nearest centroid; it is
+    retrained when the store has grown `DEFAULT_IVF_RETRAIN_GROWTH`-fold.
+    `search(..., exact=True)` always scans every row, for verification.
+
+    Args:
+        directory (str): Where the store lives; created if missing.
+        dim (int): Vector dimension. Required for a new store.
+        nprobe (int): IVF lists scanned per approximate query.
+        train_min_vectors (int): Vectors needed before the IVF index is
+            trained.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dim: Optional[int] = None,
+        nprobe: int = DEFAULT_IVF_NPROBE,
+        train_min_vectors: int = DEFAULT_IVF_TRAIN_MIN_VECTORS,
+    ) -> None:
+        self.directory = os.path.join(os.getcwd(), directory)
+        self.nprobe = nprobe
+        self.train_min_vectors = train_min_vectors
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+        meta_path = self._path(_META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(
+                    f"Store {directory} holds {meta['dim']}-d vectors, not {dim}-d"
+                )
+            self.dim = meta["dim"]
+            self._capacity = meta["capacity"]
+            self._trained_at = meta.get("trained_at", 0)
+        else:
+            if dim is None:
+                raise ValueError("dim is required to create a vector store")
+            self.dim = dim
+            self._capacity = 1024
+            self._trained_at = 0
+            open(self._path(_VECTORS_FILE), "wb").close()
+            self._write_meta()
+
+        self._ensure_file_size()
+        self._vectors = self._map()
+        self._load_ids()
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._row_of
+
+    def add(self, item_id: str, vector: np.ndarray) -> None:
+        self.add_many([item_id], np.asarray(vector)[None, :])
+
+    def add_many(self, item_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Appends vectors; ids already stored are replaced."""
+        vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape != (len(item_ids), self.dim):
+            raise ValueError(
+                f"Expected {len(item_ids)} vectors of dimension {self.dim}, "
+                f"got {vectors.shape}"
+            )
+
+        with self._lock:
+            start = len(self._ids)
+            stop = start + len(item_ids)
+            if stop > self._capacity:
+                self._grow(stop)
+
+            self._vectors[start:stop] = vectors.astype(np.float16)
+            self._vectors.flush()
+            with open(self._path(_IDS_FILE), "a", encoding="utf-8") as f:
+                for item_id in item_ids:
+                    f.write(json.dumps(item_id) + "\n")
+
+            self._alive = _resize(self._alive, stop, False)
+            self._assignments = _resize(self._assignments, stop, -1)
+            for row, item_id in enumerate(item_ids, start):
+                previous = self._row_of.get(item_id)
+                if previous is not None:
+                    self._alive[previous] = False
+                self._row_of[item_id] = row
+                self._ids.append(item_id)
+                self._alive[row] = True
+
+            if self._centroids is not None:
+                self._assign(np.arange(start, stop), vectors)
+
+            if self._needs_training():
+                self.train()
+
+    def remove(self, item_id: str) -> bool:
+        """Retires the id's vector; returns whether it was stored."""
+        with self._lock:
+            row = self._row_of.pop(item_id, None)
+            if row is None:
+                return False
+            self._alive[row] = False
+            # The id log is append-only, so removals are recorded as entries
+            with open(self._path(_IDS_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"removed": item_id}) + "\n")
+            return True
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        row = self._row_of.get(item_id)
+        return None if row is None else self._vectors[row].astype(np.float32)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns the ids and cosine similarities of the k nearest vectors,
+        best first. Approximate (IVF) unless `exact` or the index is not
+        trained yet.
+        """
+        query = _normalize_rows(np.asarray(query, dtype=np.float32)[None, :])[0]
+        with self._lock:
+            if exact or self._centroids is None:
+                rows, scores = self._exact_search(query, k)
+            else:
+                rows, scores = self._ivf_search(query, k, nprobe or self.nprobe)
+            return [(self._ids[row], float(score)) for row, score in zip(rows, scores)]
+
+    def train(self, nlist: Optional[int] = None, iterations: int = 10) -> None:
+        """(Re)trains the IVF centroids on the live vectors with k-means."""
+        with self._lock:
+            rows = np.flatnonzero(self._alive)
+            if len(rows) == 0:
+                return
+            nlist = nlist or max(1, int(np.sqrt(len(rows))))
+            nlist = min(nlist, len(rows))
+
+            rng = np.random.default_rng(0)
+            sample = rows
+            if len(rows) > nlist * 64:
+                sample = np.sort(rng.choice(rows, nlist * 64, replace=False))
+            data = self._vectors[sample].astype(np.float32)
+
+            centroids = data[rng.choice(len(data), nlist, replace=False)]
+            for _ in range(iterations):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, data)
+                counts = np.bincount(labels, minlength=nlist)
+                # Empty clusters keep their previous centroid
+                filled = counts > 0
+                centroids[filled] = sums[filled] / counts[filled, None]
+                centroids = _normalize_rows(centroids)
+
+            self._centroids = centroids
+            self._assignments[:] = -1
+            self._lists = [_RowList() for _ in range(nlist)]
+            for start in range(0, len(rows), _EXACT_BLOCK_ROWS):
+                block = rows[start:start + _EXACT_BLOCK_ROWS]
+                self._assign(block, self._vectors[block].astype(np.float32))
+            self._trained_at = len(rows)
+            logger.info(f"Trained IVF index with {nlist} lists on {len(rows)} vectors")
+            self.flush()
+
+    def flush(self) -> None:
+        """Persists the index; vectors and ids are written on insert."""
+        with self._lock:
+            self._vectors.flush()
+            self._write_meta()
+            if self._centroids is not None:
+                _save_npy(self._path(_CENTROIDS_FILE), self._centroids)
+                _save_npy(self._path(_ASSIGNMENTS_FILE), self._assignments)
+
+    def close(self) -> None:
+        self.flush()
+
+    def _exact_search(self, query: np.ndarray, k: int):
+        count = len(self._ids)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, count, _EXACT_BLOCK_ROWS):
+            stop = min(count, start + _EXACT_BLOCK_ROWS)
+            scores = self._vectors[start:stop].astype(np.float32) @ query
+            scores[~self._alive[start:stop]] = -np.inf
+            rows, scores = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, rows + start])
+            best_scores = np.concatenate([best_scores, scores])
+        rows, scores = _top_k(best_scores, k)
+        return best_rows[rows], scores
+
+    def _ivf_search(self, query: np.ndarray, k: int, nprobe: int):
+        probes, _ = _top_k(self._centroids @ query, nprobe)
+        rows = np.concatenate([self._lists[probe].rows for probe in probes])
+        rows = rows[self._alive[rows]]
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32)
+        # Sorted row order turns the gather into mostly sequential reads
+        rows.sort()
+        scores = self._vectors[rows].astype(np.float32) @ query
+        top, scores = _top_k(scores, k)
+        return rows[top], scores
+
+    def _assign(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        labels = np.argmax(vectors @ self._centroids.T, axis=1)
+        self._assignments[rows] = labels
+        for row, label in zip(rows, labels):
+            self._lists[label].append(row)
+
+    def _needs_training(self) -> bool:
+        live = len(self._row_of)
+        if live < self.train_min_vectors:
+            return False
+        return self._centroids is None or live >= self._trained_at * DEFAULT_IVF_RETRAIN_GROWTH
+
+    def _load_ids(self) -> None:
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        removed = []
+        ids_path = self._path(_IDS_FILE)
+        if os.path.exists(ids_path):
+            with open(ids_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if isinstance(entry, dict):
+                        removed.append((len(self._ids), entry["removed"]))
+                        continue
+                    self._row_of[entry] = len(self._ids)
+                    self._ids.append(entry)
+        # Removals only apply to rows written before them
+        for rows_before, item_id in removed:
+            row = self._row_of.get(item_id)
+            if row is not None and row < rows_before:
+                del self._row_of[item_id]
+
+        self._alive = np.zeros(len(self._ids), dtype=bool)
+        self._alive[list(self._row_of.values())] = True
+
+    def _load_index(self) -> None:
+        count = len(self._ids)
+        self._centroids = None
+        self._lists: List[_RowList] = []
+        self._assignments = np.full(count, -1, dtype=np.int32)
+
+        centroids_path = self._path(_CENTROIDS_FILE)
+        if not os.path.exists(centroids_path):
+            if self._needs_training():
+                self.train()
+            return
+
+        self._centroids = np.load(centroids_path)
+        saved = np.load(self._path(_ASSIGNMENTS_FILE))[:count]
+        self._assignments[:len(saved)] = saved
+        order = np.argsort(self._assignments, kind="stable")
+        bounds = np.searchsorted(
+            self._assignments[order], np.arange(len(self._centroids) + 1)
+        )
+        self._lists = [
+            _RowList(order[bounds[i]:bounds[i + 1]]) for i in range(len(self._centroids))
+        ]
+        # Rows inserted after the last flush: beyond the saved array, or in
+        # its spare capacity (still -1)
+        missing = np.flatnonzero((self._assignments == -1) & self._alive)
+        if len(missing):
+            self._assign(missing, self._vectors[missing].astype(np.float32))
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._vectors.flush()
+        del self._vectors
+        self._capacity = capacity
+        self._ensure_file_size()
+        self._vectors = self._map()
+        self._write_meta()
+
+    def _map(self) -> np.memmap:
+        return np.memmap(
+            self._path(_VECTORS_FILE),
+            dtype=np.float16,
+            mode="r+",
+            shape=(self._capacity, self.dim),
+        )
+
+    def _ensure_file_size(self) -> None:
+        size = self._capacity * self.dim * np.dtype(np.float16).itemsize
+        path = self._path(_VECTORS_FILE)
+        if os.path.getsize(path) < size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+
+    def _write_meta(self) -> None:
+        _atomic_write(
+            self._path(_META_FILE),
+            json.dumps(
+                {"dim": self.dim, "capacity": self._capacity, "trained_at": self._trained_at}
+            ),
+        )
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """Indices and values of the k largest scores, best first."""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    top = top[np.isfinite(scores[top])]
+    return top, scores[top]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _resize(array: np.ndarray, size: int, fill) -> np.ndarray:
+    if len(array) >= size:
+        return array
+    resized = np.full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+    resized[:len(array)] = array
+    return resized
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def _atomic_write(path: str, content: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
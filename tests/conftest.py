@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The OpenAI clients are created on import and refuse to start without a key
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from openai import AsyncOpenAI, OpenAI  # noqa: E402
+
+from src.utilities import openai_llm_utils  # noqa: E402
+from src.utilities.fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """
+    Starts a `FakeOpenAIServer` with the given settings and points the LLM
+    utilities' clients at it; servers are stopped after the test.
+    """
+    servers = []
+
+    def start(**kwargs) -> FakeOpenAIServer:
+        server = FakeOpenAIServer(**kwargs).start()
+        servers.append(server)
+        monkeypatch.setattr(
+            openai_llm_utils,
+            "OPENAI_CLIENT",
+            OpenAI(api_key="test", base_url=server.base_url, max_retries=0),
+        )
+        monkeypatch.setattr(
+            openai_llm_utils,
+            "ASYNC_OPENAI_CLIENT",
+            AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0),
+        )
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,12 @@
+from src.app import Pipeline
+from src.services.vision_extraction_service import VisionExtractionService
+
+
+def test_vision_service_is_only_built_when_used():
+    pipeline = Pipeline(cv_extraction_mode="ocr")
+    assert pipeline._vision_service is None
+
+    pipeline = Pipeline(cv_extraction_mode="auto")
+    vision_service = pipeline.vision_service
+    assert isinstance(vision_service, VisionExtractionService)
+    assert pipeline.vision_service is vision_service
@@ -0,0 +1,60 @@
+import numpy as np
+
+from src.utilities.ats_scorer import LocalATSScorer
+
+CV = {
+    "Skills": ["Python", "SQL", "ML"],
+    "Experience": ["Backend engineer building Python APIs for 4 years"],
+    "Education": ["B.Tech in Computer Science"],
+}
+JD = {
+    "Skills": ["Python", "Machine Learning", "Kubernetes"],
+    "Experience": ["Python APIs"],
+    "Education": ["Bachelor of Technology in Computer Science"],
+}
+OTHER_JD = {"Skills": ["Accounting"], "Experience": [], "Education": []}
+
+RESULT_KEYS = {
+    "ats_score",
+    "skills_match_percentage",
+    "experience_match_percentage",
+    "education_match_percentage",
+    "matched_skills",
+    "mismatched_requirements",
+    "analysis",
+}
+
+
+def test_score_has_the_llm_result_shape():
+    result = LocalATSScorer().score(CV, JD)
+    assert set(result) == RESULT_KEYS
+    assert result["matched_skills"] == ["Python", "Machine Learning"]
+    assert result["mismatched_requirements"] == ["Kubernetes"]
+    assert result["skills_match_percentage"] == 67
+    assert result["experience_match_percentage"] == 100
+    assert result["education_match_percentage"] == 100
+    assert 0 <= result["ats_score"] <= 100
+
+
+def test_batch_and_matrix_agree_with_single_scores():
+    scorer = LocalATSScorer(block_size=1)
+    cvs, jds = [CV, {"Skills": ["Accounting"]}, {}], [JD, OTHER_JD]
+
+    batch = scorer.score_batch(cvs, jds)
+    matrix = scorer.score_matrix(cvs, jds)
+
+    assert [len(row) for row in batch] == [2, 2, 2]
+    assert matrix["ats_score"].shape == (3, 2)
+    assert set(matrix) == {
+        "ats_score",
+        "skills_match_percentage",
+        "experience_match_percentage",
+        "education_match_percentage",
+    }
+    for i, cv in enumerate(cvs):
+        for j, jd in enumerate(jds):
+            assert batch[i][j] == scorer.score(cv, jd)
+            assert batch[i][j]["ats_score"] == int(round(float(matrix["ats_score"][i, j])))
+    # Categories the JD does not mention count as fully matched
+    assert np.all(matrix["experience_match_percentage"][:, 1] == 100)
+    assert batch[1][1]["ats_score"] == 100
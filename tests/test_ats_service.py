@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+
+from src.services.ats_service import ATSservice
+from src.utilities.openai_batch import LocalBatchBackend
+
+CV_TEXT = "Jane Doe\nEXPERIENCE\nSoftware Engineer, Acme, 2019 - present\nSKILLS\nPython, SQL"
+JD_TEXT = "Backend Engineer\nRequirements: Python, SQL, 3+ years of experience"
+
+FUSED_REPLY = json.dumps({
+    "cv": {
+        "contact_info": {"name": "Jane Doe"},
+        "skills_technical": ["Python", "SQL"],
+        "skills_soft": [],
+        "experience": [],
+        "education": [],
+    },
+    "jd": {"Education": [], "Experience": ["3+ years"], "Skills": ["Python", "SQL"]},
+    "ats": {
+        "match_score": 80,
+        "strengths": ["Python"],
+        "gaps": [],
+        "youtube_recommendations": [],
+    },
+})
+
+
+def test_fused_requires_structured_output():
+    ats_service = ATSservice(structured_output=False, model_routing=False)
+    with pytest.raises(ValueError, match="structured output"):
+        asyncio.run(ats_service.fused_extract_and_score(CV_TEXT, JD_TEXT))
+
+
+def test_fused_passes_both_compactions(fake_openai):
+    fake_openai(responder=lambda request: FUSED_REPLY)
+    ats_service = ATSservice(structured_output=True, model_routing=False)
+    calls = []
+    generate_structured = ats_service.ai_generator.async_generate_structured
+
+    async def recorded(**kwargs):
+        response = await generate_structured(**kwargs)
+        calls.append(response)
+        return response
+
+    ats_service.ai_generator.async_generate_structured = recorded
+    result = asyncio.run(ats_service.fused_extract_and_score(CV_TEXT, JD_TEXT))
+
+    assert result["ats_score"].match_score == 80
+    assert result["jd_items"]["Skills"] == ["Python", "SQL"]
+    (response,) = calls
+    cv_tokens = ats_service.cv_compactor.compact(CV_TEXT)["tokens_after"]
+    jd_tokens = ats_service.jd_compactor.compact(JD_TEXT)["tokens_after"]
+    assert response["text_tokens_after_compaction"] == cv_tokens + jd_tokens
+    assert response["text_tokens_before_compaction"] >= cv_tokens + jd_tokens
+
+
+def test_batches_request_json_mode_and_parse_the_replies(tmp_path):
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        return "not json" if "broken" in body["messages"][-1]["content"] else FUSED_REPLY
+
+    ats_service = ATSservice(
+        batch_backend=LocalBatchBackend(str(tmp_path), responder),
+        structured_output=False,
+        model_routing=False,
+    )
+    result = asyncio.run(ats_service.batch_extract_cv_items(
+        {"jane": CV_TEXT, "bad": "broken"}, poll_interval_seconds=0.01
+    ))
+
+    assert all(body["response_format"] == {"type": "json_object"} for body in bodies)
+    assert result["responses"]["jane"]["ats"]["match_score"] == 80
+    assert result["errors"]["bad"].startswith("Unparseable response")
+
+    bodies.clear()
+    result = asyncio.run(ats_service.batch_generate_ats_score(
+        {"jane": (result["responses"]["jane"]["cv"], JD_TEXT)}, poll_interval_seconds=0.01
+    ))
+    assert [body["response_format"] for body in bodies] == [{"type": "json_object"}]
+    assert result["responses"]["jane"]["ats"]["match_score"] == 80
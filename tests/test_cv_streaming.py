@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from src.services.ats_service import ATSservice
+from src.services.document_service import DocumentService
+from src.utilities.text_extractor import TextExtractor
+
+CV_REPLY = {
+    "Name": "Jane Doe",
+    "Skills": ["Python", "SQL"],
+    "Experience": [{"role": "Engineer, Acme", "years": "2019 - present"}],
+    "Education": ["B.Sc. Mathematics"],
+}
+CV_TEXT = "Jane Doe\nEXPERIENCE\nEngineer, Acme, 2019 - present\nSKILLS\nPython, SQL"
+
+
+def make_ats_service() -> ATSservice:
+    return ATSservice(structured_output=False, model_routing=False)
+
+
+def test_fields_are_yielded_in_order_while_the_reply_streams(fake_openai):
+    server = fake_openai(
+        responder=lambda request: json.dumps(CV_REPLY), stream_chunk_chars=5
+    )
+    ats_service = make_ats_service()
+    deltas = []
+    stream_response = ats_service.ai_generator.async_stream_response
+
+    async def recorded(**kwargs):
+        async for delta in stream_response(**kwargs):
+            deltas.append(delta)
+            yield delta
+
+    ats_service.ai_generator.async_stream_response = recorded
+
+    async def consume():
+        return [
+            (field, value, len(deltas))
+            async for field, value in ats_service.stream_cv_items(CV_TEXT)
+        ]
+
+    fields = asyncio.run(consume())
+    assert [(field, value) for field, value, _ in fields] == list(CV_REPLY.items())
+    # Each field is out before the reply is complete, not all at the end
+    received = [count for _, _, count in fields]
+    assert received == sorted(received)
+    assert received[0] < len(deltas) / 2
+    assert server.requests[0]["stream"] is True
+
+
+def test_stream_endpoint_sends_one_event_per_field(fake_openai, monkeypatch):
+    from benchmarks.corpus import text_layer_pdf
+    from fastapi.testclient import TestClient
+
+    import main
+
+    fake_openai(responder=lambda request: json.dumps(CV_REPLY), stream_chunk_chars=5)
+    monkeypatch.setattr(main, "document_service", DocumentService(TextExtractor()))
+    monkeypatch.setattr(main.pipeline, "ats_service", make_ats_service())
+    pdf = text_layer_pdf([CV_TEXT.split("\n")])
+
+    with TestClient(main.app).stream(
+        "POST", "/extract-cv/stream/", files={"file": ("cv.pdf", pdf, "application/pdf")}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    assert body.endswith("\n\n")
+    events = body[:-2].split("\n\n")
+    assert all(event.startswith("data: ") and "\n" not in event for event in events)
+    payloads = [json.loads(event[len("data: "):]) for event in events]
+    assert payloads == [
+        {"field": field, "value": value} for field, value in CV_REPLY.items()
+    ] + [{"done": True}]
+
+
+def test_stream_endpoint_rejects_documents_without_text(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(main, "document_service", DocumentService(TextExtractor()))
+    response = TestClient(main.app).post(
+        "/extract-cv/stream/", files={"file": ("cv.txt", b"", "text/plain")}
+    )
+    assert response.status_code == 422
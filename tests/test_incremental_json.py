@@ -0,0 +1,36 @@
+import json
+
+from src.utilities.incremental_json import IncrementalJSONParser
+
+DOCUMENT = {
+    "Name": "Jane \"JD\" Doe",
+    "Skills": ["Go", "C++", "a, b}"],
+    "Experience": [{"role": "Engineer", "years": 3}],
+    "Remote": True,
+}
+
+
+def test_fields_are_emitted_as_soon_as_they_are_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('```json\n{"Name": "Jane", "Sk') == [("Name", "Jane")]
+    assert parser.feed('ills": ["Go"') == []
+    assert parser.feed(']}\n```') == [("Skills", ["Go"])]
+    assert parser.finished
+
+
+def test_any_chunking_gives_the_whole_object():
+    text = json.dumps(DOCUMENT, indent=2)
+    for size in (1, 2, 7, len(text)):
+        parser = IncrementalJSONParser()
+        fields = []
+        for start in range(0, len(text), size):
+            fields += parser.feed(text[start:start + size])
+        assert dict(fields) == DOCUMENT
+        assert parser.finished
+
+
+def test_text_after_the_object_is_ignored():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{} {"late": 1}') == []
+    assert parser.finished
+    assert parser.feed('{"later": 2}') == []
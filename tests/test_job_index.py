@@ -0,0 +1,71 @@
+import random
+
+from src.models.job_models import JobPosting, UserSettings
+from src.services.job_index import JobPostingIndex
+
+SKILLS = ["Python", "Java", "SQL", "Docker", "Kubernetes", "Spark", "AWS", "Go"]
+LOCATIONS = ["Berlin, Germany", "Munich, Germany", "London, UK", "Remote"]
+
+
+def posting(job_id: str, rng: random.Random) -> JobPosting:
+    return JobPosting(
+        job_id=job_id,
+        job_title=rng.choice(["Data Engineer", "Backend Engineer", "ML Engineer"]),
+        company="Acme",
+        apply_link=f"https://example.com/{job_id}",
+        location=rng.choice(LOCATIONS),
+        salary=rng.choice([None, 50000, 80000]),
+        skills=rng.sample(SKILLS, 3),
+    )
+
+
+def settings(**overrides) -> UserSettings:
+    values = {"target_role": "Engineer", "location_preference": "any", "min_salary": None}
+    return UserSettings(**{**values, **overrides})
+
+
+def test_removed_postings_are_not_returned():
+    rng = random.Random(0)
+    index = JobPostingIndex()
+    index.add_many(posting(f"job-{i}", rng) for i in range(20))
+    for i in range(0, 20, 2):
+        assert index.remove(f"job-{i}")
+    assert not index.remove("job-0")
+
+    results = index.search({"skills": SKILLS}, settings(), k=50)
+    links = {result.apply_link for result in results}
+    assert len(index) == len(results) == 10
+    assert all(int(link.rsplit("-", 1)[1]) % 2 == 1 for link in links)
+
+
+def test_slots_are_reused_after_remove_and_re_add():
+    rng = random.Random(1)
+    index = JobPostingIndex(capacity=8)
+    index.add_many(posting(f"job-{i}", rng) for i in range(8))
+
+    for round_ in range(50):
+        job_id = f"job-{round_ % 8}"
+        index.add(posting(job_id, rng))  # Replaces the posting
+        index.remove(f"job-{(round_ + 3) % 8}")
+        index.add(posting(f"job-{(round_ + 3) % 8}", rng))
+
+    assert len(index) == 8
+    assert index._size == 8 and index._capacity == 8
+    # Every posting list holds each live slot at most once
+    for posting_list in index._terms.values():
+        assert len(set(posting_list.ids.tolist())) == posting_list.size
+    assert len(index.search({"skills": SKILLS}, settings(), k=50)) == 8
+
+
+def test_empty_location_bitmaps_are_freed():
+    rng = random.Random(2)
+    index = JobPostingIndex()
+    berlin = posting("berlin", rng).model_copy(update={"location": "Berlin, Germany"})
+    index.add(berlin)
+    index.add(posting("remote", rng).model_copy(update={"location": "Remote"}))
+    assert "berlin" in index._location_bitmaps
+
+    index.remove("berlin")
+    assert "berlin" not in index._location_bitmaps
+    assert "germany" not in index._location_bitmaps
+    assert index.search({"skills": SKILLS}, settings(location_preference="Germany")) == []
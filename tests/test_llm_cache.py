@@ -0,0 +1,97 @@
+import pytest
+from openai.types.chat.chat_completion import ChatCompletion
+
+from src.utilities import llm_cache
+from src.utilities.fake_openai_server import build_chat_completion
+from src.utilities.llm_cache import LLMResponseCache
+from src.utilities.openai_llm_utils import OpenAI_Text_Config, OpenAITextGenerator
+
+
+def payload(prompt: str, temperature: float = 0.0) -> dict:
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": temperature,
+    }
+
+
+def completion(request: dict, content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        build_chat_completion(request, content, "chatcmpl-test")
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_hits_misses_and_saved_tokens(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    request = payload("hello")
+    response = completion(request, "hi there")
+
+    assert cache.get(request) is None
+    cache.put(request, response)
+    cached = cache.get(request)
+    assert cached.cache_hit
+    assert cached.choices[0].message.content == "hi there"
+    assert cache.get(payload("hello again")) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 1 / 3)
+    assert stats["saved_input_tokens"] == response.usage.prompt_tokens
+    assert stats["saved_output_tokens"] == response.usage.completion_tokens
+    assert stats["entries"] == 1
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    request = payload("hello")
+    cache.put(request, completion(request, "hi"))
+
+    clock[0] += 59
+    assert cache.get(request) is not None
+    clock[0] += 2
+    assert cache.get(request) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    requests = [payload(f"prompt {i}") for i in range(3)]
+    responses = [completion(request, "x" * 50) for request in requests]
+    entry_size = len(
+        responses[0].model_dump_json(exclude={"cache_hit", "call_retries", "call_hedges"})
+    )
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"), max_bytes=2 * entry_size)
+
+    for request, response in zip(requests[:2], responses[:2]):
+        cache.put(request, response)
+        clock[0] += 1
+    assert cache.get(requests[0]) is not None  # Now the most recently used
+    clock[0] += 1
+    cache.put(requests[2], responses[2])
+
+    assert cache.get(requests[1]) is None
+    assert cache.get(requests[0]) is not None and cache.get(requests[2]) is not None
+    assert cache.stats()["size_bytes"] <= cache.max_bytes
+
+
+def test_only_low_temperature_requests_are_cached(fake_openai, tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"), max_temperature=0.5)
+    assert cache.is_cacheable(payload("q", 0.5))
+    assert not cache.is_cacheable(payload("q", 0.9))
+    assert cache.is_cacheable({"model": "gpt-4o-mini", "messages": []})
+
+    server = fake_openai()
+    for temperature, expected_requests in ((0.9, 2), (0.2, 1)):
+        server.requests.clear()
+        generator = OpenAITextGenerator(
+            config=OpenAI_Text_Config(temperature=temperature), cache=cache
+        )
+        first = generator.generate_response(user_prompt="same prompt")
+        second = generator.generate_response(user_prompt="same prompt")
+        assert len(server.requests) == expected_requests
+        assert second["cached"] == (expected_requests == 1) and not first["cached"]
@@ -0,0 +1,220 @@
+import asyncio
+import time
+
+import openai
+import pytest
+
+from src.utilities.fake_openai_server import FakeOpenAIServer
+from src.utilities.llm_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResiliencePolicy,
+)
+from src.utilities.openai_llm_utils import OpenAI_Text_Config, OpenAITextGenerator
+
+FAST_BACKOFF = {"backoff_base_seconds": 0.01, "backoff_max_seconds": 0.02}
+
+
+def make_generator(breaker=None, **policy) -> OpenAITextGenerator:
+    generator = OpenAITextGenerator(
+        config=OpenAI_Text_Config(), resilience=ResiliencePolicy(**policy)
+    )
+    # Breakers are shared per model; give each test its own
+    generator.resilience.circuit_breaker = breaker or CircuitBreaker(5, 30.0)
+    return generator
+
+
+class SlowFirstRequestServer(FakeOpenAIServer):
+    """Answers the first request after `first_delay` seconds, the rest at once."""
+
+    def __init__(self, first_delay: float, **kwargs):
+        super().__init__(**kwargs)
+        self.first_delay = first_delay
+
+    def _plan(self, request):
+        delay, fail, cached_tokens = super()._plan(request)
+        if len(self.requests) == 1:
+            delay += self.first_delay
+        return delay, fail, cached_tokens
+
+
+def test_backoff_is_full_jitter_within_cap():
+    policy = ResiliencePolicy(backoff_base_seconds=0.5, backoff_max_seconds=2.0)
+    for retry in range(6):
+        ceiling = min(2.0, 0.5 * 2 ** retry)
+        assert all(0 <= policy.backoff(retry) <= ceiling for _ in range(50))
+
+
+def test_async_call_retries_server_errors_and_reports_retries(fake_openai):
+    server = fake_openai(fail_first=2)
+    generator = make_generator(max_retries=3, **FAST_BACKOFF)
+
+    response = asyncio.run(generator.async_generate_response(user_prompt="hi"))
+
+    assert response["retries"] == 2
+    assert response["hedges"] == 0
+    assert len(server.requests) == 3
+
+
+def test_sync_call_retries_server_errors_and_reports_retries(fake_openai):
+    server = fake_openai(fail_first=1, failure_status=429)
+    generator = make_generator(max_retries=3, **FAST_BACKOFF)
+
+    response = generator.generate_response(user_prompt="hi")
+
+    assert response["retries"] == 1
+    assert len(server.requests) == 2
+
+
+def test_gives_up_after_max_retries(fake_openai):
+    server = fake_openai(fail_first=10)
+    generator = make_generator(max_retries=2, **FAST_BACKOFF)
+
+    with pytest.raises(openai.InternalServerError):
+        asyncio.run(generator.async_generate_response(user_prompt="hi"))
+    assert len(server.requests) == 3
+
+
+def test_bad_request_is_not_retried(fake_openai):
+    server = fake_openai(fail_first=1, failure_status=400)
+    generator = make_generator(max_retries=3, **FAST_BACKOFF)
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(generator.async_generate_response(user_prompt="hi"))
+    assert len(server.requests) == 1
+
+
+def test_slow_attempt_is_hedged_and_hedge_reported(fake_openai, monkeypatch):
+    server = fake_openai()
+    server.stop()
+    server = SlowFirstRequestServer(first_delay=2.0).start()
+    try:
+        from openai import AsyncOpenAI
+        from src.utilities import openai_llm_utils
+
+        monkeypatch.setattr(
+            openai_llm_utils,
+            "ASYNC_OPENAI_CLIENT",
+            AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0),
+        )
+        generator = make_generator(hedge_percentile=0.5, hedge_min_samples=3)
+        for _ in range(3):
+            generator.resilience.latencies.record(0.05)
+
+        started = time.monotonic()
+        response = asyncio.run(generator.async_generate_response(user_prompt="hi"))
+
+        assert time.monotonic() - started < 1.5
+        assert response["hedges"] == 1
+        assert response["retries"] == 0
+        assert len(server.requests) == 2
+    finally:
+        server.stop()
+
+
+def test_breaker_opens_then_half_opens_and_closes(fake_openai):
+    server = fake_openai(fail_first=2)
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.2)
+    generator = make_generator(breaker, max_retries=0)
+
+    # One event loop for all calls: the async client's pooled connections
+    # belong to the loop they were opened on
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(openai.InternalServerError):
+                await generator.async_generate_response(user_prompt="hi")
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # Open: fails fast without reaching the server
+        with pytest.raises(CircuitOpenError):
+            await generator.async_generate_response(user_prompt="hi")
+        assert len(server.requests) == 2
+
+        await asyncio.sleep(0.25)
+        # Half-open: one probe gets through, and its success closes the breaker
+        await generator.async_generate_response(user_prompt="hi")
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_breaker_counts_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow() and not breaker.allow()
+    assert breaker.rejected == 2
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.allow()  # The probe
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_bad_request_does_not_close_half_open_breaker(fake_openai):
+    server = fake_openai(fail_first=1, failure_status=400)
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.1)
+    generator = make_generator(breaker, max_retries=0)
+
+    async def scenario():
+        with pytest.raises(openai.BadRequestError):
+            await generator.async_generate_response(user_prompt="hi")
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.consecutive_failures == 2
+        # The probe slot was released, so the next call may probe again
+        await generator.async_generate_response(user_prompt="hi")
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert len(server.requests) == 2
+
+
+def test_cancelled_probe_releases_the_half_open_slot(fake_openai):
+    server = fake_openai(latency_seconds=0.5)
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.1)
+    generator = make_generator(breaker, max_retries=0)
+
+    async def scenario():
+        probe = asyncio.ensure_future(
+            generator.async_generate_response(user_prompt="hi")
+        )
+        await asyncio.sleep(0.1)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+
+        # The next call may probe again, and its success closes the breaker
+        server.latency_seconds = 0
+        await generator.async_generate_response(user_prompt="hi")
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_bad_requests_do_not_reset_failure_count(fake_openai):
+    fake_openai(fail_first=1, failure_status=400)
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30.0)
+    generator = make_generator(breaker, max_retries=0)
+
+    breaker.record_failure()
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(generator.async_generate_response(user_prompt="hi"))
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
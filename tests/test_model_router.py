@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from constants import GPT_Model
+from src.utilities.model_router import ModelRouter
+from src.utilities.openai_llm_utils import OpenAI_Text_Config, OpenAITextGenerator
+from src.utilities.structured_output import StructuredOutputError
+
+
+SMALL, LARGE = GPT_Model.GPT_4_1_NANO.value, GPT_Model.GPT_4_1.value
+RULES = {"task": [(SMALL, None), (LARGE, None)]}
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def make_router(rules) -> ModelRouter:
+    return ModelRouter(
+        lambda model: OpenAITextGenerator(config=OpenAI_Text_Config(model=model)),
+        rules=rules,
+        confidence_checks={},
+    )
+
+
+def test_tokens_of_invalid_tiers_are_counted(fake_openai):
+    fake_openai(
+        responder=lambda request: (
+            "no json here" if request["model"] == SMALL else json.dumps({"value": 1})
+        )
+    )
+    router = make_router(RULES)
+
+    response = asyncio.run(router.generate_structured("task", "question", Answer))
+
+    assert response["response"].value == 1
+    (decision,) = router.stats.as_dict(decisions=True)["decisions"]
+    assert decision["final_model"] == LARGE
+    assert [escalation["model"] for escalation in decision["escalations"]] == [SMALL]
+    assert decision["tokens"][SMALL] > 0
+    assert decision["tokens"][LARGE] == response["input_tokens"] + response["output_tokens"]
+
+
+def test_tokens_are_counted_when_every_tier_fails(fake_openai):
+    fake_openai(responder=lambda request: "no json here")
+    router = make_router(RULES)
+
+    with pytest.raises(StructuredOutputError) as error:
+        asyncio.run(router.generate_structured("task", "question", Answer))
+
+    (decision,) = router.stats.as_dict(decisions=True)["decisions"]
+    assert decision["final_model"] is None
+    # The last tier spends its re-requests too, and they are all counted
+    assert decision["tokens"][LARGE] == error.value.input_tokens + error.value.output_tokens
+    assert decision["tokens"][LARGE] > decision["tokens"][SMALL] > 0
@@ -0,0 +1,56 @@
+import os
+
+from src.utilities.ocr_cache import OCRCache
+
+SETTINGS = {"dpi": 200, "lang": "eng"}
+
+
+def test_key_depends_on_document_and_settings():
+    key = OCRCache.make_key(b"%PDF-1.7 a", SETTINGS)
+    assert key == OCRCache.make_key(b"%PDF-1.7 a", dict(reversed(SETTINGS.items())))
+    assert key != OCRCache.make_key(b"%PDF-1.7 b", SETTINGS)
+    # New OCR settings invalidate the entries made with the old ones
+    assert key != OCRCache.make_key(b"%PDF-1.7 a", {**SETTINGS, "dpi": 300})
+
+
+def test_round_trip_and_hit_rate(tmp_path):
+    cache = OCRCache(str(tmp_path))
+    key = OCRCache.make_key(b"doc", SETTINGS)
+    assert cache.get(key) is None
+    cache.put(key, {"text": "Jane Doe"})
+    assert cache.get(key) == {"text": "Jane Doe"}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    # A new instance picks up the entries already on disk
+    assert OCRCache(str(tmp_path)).stats()["size_bytes"] == stats["size_bytes"] > 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    value = {"text": "x" * 100}
+    cache = OCRCache(str(tmp_path), max_bytes=10_000)
+    cache.put("a", value)
+    cache.put("b", value)
+    entry_size = os.path.getsize(cache._path("a"))
+    cache.max_bytes = 2 * entry_size
+    # Order the entries explicitly: mtime resolution may be coarse
+    os.utime(cache._path("a"), (1, 1))
+    os.utime(cache._path("b"), (2, 2))
+    assert cache.get("a") == value  # Now the most recently used
+
+    cache.put("c", value)
+    assert cache.get("b") is None
+    assert cache.get("a") == value and cache.get("c") == value
+    assert cache.stats()["size_bytes"] == 2 * entry_size
+
+
+def test_clear_and_unreadable_entries(tmp_path):
+    cache = OCRCache(str(tmp_path))
+    cache.put("a", ["text"])
+    with open(cache._path("b"), "w") as f:
+        f.write("{not json")
+    assert cache.get("b") is None
+
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["size_bytes"] == 0
@@ -0,0 +1,55 @@
+import time
+
+from benchmarks.corpus import text_layer_pdf
+from src.utilities import text_extractor
+from src.utilities.text_extractor import TextExtractor
+
+SCANNED_PAGES = {2, 3, 4, 6, 7, 8}
+
+
+def fake_ocr_window(pdf_source, first_page, last_page, *settings):
+    """Stands in for tesseract; earlier windows take longer to finish."""
+    time.sleep(0.05 * (10 - first_page))
+    pages = range(first_page, last_page + 1)
+    return [f"ocr page {number}\f" for number in pages], {"rasterize": 0.0, "ocr": [0.0] * len(pages)}
+
+
+def mixed_pdf() -> bytes:
+    # Pages without a text layer are OCRed; the rest are read directly
+    return text_layer_pdf([
+        [""] if number in SCANNED_PAGES else [f"text page {number} " * 5]
+        for number in range(1, 10)
+    ])
+
+
+def test_parallel_windows_keep_page_order(monkeypatch):
+    monkeypatch.setattr(text_extractor, "_ocr_pdf_window", fake_ocr_window)
+    windows = []
+    submit = text_extractor.ProcessPoolExecutor.submit
+
+    def recorded_submit(executor, fn, pdf_source, first, last, *args):
+        windows.append((first, last))
+        return submit(executor, fn, pdf_source, first, last, *args)
+
+    monkeypatch.setattr(text_extractor.ProcessPoolExecutor, "submit", recorded_submit)
+
+    with TextExtractor(parallel=True, max_workers=3, page_window=2) as extractor:
+        result = extractor.extract_text_with_details(mixed_pdf())
+
+    assert windows == [(2, 3), (4, 4), (6, 7), (8, 8)]
+    assert [page["page_number"] for page in result["pages"]] == list(range(1, 10))
+    assert [page["method"] for page in result["pages"]] == [
+        "ocr" if number in SCANNED_PAGES else "text_layer" for number in range(1, 10)
+    ]
+    assert [page.split()[:3] for page in result["text"].split("\f")] == [
+        ["ocr" if number in SCANNED_PAGES else "text", "page", str(number)]
+        for number in range(1, 10)
+    ]
+
+
+def test_serial_and_parallel_ocr_agree(monkeypatch):
+    monkeypatch.setattr(text_extractor, "_ocr_pdf_window", fake_ocr_window)
+    pdf = mixed_pdf()
+    with TextExtractor(parallel=True, max_workers=2, page_window=3) as parallel:
+        parallel_text = parallel.extract_text(pdf)
+    assert TextExtractor(page_window=3).extract_text(pdf) == parallel_text
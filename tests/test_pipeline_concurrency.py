@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.app import Pipeline, PipelineError
+
+
+class FakeDocumentService:
+    """OCR stand-in: each document's text is the document itself."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.threads = set()
+
+    def extract_text(self, document):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return document
+
+
+class FakeATSService:
+    structured_output = False
+
+    def __init__(self, cv_error: Exception = None, cv_seconds: float = 0.05):
+        self.cv_error = cv_error
+        self.cv_seconds = cv_seconds
+        self.events = []
+        self.cv_cancelled = False
+
+    async def extract_cv_items(self, ocr_text):
+        self.events.append("cv_start")
+        try:
+            await asyncio.sleep(self.cv_seconds)
+        except asyncio.CancelledError:
+            self.cv_cancelled = True
+            raise
+        if self.cv_error is not None:
+            raise self.cv_error
+        self.events.append("cv_end")
+        return {"cv": ocr_text}
+
+    async def extract_jd_items(self, jd_text):
+        self.events.append("jd_start")
+        await asyncio.sleep(0.05)
+        self.events.append("jd_end")
+        return {"jd": jd_text}
+
+    async def generate_ats_score(self, cv_items, jd_items):
+        self.events.append("score")
+        return {"match_score": 50}
+
+
+def make_pipeline(ats_service, document_service=None) -> Pipeline:
+    return Pipeline(
+        document_service=document_service or FakeDocumentService(),
+        ats_service=ats_service,
+        cv_extraction_mode="ocr",
+    )
+
+
+def test_cv_and_jd_stages_overlap():
+    ats_service = FakeATSService()
+    document_service = FakeDocumentService()
+    pipeline = make_pipeline(ats_service, document_service)
+
+    result = asyncio.run(pipeline.process_resume("cv text", "jd text"))
+
+    assert result["cv_items"] == {"cv": "cv text"}
+    assert result["jd_items"] == {"jd": "jd text"}
+    assert len(document_service.threads) == 2  # Both OCRed at once
+    assert set(ats_service.events[:2]) == {"cv_start", "jd_start"}
+    assert ats_service.events[-1] == "score"
+    assert {"cv_ocr", "jd_ocr", "cv_extraction", "jd_extraction", "ats_scoring"} <= set(
+        result["timings"]
+    )
+
+
+def test_a_failing_stage_cancels_the_other_and_propagates():
+    # The JD has no text, so its stage fails while the CV is still extracted
+    ats_service = FakeATSService(cv_seconds=1.0)
+    pipeline = make_pipeline(ats_service)
+
+    async def scenario():
+        started = time.perf_counter()
+        with pytest.raises(PipelineError, match="job description"):
+            await pipeline.process_resume("cv text", "", raise_errors=True)
+        # Checked before asyncio.run cancels whatever is left over
+        assert ats_service.cv_cancelled
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 0.5
+    assert "score" not in ats_service.events
+
+
+def test_errors_of_the_concurrent_stages_are_reported():
+    pipeline = make_pipeline(FakeATSService(cv_error=RuntimeError("LLM down")))
+
+    async def scenario():
+        with pytest.raises(PipelineError, match="LLM down") as error:
+            await pipeline.process_resume("cv text", "jd text", raise_errors=True)
+        message = await pipeline.process_resume("cv text", "jd text")
+        return error.value, message
+
+    error, message = asyncio.run(scenario())
+    assert isinstance(error.__cause__, RuntimeError)
+    assert message == "Error processing resume: LLM down"
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.utilities.rate_limiter import ModelRateLimiter, TokenBucket
+
+
+class PeakTracker:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.current -= 1
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(10, period_seconds=1.0)
+    assert bucket.try_acquire(10) == 0
+    wait = bucket.try_acquire(5)
+    assert 0.4 < wait <= 0.5
+    time.sleep(0.55)
+    assert bucket.try_acquire(5) == 0
+
+
+def test_token_bucket_adjust_and_oversized_requests():
+    bucket = TokenBucket(10, period_seconds=60.0)
+    assert bucket.try_acquire(50) == 0  # Larger than the bucket: let through once full
+    assert bucket.level == pytest.approx(0, abs=0.01)
+    bucket.adjust(4)
+    assert bucket.level == pytest.approx(4, abs=0.01)
+    bucket.adjust(-10)  # Used more than reserved: the level goes into debt
+    assert bucket.level < 0
+    bucket.adjust(100)
+    assert bucket.level == pytest.approx(10)
+
+
+def test_requests_per_minute_throttle():
+    limiter = ModelRateLimiter(max_in_flight=5, requests_per_minute=2)
+    with limiter.limit_sync(1), limiter.limit_sync(1):
+        pass
+    assert limiter.throttled == 0
+    assert limiter._try_admit(1) > 0
+    assert limiter.throttled == 1
+
+
+def test_token_reservations_are_settled():
+    limiter = ModelRateLimiter(max_in_flight=1, tokens_per_minute=1000)
+    with limiter.limit_sync(300) as reservation:
+        assert limiter.tokens.level == pytest.approx(700, abs=1)
+        reservation.settle(100)
+    assert limiter.tokens.level == pytest.approx(900, abs=1)
+
+
+def test_sync_and_async_callers_share_one_cap():
+    limiter = ModelRateLimiter(max_in_flight=2)
+    peak = PeakTracker()
+
+    def sync_call():
+        with limiter.limit_sync(1), peak:
+            time.sleep(0.05)
+
+    async def async_call():
+        async with limiter.limit(1):
+            with peak:
+                await asyncio.sleep(0.05)
+
+    async def async_calls():
+        await asyncio.gather(*(async_call() for _ in range(4)))
+
+    # Two event loops in their own threads, plus plain threads
+    threads = [threading.Thread(target=sync_call) for _ in range(4)]
+    threads += [threading.Thread(target=asyncio.run, args=(async_calls(),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert peak.peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_cancelled_waiters_do_not_leak_slots():
+    limiter = ModelRateLimiter(max_in_flight=1)
+
+    async def scenario():
+        async def hold(seconds):
+            async with limiter.limit(1):
+                await asyncio.sleep(seconds)
+
+        holder = asyncio.create_task(hold(0.05))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(hold(0)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters[:2]:
+            waiter.cancel()
+        await asyncio.gather(holder, *waiters, return_exceptions=True)
+        # Every slot is back: the full cap can be taken again at once
+        async with limiter.limit(1):
+            pass
+
+    asyncio.run(asyncio.wait_for(scenario(), 2))
+    assert limiter._slots._value == 1
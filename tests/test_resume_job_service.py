@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import pytest
+
+from src.models.resume_job_models import ResumeJobStatus
+from src.services.resume_job_service import JobQueueFullError, ResumeJobManager
+from src.utilities.upload_buffer import SpooledUpload
+
+
+class RecordingPipeline:
+    """Stands in for `Pipeline`: records the documents it was given."""
+
+    def __init__(self, release: asyncio.Event = None):
+        self.documents = []
+        self.release = release
+
+    async def process_resume(self, cv, jd, progress_callback=None, raise_errors=False):
+        self.documents.append(tuple(
+            document if isinstance(document, str) else bytes(document)
+            for document in (cv, jd)
+        ))
+        if self.release is not None:
+            await self.release.wait()
+        return {"ok": True}
+
+
+async def make_upload(data: bytes, max_memory_bytes: int = 1024) -> SpooledUpload:
+    upload = SpooledUpload(max_memory_bytes=max_memory_bytes, suffix=".pdf")
+    await upload.write(data)
+    return upload
+
+
+def test_spooled_uploads_are_queued_and_removed_after_the_job():
+    async def scenario():
+        pipeline = RecordingPipeline()
+        manager = ResumeJobManager(workers=1, pipeline_factory=lambda: pipeline)
+        await manager.start()
+        cv_upload = await make_upload(b"x" * 4096)
+        jd_upload = await make_upload(b"jd")
+        spooled_path = cv_upload.path
+        assert os.path.exists(spooled_path)
+
+        job = manager.submit(cv_upload, jd_upload)
+        async for _ in manager.events(job.job_id):
+            pass
+        await manager.stop()
+        return pipeline, job, spooled_path
+
+    pipeline, job, spooled_path = asyncio.run(scenario())
+    assert job.status == ResumeJobStatus.COMPLETED
+    # The worker read the spooled file itself, then removed it
+    assert pipeline.documents == [(spooled_path, b"jd")]
+    assert not os.path.exists(spooled_path)
+
+
+def test_queue_is_bounded_by_bytes():
+    async def scenario():
+        release = asyncio.Event()
+        manager = ResumeJobManager(
+            workers=1,
+            max_queued_bytes=100,
+            pipeline_factory=lambda: RecordingPipeline(release),
+        )
+        await manager.start()
+        # The first job is picked up at once; the next ones wait in the queue
+        manager.submit(await make_upload(b"a" * 60), await make_upload(b""))
+        await asyncio.sleep(0)
+        manager.submit(await make_upload(b"b" * 60), await make_upload(b""))
+        rejected = [await make_upload(b"c" * 60), await make_upload(b"")]
+        with pytest.raises(JobQueueFullError):
+            manager.submit(*rejected)
+        queued_bytes = manager.stats()["queued_bytes"]
+        release.set()
+        await manager.stop()
+        return queued_bytes
+
+    assert asyncio.run(scenario()) == 60
+
+
+def test_event_stream_ends_when_the_job_is_forgotten():
+    async def scenario():
+        manager = ResumeJobManager(
+            workers=1, pipeline_factory=lambda: RecordingPipeline(asyncio.Event())
+        )
+        await manager.start()
+        job = manager.submit(await make_upload(b"cv"), await make_upload(b"jd"))
+
+        async def follow():
+            return [event async for event in manager.events(job.job_id)]
+
+        stream = asyncio.create_task(follow())
+        await asyncio.sleep(0.01)
+        # As `_forget_expired_jobs` does; wake the stream up afterwards
+        changed = manager._changed.pop(job.job_id)
+        del manager._jobs[job.job_id]
+        changed.set()
+        events = await asyncio.wait_for(stream, 1)
+        await manager.stop()
+        return events
+
+    assert [event.status for event in asyncio.run(scenario())][:1] == [
+        ResumeJobStatus.QUEUED
+    ]
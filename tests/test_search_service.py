@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from src.services.search_service import SearchService
+from src.utilities.fake_serper_server import FakeSerperServer
+
+
+@pytest.fixture
+def serper():
+    with FakeSerperServer(videos_per_query=3) as server:
+        yield server
+
+
+def make_service(server, **kwargs) -> SearchService:
+    return SearchService(api_key="test-key", base_url=server.base_url, **kwargs)
+
+
+def test_search_many_dedupes_and_caches(serper):
+    serper.latency_seconds = 0.05
+    queries = ["Docker tutorial", "docker  TUTORIAL", "SQL joins", "Docker tutorial"]
+
+    async def scenario():
+        async with make_service(serper, max_concurrency=2) as service:
+            first = await service.search_many(queries)
+            second = await service.search_many(["sql joins"])
+            return service.stats(), first, second
+
+    stats, first, second = asyncio.run(scenario())
+    assert list(first) == ["Docker tutorial", "docker  TUTORIAL", "SQL joins"]
+    assert first["Docker tutorial"] == first["docker  TUTORIAL"]
+    assert [video["title"] for video in first["SQL joins"]] == [
+        f"sql joins - part {i}" for i in (1, 2, 3)
+    ]
+    assert second["sql joins"] == first["SQL joins"]
+    # Two distinct queries reached the server, under the concurrency cap
+    assert sorted(request["body"]["q"] for request in serper.requests) == [
+        "docker tutorial",
+        "sql joins",
+    ]
+    assert {request["api_key"] for request in serper.requests} == {"test-key"}
+    assert serper.max_in_flight <= 2
+    assert (stats["requests"], stats["deduplicated"], stats["cache_hits"]) == (2, 1, 1)
+    assert stats["in_flight"] == 0
+
+
+def test_failed_searches_are_not_cached(serper):
+    serper.fail_queries = {"broken"}
+
+    async def scenario():
+        async with make_service(serper) as service:
+            results = [await service.search_videos("broken") for _ in range(2)]
+            return service.stats(), results
+
+    stats, results = asyncio.run(scenario())
+    assert results == [[], []]
+    assert (stats["requests"], stats["failures"], stats["cached_queries"]) == (2, 2, 0)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_search(serper):
+    serper.latency_seconds = 0.1
+
+    async def scenario():
+        async with make_service(serper) as service:
+            leader = asyncio.ensure_future(service.search_videos("go"))
+            await asyncio.sleep(0.02)
+            follower = asyncio.ensure_future(service.search_videos("go"))
+            await asyncio.sleep(0.02)
+            leader.cancel()
+            videos = await follower
+            return leader, videos, service.stats()
+
+    leader, videos, stats = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert len(videos) == 3
+    assert (stats["requests"], stats["deduplicated"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_search_is_stopped_when_every_caller_gives_up(serper):
+    serper.latency_seconds = 0.1
+
+    async def scenario():
+        async with make_service(serper) as service:
+            caller = asyncio.ensure_future(service.search_videos("go"))
+            await asyncio.sleep(0.02)
+            caller.cancel()
+            await asyncio.gather(caller, return_exceptions=True)
+            await asyncio.sleep(0.15)
+            return service.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["in_flight"], stats["cached_queries"]) == (0, 0)
+
+
+def test_session_of_a_finished_loop_is_closed(serper):
+    service = make_service(serper)
+    asyncio.run(service.search_videos("go"))
+    old_session = service._session
+
+    async def scenario():
+        await service.search_videos("rust")
+        await service.close()
+
+    asyncio.run(scenario())
+    assert old_session.closed
+    assert service._session is None
@@ -0,0 +1,80 @@
+import pytest
+
+from src.utilities.skill_matcher import SkillMatcher
+
+TAXONOMY = {
+    "C": [],
+    "C++": ["cpp"],
+    "Python": ["py"],
+    "Go": ["golang"],
+    "Java": [],
+    "Machine Learning": ["ml"],
+}
+CASE_SENSITIVE = {"C", "Go", "ML"}
+CONTEXT_REQUIRED = {"C"}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SkillMatcher(TAXONOMY, CASE_SENSITIVE, CONTEXT_REQUIRED)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("JavaScript and Java", ["Java"]),
+        ("C++, Python", ["C++", "Python"]),
+        ("I go to work; Go services", ["Go"]),
+        ("Machine Learning Engineer, ml", ["Machine Learning"]),
+        ("ML and py", ["Machine Learning", "Python"]),
+    ],
+)
+def test_whole_token_and_case_sensitive_matches(matcher, text, expected):
+    assert matcher.extract(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("John C. Smith", []),
+        ("Grade C in maths", []),
+        ("c programming", []),
+        ("Languages: C, C++, Python", ["C", "C++", "Python"]),
+        ("C programming", ["C"]),
+        ("Python and C", ["Python", "C"]),
+    ],
+)
+def test_context_required_aliases(matcher, text, expected):
+    assert matcher.extract(text) == expected
+
+
+def test_find_reports_character_offsets(matcher):
+    text = "Built with golang and C++"
+    assert [(name, text[start:end]) for name, start, end in matcher.find(text)] == [
+        ("Go", "golang"),
+        ("C++", "C++"),
+    ]
+
+
+def test_load_round_trips_and_rebuilds_when_stale(tmp_path):
+    path = str(tmp_path / "automaton.json")
+    built = SkillMatcher.load(path, TAXONOMY, CASE_SENSITIVE, CONTEXT_REQUIRED)
+    loaded = SkillMatcher.load(path, TAXONOMY, CASE_SENSITIVE, CONTEXT_REQUIRED)
+    text = "Python and C, golang, ML"
+    assert loaded.extract(text) == built.extract(text)
+    assert loaded.fingerprint == built.fingerprint
+
+    # A different taxonomy does not match the saved fingerprint
+    changed = SkillMatcher.load(path, {**TAXONOMY, "Rust": []}, CASE_SENSITIVE, CONTEXT_REQUIRED)
+    assert changed.extract("Rust") == ["Rust"]
+    with open(path, encoding="utf-8") as f:
+        assert f.readline().strip() == changed.fingerprint
+
+
+def test_load_rebuilds_unreadable_file(tmp_path):
+    path = tmp_path / "automaton.json"
+    fingerprint = SkillMatcher(TAXONOMY, CASE_SENSITIVE, CONTEXT_REQUIRED).fingerprint
+    path.write_text(fingerprint + "\n{not json", encoding="utf-8")
+
+    matcher = SkillMatcher.load(str(path), TAXONOMY, CASE_SENSITIVE, CONTEXT_REQUIRED)
+    assert matcher.extract("Python") == ["Python"]
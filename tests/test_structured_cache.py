@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from src.utilities.llm_cache import LLMResponseCache
+from src.utilities.openai_llm_utils import OpenAI_Text_Config, OpenAITextGenerator
+from src.utilities.structured_output import StructuredOutputError
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def responder_from(replies):
+    """Answers with each reply in turn, then repeats the last one."""
+    replies = list(replies)
+
+    def respond(request):
+        return replies.pop(0) if len(replies) > 1 else replies[0]
+
+    return respond
+
+
+def make_generator(tmp_path) -> OpenAITextGenerator:
+    return OpenAITextGenerator(
+        config=OpenAI_Text_Config(),
+        cache=LLMResponseCache(path=str(tmp_path / "llm_cache.sqlite3")),
+    )
+
+
+def test_unusable_output_is_not_cached(fake_openai, tmp_path):
+    server = fake_openai(responder=responder_from(["not json at all"]))
+    generator = make_generator(tmp_path)
+
+    for _ in range(2):
+        with pytest.raises(StructuredOutputError):
+            generator.generate_structured("q", Answer, max_recalls=0)
+
+    # The second call asked the API again instead of replaying the first
+    assert len(server.requests) == 2
+    assert generator.cache.stats()["entries"] == 0
+
+
+def test_usable_output_is_cached_after_parsing(fake_openai, tmp_path):
+    server = fake_openai(
+        responder=responder_from(["{broken", json.dumps({"value": 7})])
+    )
+    generator = make_generator(tmp_path)
+
+    first = generator.generate_structured("q", Answer, max_recalls=1)
+    assert first["response"].value == 7
+    # Only the re-requested prompt's usable reply was stored
+    assert generator.cache.stats()["entries"] == 1
+
+    second = generator.generate_structured("q", Answer, max_recalls=1)
+    third = generator.generate_structured("q", Answer, max_recalls=1)
+    assert second["response"].value == third["response"].value == 7
+    # The second call asked again; the third was answered from the cache
+    assert len(server.requests) == 3
+    assert third["cached"] and not second["cached"]
+
+
+def test_unusable_cached_output_is_dropped(fake_openai, tmp_path):
+    server = fake_openai(responder=responder_from(["not json at all"]))
+    generator = make_generator(tmp_path)
+    # As written by a raw call, which does not validate its content
+    generator.generate_raw_response("q", output_model=Answer)
+    assert generator.cache.stats()["entries"] == 1
+
+    with pytest.raises(StructuredOutputError):
+        generator.generate_structured("q", Answer, max_recalls=0)
+
+    assert len(server.requests) == 1
+    assert generator.cache.stats()["entries"] == 0
+
+
+def test_tokens_of_discarded_attempts_are_reported(fake_openai, tmp_path):
+    fake_openai(responder=responder_from(["not json at all", json.dumps({"value": 2})]))
+    generator = make_generator(tmp_path)
+    responses = []
+    generate_raw_response = generator.generate_raw_response
+
+    def recorded(**kwargs):
+        responses.append(generate_raw_response(**kwargs))
+        return responses[-1]
+
+    generator.generate_raw_response = recorded
+    result = generator.generate_structured("q", Answer, max_recalls=1)
+
+    assert result["response"].value == 2
+    assert len(responses) == 2
+    assert result["input_tokens"] == sum(r.usage.prompt_tokens for r in responses)
+    assert result["output_tokens"] == sum(r.usage.completion_tokens for r in responses)
+    assert result["output_tokens"] > responses[-1].usage.completion_tokens
@@ -0,0 +1,61 @@
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from src.utilities.structured_output import (
+    StructuredOutputError,
+    parse_structured,
+    repair_candidates,
+    repair_json,
+)
+
+
+class Item(BaseModel):
+    name: str
+    level: int
+
+
+class Items(BaseModel):
+    title: str
+    items: List[Item]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1}', '{"a": 1}'),
+        ('Here you go:\n```json\n{"a": [1, 2,]}\n```', '{"a": [1, 2]}'),
+        ('{"a": "x", "b": "y', '{"a": "x"}'),
+        ('{"a": [1, 2, {"b": ', '{"a": [1, 2, {}]}'),
+        ("no json here", None),
+    ],
+)
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_truncated_output_yields_one_cut_per_nesting_level():
+    text = '{"title": "T", "items": [{"name": "Go", "level": 3}, {"name": "C"'
+    assert list(repair_candidates(text)) == [
+        '{"title": "T", "items": [{"name": "Go", "level": 3}, {"name": "C"}]}',
+        '{"title": "T", "items": [{"name": "Go", "level": 3}]}',
+        '{"title": "T"}',
+    ]
+
+
+def test_parse_structured_falls_back_to_an_outer_cut():
+    text = '{"title": "T", "items": [{"name": "Go", "level": 3}, {"name": "C"'
+    parsed, repaired = parse_structured(text, Items)
+    assert repaired
+    assert parsed == Items(title="T", items=[Item(name="Go", level=3)])
+
+    parsed, repaired = parse_structured('{"title": "T", "items": []}', Items)
+    assert not repaired
+
+
+def test_parse_structured_rejects_what_cannot_be_repaired():
+    with pytest.raises(StructuredOutputError, match="Items"):
+        parse_structured('{"title": "T"}', Items)
+    with pytest.raises(StructuredOutputError):
+        parse_structured("", Items)
@@ -0,0 +1,38 @@
+from src.utilities.text_compaction import (
+    TRUNCATION_MARKER,
+    TextCompactor,
+    truncate_to_tokens,
+)
+
+
+def test_long_line_is_cut_at_a_token_boundary():
+    words = " ".join(f"word{i}" for i in range(2000))
+    text = f"EXPERIENCE\n{words}\nEDUCATION\nBSc Computer Science, Leeds"
+    result = TextCompactor(max_tokens=300).compact(text)
+
+    lines = result["text"].splitlines()
+    assert result["truncated"]
+    assert result["tokens_after"] <= 300
+    # The start of the oversized line is kept instead of only the marker
+    assert lines[0] == "EXPERIENCE"
+    assert lines[1].startswith("word0 word1 word2")
+    assert words.startswith(lines[1])
+    assert lines[2] == TRUNCATION_MARKER
+    assert lines[-1] == "BSc Computer Science, Leeds"
+
+
+def test_ordinary_sections_are_cut_at_line_boundaries():
+    experience = "\n".join(f"Built service number {i} for the platform team" for i in range(200))
+    result = TextCompactor(max_tokens=200).compact(f"EXPERIENCE\n{experience}")
+
+    lines = result["text"].splitlines()
+    assert lines[-1] == TRUNCATION_MARKER
+    assert all(line in experience.splitlines() for line in lines[1:-1])
+
+
+def test_truncate_to_tokens():
+    text = "alpha beta gamma delta " * 50
+    assert truncate_to_tokens(text, 0) == ""
+    prefix = truncate_to_tokens(text, 10)
+    assert prefix and text.startswith(prefix) and len(prefix) < len(text)
+    assert truncate_to_tokens("short", 100) == "short"
@@ -0,0 +1,59 @@
+import pytest
+
+from src.utilities.text_extractor import TextExtractor
+
+PDF = b"%PDF-1.4\n1 0 obj\n<< >>\nendobj\n"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        (PDF, True),
+        (bytearray(PDF), True),
+        (memoryview(PDF), True),
+        (b"junk" * 100 + PDF, True),
+        (PNG, False),
+        (memoryview(PNG), False),
+    ],
+)
+def test_is_pdf_sniffs_bytes(source, expected):
+    assert TextExtractor.is_pdf(source) is expected
+
+
+@pytest.mark.parametrize(
+    "suffix, data, expected",
+    [
+        (".pdf", PDF, True),
+        ("", PDF, True),  # Spilled upload without a suffix
+        (".png", PDF, True),
+        (".pdf", PNG, False),
+    ],
+)
+def test_is_pdf_sniffs_files(tmp_path, suffix, data, expected):
+    path = tmp_path / f"upload{suffix}"
+    path.write_bytes(data)
+    assert TextExtractor.is_pdf(str(path)) is expected
+
+
+def test_is_pdf_falls_back_to_the_suffix(tmp_path):
+    assert TextExtractor.is_pdf(str(tmp_path / "missing.pdf"))
+    assert not TextExtractor.is_pdf(str(tmp_path / "missing.png"))
+
+
+def test_text_layer_pages_are_separated_by_form_feeds():
+    from benchmarks.corpus import text_layer_pdf
+
+    pdf = text_layer_pdf([["Page one " * 10], ["Page two " * 10], ["Page three " * 10]])
+    result = TextExtractor().extract_text_with_details(pdf)
+
+    assert [page["method"] for page in result["pages"]] == ["text_layer"] * 3
+    pages = result["text"].split("\f")
+    assert len(pages) == 3
+    assert [page.split()[1] for page in pages] == ["one", "two", "three"]
+
+
+def test_default_preset_keeps_the_plain_tesseract_settings():
+    preset = TextExtractor.from_preset("default")
+    assert preset.ocr_settings == TextExtractor().ocr_settings
+    assert preset.tesseract_config == TextExtractor().tesseract_config
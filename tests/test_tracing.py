@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from src.utilities.openai_llm_utils import OpenAI_Text_Config, OpenAITextGenerator
+from src.utilities.tracing import (
+    LLM_REQUESTS,
+    LLM_TOKENS,
+    STAGE_ERRORS,
+    STAGE_SECONDS,
+    MetricsRegistry,
+    span,
+)
+
+
+def test_span_times_stages_and_counts_errors_only():
+    with span("test_ok"):
+        pass
+    with pytest.raises(ValueError):
+        with span("test_failed"):
+            raise ValueError("boom")
+
+    async def cancelled():
+        with span("test_cancelled"):
+            await asyncio.sleep(1)
+
+    async def scenario():
+        task = asyncio.ensure_future(cancelled())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    for stage in ("test_ok", "test_failed", "test_cancelled"):
+        assert STAGE_SECONDS.count(stage=stage) == 1
+    assert STAGE_ERRORS.value(stage="test_ok") == 0
+    assert STAGE_ERRORS.value(stage="test_failed") == 1
+    assert STAGE_ERRORS.value(stage="test_cancelled") == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, stage="ocr")
+
+    assert histogram.samples() == [
+        ("latency_seconds_bucket", {"stage": "ocr", "le": "0.1"}, 2),
+        ("latency_seconds_bucket", {"stage": "ocr", "le": "1"}, 3),
+        ("latency_seconds_bucket", {"stage": "ocr", "le": "+Inf"}, 4),
+        ("latency_seconds_sum", {"stage": "ocr"}, 3.65),
+        ("latency_seconds_count", {"stage": "ocr"}, 4),
+    ]
+    with pytest.raises(ValueError):
+        histogram.observe(1.0)
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls.", ("model",))
+    counter.inc(model='gpt "4"\\n')
+    counter.inc(2, model="mini")
+    assert registry.counter("calls_total", "Calls.", ("model",)) is counter
+    with pytest.raises(ValueError):
+        registry.histogram("calls_total", "Calls.", ("model",))
+
+    assert registry.render() == (
+        "# HELP calls_total Calls.\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{model="gpt \\"4\\"\\\\n"} 1\n'
+        'calls_total{model="mini"} 2\n'
+    )
+
+
+def test_metrics_endpoint():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with span("test_endpoint"):
+        pass
+    response = TestClient(main.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE resume_stage_duration_seconds histogram" in response.text
+    assert 'resume_stage_duration_seconds_count{stage="test_endpoint"} 1' in response.text
+
+
+def test_streamed_calls_are_recorded(fake_openai):
+    fake_openai(responder=lambda request: "streamed reply", stream_chunk_chars=4)
+    generator = OpenAITextGenerator(config=OpenAI_Text_Config())
+    model = generator.config.model
+    before = {
+        "ok": LLM_REQUESTS.value(model=model, outcome="ok"),
+        "output": LLM_TOKENS.value(model=model, kind="output"),
+    }
+
+    async def consume():
+        return [delta async for delta in generator.async_stream_response("hi")]
+
+    assert "".join(asyncio.run(consume())) == "streamed reply"
+    assert LLM_REQUESTS.value(model=model, outcome="ok") == before["ok"] + 1
+    assert LLM_TOKENS.value(model=model, kind="output") > before["output"]
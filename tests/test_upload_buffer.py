@@ -0,0 +1,31 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utilities.upload_buffer import SpooledUpload
+
+
+def test_spilled_file_is_removed_when_close_is_cancelled():
+    async def scenario():
+        upload = SpooledUpload(max_memory_bytes=4, suffix=".pdf")
+        await upload.write(b"spilled")
+        path = upload.path
+
+        # Hold the only executor thread so the removal is still queued when
+        # the close is cancelled
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        release = threading.Event()
+        blocker = loop.run_in_executor(None, release.wait)
+
+        closing = asyncio.create_task(upload.close())
+        await asyncio.sleep(0)
+        closing.cancel()
+        await asyncio.gather(closing, return_exceptions=True)
+        release.set()
+        await blocker
+        await loop.shutdown_default_executor()
+        return path
+
+    assert not os.path.exists(asyncio.run(scenario()))
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src.services.semantic_match_service import SemanticMatchService
+from src.utilities.vector_store import VectorStore
+
+DIM = 16
+
+
+def clustered_vectors(n: int, seed: int = 0, clusters: int = 8) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM))
+    return centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, DIM))
+
+
+def ids(n: int, prefix: str = "v"):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+def test_reopen_keeps_vectors_replacements_and_removals(tmp_path):
+    vectors = clustered_vectors(20)
+    store = VectorStore(str(tmp_path), dim=DIM)
+    store.add_many(ids(20), vectors)
+    store.add("v1", vectors[5])  # Replaces v1
+    assert store.remove("v2")
+    assert not store.remove("v2")
+    store.remove("v3")
+    store.add("v3", vectors[3])  # Re-added after its removal
+    store.close()
+
+    reopened = VectorStore(str(tmp_path))
+    assert reopened.dim == DIM
+    assert len(reopened) == 19
+    assert "v2" not in reopened and "v3" in reopened
+    np.testing.assert_allclose(reopened.get("v1"), store.get("v5"), atol=1e-3)
+    assert reopened.search(vectors[5], k=2, exact=True)[0][1] == pytest.approx(1, abs=1e-3)
+    assert {item_id for item_id, _ in reopened.search(vectors[5], k=2)} == {"v1", "v5"}
+    assert "v2" not in {item_id for item_id, _ in reopened.search(vectors[2], k=20)}
+
+    with pytest.raises(ValueError):
+        VectorStore(str(tmp_path), dim=DIM + 1)
+
+
+def test_ivf_search_agrees_with_exact_search(tmp_path):
+    vectors = clustered_vectors(400)
+    store = VectorStore(str(tmp_path), dim=DIM, train_min_vectors=200)
+    store.add_many(ids(400), vectors)
+    lists = len(store._lists)
+    assert lists == 20
+
+    queries = clustered_vectors(20, seed=1)
+    recall = []
+    for query in queries:
+        exact = store.search(query, k=10, exact=True)
+        # Probing every list is an exhaustive search
+        assert store.search(query, k=10, nprobe=lists) == exact
+        approximate = {item_id for item_id, _ in store.search(query, k=10)}
+        recall.append(len(approximate & {item_id for item_id, _ in exact}) / 10)
+    assert np.mean(recall) >= 0.9
+
+
+@pytest.mark.parametrize("close", [True, False])
+def test_vectors_inserted_after_training_are_searchable(tmp_path, close):
+    vectors = clustered_vectors(300)
+    store = VectorStore(str(tmp_path), dim=DIM, train_min_vectors=200)
+    store.add_many(ids(150), vectors[:150])
+    # One at a time, so the index is trained with spare rows allocated
+    for i in range(150, 200):
+        store.add(f"v{i}", vectors[i])
+    assert store._centroids is not None
+    for i in range(200, 300):
+        store.add(f"v{i}", vectors[i])
+    if close:
+        store.close()
+
+    # Without a close the index on disk predates the new rows
+    for opened in (store, VectorStore(str(tmp_path), train_min_vectors=200)):
+        lists = len(opened._lists)
+        for i in (200, 250, 299):
+            assert opened.search(vectors[i], k=1, nprobe=lists)[0][0] == f"v{i}"
+
+
+def test_semantic_match_service_round_trip(tmp_path):
+    service = SemanticMatchService(str(tmp_path))
+    service.add_jd("backend", {"Skills": ["Python", "SQL", "Docker"]})
+    service.add_jd("accounting", {"Skills": ["Bookkeeping", "Excel"]})
+    service.add_cv("jane", {"Skills": ["Python", "Docker"]})
+    service.close()
+
+    reopened = SemanticMatchService(str(tmp_path))
+    jobs = reopened.recommend_jobs({"Skills": ["Python", "Docker"]}, k=2)
+    assert [job_id for job_id, _ in jobs] == ["backend", "accounting"]
+    assert reopened.find_candidates({"Skills": ["Python"]}, k=1)[0][0] == "jane"
@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import io
+import json
+
+from PIL import Image, ImageDraw
+
+from constants import VISION_IMAGE_TOKEN_ESTIMATES
+from src.app import Pipeline
+from src.services import vision_extraction_service
+from src.services.ats_service import ATSservice
+from src.services.document_service import DocumentService
+from src.services.vision_extraction_service import (
+    OCR_ROUTE,
+    VISION_ROUTE,
+    VisionExtractionService,
+)
+from src.utilities.openai_llm_utils import OpenAI_Vision_Config, OpenAIVisionTextGenerator
+from src.utilities.rate_limiter import estimate_tokens
+from src.utilities.text_extractor import TextExtractor
+
+CV_REPLY = {
+    "contact_info": {"name": "Jane Doe"},
+    "skills_technical": ["Python"],
+    "skills_soft": [],
+    "experience": [],
+    "education": [],
+}
+# Also valid as JD items and as an ATS score, so one responder serves every call
+ANY_REPLY = json.dumps(
+    {**CV_REPLY, "Skills": ["Python"], "match_score": 70, "strengths": [], "gaps": []}
+)
+
+
+def scanned_page(width: int = 1700, height: int = 2200) -> Image.Image:
+    image = Image.new("RGB", (width, height), "white")
+    ImageDraw.Draw(image).text((100, 100), "Jane Doe - Python", fill="black")
+    return image
+
+
+def png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_service(fidelity: str = "low") -> VisionExtractionService:
+    return VisionExtractionService(
+        TextExtractor(),
+        generator=OpenAIVisionTextGenerator(config=OpenAI_Vision_Config(fidelity=fidelity)),
+    )
+
+
+def test_pages_go_to_the_vision_model_in_one_request(fake_openai, monkeypatch):
+    server = fake_openai(responder=lambda request: json.dumps(CV_REPLY))
+    # Rendering PDFs needs poppler; hand the service three rendered pages
+    monkeypatch.setattr(
+        vision_extraction_service,
+        "render_pages",
+        lambda source, is_pdf, dpi: [scanned_page() for _ in range(3)],
+    )
+    service = make_service("low")
+
+    cv_items = asyncio.run(service.extract_cv_items(b"%PDF-1.4 three scanned pages"))
+
+    assert cv_items["contact_info"] == {"name": "Jane Doe"}
+    (request,) = server.requests
+    parts = request["messages"][-1]["content"]
+    images = [part["image_url"] for part in parts if part["type"] == "image_url"]
+    assert [part["type"] for part in parts] == ["text"] + ["image_url"] * 3
+    assert {image["detail"] for image in images} == {"low"}
+    for image in images:
+        prefix, data = image["url"].split(",", 1)
+        assert prefix == "data:image/jpeg;base64"
+        page = Image.open(io.BytesIO(base64.b64decode(data)))
+        # Sized to what "low" detail reads, in grayscale
+        assert max(page.size) == 512 and page.mode == "L"
+
+    text_characters = sum(
+        len(message["content"]) if isinstance(message["content"], str)
+        else sum(len(part.get("text", "")) for part in message["content"])
+        for message in request["messages"]
+    )
+    assert estimate_tokens(request, 0) == (
+        text_characters // 4 + 3 * VISION_IMAGE_TOKEN_ESTIMATES["low"]
+    )
+
+
+def test_high_detail_pages_are_sized_to_768_wide(fake_openai):
+    server = fake_openai(responder=lambda request: json.dumps(CV_REPLY))
+    service = make_service("high")
+    asyncio.run(service.extract_cv_items(png_bytes(scanned_page())))
+
+    (part,) = [
+        part for part in server.requests[0]["messages"][-1]["content"]
+        if part["type"] == "image_url"
+    ]
+    assert part["image_url"]["detail"] == "high"
+    page = Image.open(io.BytesIO(base64.b64decode(part["image_url"]["url"].split(",", 1)[1])))
+    assert page.size == (768, 993)
+
+
+def test_auto_mode_routes_scans_to_vision_and_text_pdfs_to_ocr(fake_openai):
+    from benchmarks.corpus import document_pages, text_layer_pdf
+
+    server = fake_openai(responder=lambda request: ANY_REPLY)
+    text_cv = text_layer_pdf(document_pages("resume", 0, 1))
+    jd = text_layer_pdf(document_pages("jd", 0, 1))
+    scanned_cv = png_bytes(scanned_page())
+
+    service = make_service()
+    assert service.route(scanned_cv) == VISION_ROUTE
+    assert service.route(text_cv) == OCR_ROUTE
+
+    pipeline = Pipeline(
+        document_service=DocumentService(TextExtractor()),
+        ats_service=ATSservice(structured_output=False, model_routing=False),
+        vision_service=service,
+        cv_extraction_mode="auto",
+    )
+
+    async def scenario():
+        return [
+            await pipeline.process_resume(cv, jd, raise_errors=True)
+            for cv in (scanned_cv, text_cv)
+        ]
+
+    scanned, text = asyncio.run(scenario())
+    assert "cv_vision_extraction" in scanned["timings"]
+    assert "cv_ocr" not in scanned["timings"]
+    assert {"cv_ocr", "cv_extraction"} <= set(text["timings"])
+    assert "cv_vision_extraction" not in text["timings"]
+    vision_requests = [
+        request for request in server.requests
+        if isinstance(request["messages"][-1]["content"], list)
+    ]
+    assert len(vision_requests) == 1